@@ -2,6 +2,8 @@
 set -e
 cd ./src
 python manage.py migrate
+# Renders only the descriptions of events saved before they were rendered on save.
+python manage.py backfill_event_descriptions
 
 # `node_modules` static folder is huge so ignore it
 # If `node_modules` is updated, run collectstatic manually
@@ -0,0 +1,7 @@
+"""Performance benchmarks for SpokaneTech.
+
+Benchmarks are standalone scripts rather than tests so that they can take as
+long as they need. Run them from the `src/` directory, e.g.:
+
+    python -m benchmarks.scrape_concurrency
+"""
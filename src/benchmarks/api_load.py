@@ -0,0 +1,73 @@
+"""Benchmark requests per second to the JSON API against the HTML pages showing the same data.
+
+Creates `--groups` tech groups with `--events` upcoming events each, all tagged,
+in a throwaway database, then requests each endpoint `--requests` times with
+the Django test client: first with `VIEW_CACHE_TIMEOUT=0`, then with responses
+cached. The API is measured with every field and with a sparse fieldset, next
+to the events and tech groups lists they replace. The cache is local memory
+unless `CACHE_REDIS_URL` is set.
+
+    python -m benchmarks.api_load --groups 20 --events 10 --requests 200
+"""
+
+import argparse
+
+from benchmarks.utils import setup_django, temporary_database, timer
+from benchmarks.view_cache import make_data
+
+ENDPOINTS = (
+    ("HTML events", "web:list_events", {}),
+    ("API events", "web:api_list_events", {}),
+    ("API events, sparse", "web:api_list_events", {"fields": "id,name,date_time,url"}),
+    ("HTML groups", "web:list_tech_groups", {}),
+    ("API groups", "web:api_list_tech_groups", {}),
+    ("API tags", "web:api_list_tags", {}),
+)
+
+
+def run(groups: int, events: int, tags: int, requests: int) -> list[dict]:
+    from django.core.cache import cache
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    results = []
+    # In development the debug toolbar is shown when DEBUG is on, and it would dominate the timings.
+    with temporary_database(), override_settings(DEBUG=False):
+        make_data(groups, events, tags)
+        client = Client()
+        for name, url_name, params in ENDPOINTS:
+            url = reverse(url_name)
+            result = {"endpoint": name}
+            for cached, timeout in (("uncached", 0), ("cached", 300)):
+                cache.clear()
+                with override_settings(VIEW_CACHE_TIMEOUT=timeout):
+                    response = client.get(url, params)
+                    result["bytes"] = len(response.content)
+                    with timer() as elapsed:
+                        for _ in range(requests):
+                            response = client.get(url, params)
+                            assert response.status_code == 200
+                result[cached] = round(requests / elapsed["seconds"], 1)
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--events", type=int, default=10, help="upcoming events per group")
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="requests to each endpoint")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.groups, args.events, args.tags, args.requests)
+
+    print(f"{'endpoint':>20} {'KiB':>6} {'uncached/s':>11} {'cached/s':>9}")
+    for result in results:
+        print(f"{result['endpoint']:>20} {result['bytes'] // 1024:>6} {result['uncached']:>11} {result['cached']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark the bandwidth and render time saved by ETags on a replayed traffic sample.
+
+Creates `--groups` tech groups with `--events` upcoming events each, in a
+throwaway database, then replays a sample of `--requests` requests from
+`--visitors` visitors: full pages and HTMX requests to the events list, the
+tech groups, their detail pages and the calendar, with popular pages requested
+more often. Each visitor is a Django test client, and `--change-every` requests
+an event is renamed, expiring the pages that show it.
+
+The sample is replayed twice: once by visitors that ignore ETags, and once by
+visitors that send back the ETag of each page they already have, as browsers
+do. Both runs use the page cache.
+
+    python -m benchmarks.conditional_requests --visitors 20 --requests 2000
+"""
+
+import argparse
+import datetime
+import random
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def make_data(groups: int, events: int) -> None:
+    from django.utils import timezone
+
+    from web import models
+
+    now = timezone.localtime()
+    for number in range(groups):
+        tech_group = models.TechGroup.objects.create(
+            name=f"Group {number}",
+            description="A group that organizes events.",
+            homepage=f"https://www.meetup.com/group-{number}/",
+        )
+        models.Event.objects.bulk_create(
+            models.Event(
+                name=f"Event {number}-{i}",
+                description="A description of the event.",
+                date_time=now + datetime.timedelta(days=i + 1),
+                approved_at=now,
+                group=tech_group,
+            )
+            for i in range(events)
+        )
+    models.Event.all.update_effective_tags()
+
+
+def traffic_sample(visitors: int, requests: int, seed: int) -> list[tuple[int, str, bool]]:
+    """Return `requests` (visitor, URL, HTMX) requests, with a few pages much more popular than the rest."""
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from web import models
+
+    now = timezone.localtime()
+    urls = [
+        reverse("web:list_events"),
+        reverse("web:list_tech_groups"),
+        reverse("web:event_calendar", args=[now.year, now.month]),
+        *(tech_group.get_absolute_url() for tech_group in models.TechGroup.objects.all()),
+        *(event.get_absolute_url() for event in models.Event.objects.all()),
+    ]
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(urls))]
+    return [
+        (rng.randrange(visitors), url, rng.random() < 0.5) for url in rng.choices(urls, weights=weights, k=requests)
+    ]
+
+
+def replay(sample: list[tuple[int, str, bool]], visitors: int, change_every: int, conditional: bool) -> dict:
+    from django.core.cache import cache
+    from django.test import Client
+
+    from web import models
+
+    cache.clear()
+    clients = [Client() for _ in range(visitors)]
+    etags: dict[tuple[int, str, bool], str] = {}
+    events = list(models.Event.objects.all())
+    result = {"bytes": 0, "renders": 0, "not_modified": 0}
+    with timer() as elapsed:
+        for number, (visitor, url, htmx) in enumerate(sample):
+            if change_every and number % change_every == change_every - 1:
+                event = events[number % len(events)]
+                event.name = f"{event.name}!"
+                event.save()
+            headers = {"HX-Request": "true"} if htmx else {}
+            if conditional and (etag := etags.get((visitor, url, htmx))):
+                headers["If-None-Match"] = etag
+            response = clients[visitor].get(url, headers=headers)
+            assert response.status_code in (200, 304)
+            if response.status_code == 304:
+                result["not_modified"] += 1
+            else:
+                etags[(visitor, url, htmx)] = response.get("ETag", "")
+            result["bytes"] += len(response.content)
+            result["renders"] += response.context is not None
+    result["seconds"] = round(elapsed["seconds"], 2)
+    return result
+
+
+def run(groups: int, events: int, visitors: int, requests: int, change_every: int, seed: int) -> dict:
+    from django.test.utils import override_settings
+
+    # In development the debug toolbar is shown when DEBUG is on, and it would dominate the timings.
+    with temporary_database(), override_settings(DEBUG=False):
+        make_data(groups, events)
+        sample = traffic_sample(visitors, requests, seed)
+        return {
+            "without ETags": replay(sample, visitors, change_every, conditional=False),
+            "with ETags": replay(sample, visitors, change_every, conditional=True),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--events", type=int, default=10, help="upcoming events per group")
+    parser.add_argument("--visitors", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--change-every", type=int, default=100, help="requests between event changes; 0 for none")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.groups, args.events, args.visitors, args.requests, args.change_every, args.seed)
+
+    print(f"{'':>14} {'KiB sent':>9} {'renders':>8} {'304s':>6} {'seconds':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:>14} {result['bytes'] // 1024:>9} {result['renders']:>8} "
+            f"{result['not_modified']:>6} {result['seconds']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark the latency of the events list with every upcoming event on one page against keyset pages.
+
+Creates `--events` upcoming events, spread over `--groups` tagged tech groups,
+in a throwaway database, then requests the events list `--requests` times with
+the Django test client and the page cache disabled: with a page size larger
+than the number of events, the way the list was rendered before it was
+paginated, and with `EVENTS_PAGE_SIZE`. The last page is requested too, since a
+keyset page near the end should cost the same as the first.
+
+    python -m benchmarks.event_pages --events 10000 --groups 50 --requests 10
+"""
+
+import argparse
+import datetime
+import statistics
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def make_data(events: int, groups: int, tags: int) -> None:
+    from django.utils import timezone
+
+    from web import models
+
+    now = timezone.localtime()
+    all_tags = models.Tag.objects.bulk_create([models.Tag(value=f"Tag {i}") for i in range(tags)])
+    tech_groups = []
+    for number in range(groups):
+        tech_group = models.TechGroup.objects.create(name=f"Group {number}")
+        tech_group.tags.set(all_tags[number % tags :][:3])
+        tech_groups.append(tech_group)
+    models.Event.objects.bulk_create(
+        models.Event(
+            name=f"Event {i}",
+            description_excerpt="<p>A description of the event.</p>",
+            date_time=now + datetime.timedelta(hours=i + 1),
+            approved_at=now,
+            group=tech_groups[i % groups],
+        )
+        for i in range(events)
+    )
+    models.Event.all.update_effective_tags()
+
+
+def measure(client, url: str, requests: int) -> dict:
+    timings = []
+    for _ in range(requests):
+        with timer() as elapsed:
+            response = client.get(url)
+        assert response.status_code == 200
+        timings.append(elapsed["seconds"] * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "events": len(response.context["queryset"]),
+        "bytes": len(response.content),
+        "next_url": response.context["queryset"].next_url,
+    }
+
+
+def run(events: int, groups: int, tags: int, requests: int) -> dict:
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    results = {}
+    # In development the debug toolbar is shown when DEBUG is on, and it would dominate the timings.
+    with temporary_database(), override_settings(DEBUG=False, VIEW_CACHE_TIMEOUT=0):
+        make_data(events, groups, tags)
+        client = Client()
+        url = reverse("web:list_events")
+        with override_settings(EVENTS_PAGE_SIZE=events + 1):
+            results["all"] = measure(client, url, requests)
+        results["first_page"] = measure(client, url, requests)
+
+        # Skip to the last page, requesting everything between it and the first at once.
+        last_page_url = results["first_page"]["next_url"]
+        with override_settings(EVENTS_PAGE_SIZE=events - 2 * settings.EVENTS_PAGE_SIZE):
+            last_page_url = client.get(last_page_url).context["queryset"].next_url
+        results["last_page"] = measure(client, last_page_url, requests)
+        assert results["last_page"]["next_url"] == ""
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000, help="upcoming events")
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=10, help="requests to each page")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.events, args.groups, args.tags, args.requests)
+
+    print(f"{'page':>12} {'events':>7} {'KiB':>7} {'median ms':>10}")
+    for name, result in results.items():
+        print(f"{name:>12} {result['events']:>7} {result['bytes'] // 1024:>7} {result['median_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark searching events with the full-text index against reading every event.
+
+Creates `--events` approved events, with names and descriptions drawn from a
+vocabulary of common and rare words, in a throwaway database: SQLite or
+PostgreSQL, whichever `DATABASE_URL` is. It then
+runs each query `--repeat` times, once through `web.search.ranked_pks` and
+once through the unindexed `icontains` search that other databases fall back
+to, for the first page and for a page further in. Last, it requests the search
+view's first page with the Django test client.
+
+    python -m benchmarks.event_search --events 100000 --repeat 5
+"""
+
+import argparse
+import datetime
+import random
+import statistics
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+COMMON_WORDS = ["python", "cloud", "security", "data", "community", "meetup", "workshop", "talk"]
+RARE_WORDS = ["kubernetes", "rust", "elixir", "webassembly", "postgres", "accessibility"]
+QUERIES = ["python", "rust", "cloud security", "elixir workshop", "nomatch"]
+
+
+def make_data(events: int, groups: int, seed: int) -> None:
+    from django.db import connection
+    from django.utils import timezone
+
+    from web import models
+
+    rng = random.Random(seed)
+    now = timezone.localtime()
+    filler = [f"word{i}" for i in range(2_000)]
+    tags = models.Tag.objects.bulk_create([models.Tag(value=word.title()) for word in COMMON_WORDS])
+    tech_groups = []
+    for number in range(groups):
+        tech_group = models.TechGroup.objects.create(name=f"{rng.choice(COMMON_WORDS).title()} Group {number}")
+        tech_group.tags.set(rng.sample(tags, 2))
+        tech_groups.append(tech_group)
+
+    def words(count: int, rare_chance: float) -> list[str]:
+        return [
+            rng.choice(RARE_WORDS if rng.random() < rare_chance else COMMON_WORDS if rng.random() < 0.3 else filler)
+            for _ in range(count)
+        ]
+
+    descriptions = (" ".join(words(80, 0.002)) for _ in range(events))
+    models.Event.objects.bulk_create(
+        (
+            models.Event(
+                name=" ".join(words(4, 0.02)).title(),
+                # bulk_create() doesn't render descriptions, so they're set as rendering would.
+                description_html=f"<p>{description}</p>",
+                description_text=description,
+                location=f"{rng.choice(filler).title()} Hall",
+                date_time=now + datetime.timedelta(hours=i + 1),
+                approved_at=now,
+                group=tech_groups[i % groups],
+            )
+            for i, description in enumerate(descriptions)
+        ),
+        batch_size=1_000,
+    )
+    models.Event.all.update_effective_tags()
+    models.Event.all.update_search_keywords()
+    if connection.vendor == "postgresql":
+        # Update the planner's statistics, as autovacuum would after a bulk load.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE web_event")
+
+
+def measure(search, query: str, offset: int, repeat: int) -> dict:
+    from web.models import Event
+
+    timings = []
+    for _ in range(repeat):
+        with timer() as elapsed:
+            pks = search(Event.objects.all(), query, offset, 25)
+        timings.append(elapsed["seconds"] * 1000)
+    return {"median_ms": round(statistics.median(timings), 1), "results": len(pks)}
+
+
+def run(events: int, groups: int, repeat: int, seed: int) -> dict:
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    from web import search
+
+    results = {}
+    # In development the debug toolbar is shown when DEBUG is on, and it would dominate the timings.
+    with temporary_database(), override_settings(DEBUG=False):
+        make_data(events, groups, seed)
+        for query in QUERIES:
+            for offset in (0, 100):
+                results[(query, offset)] = {
+                    "indexed": measure(search.ranked_pks, query, offset, repeat),
+                    "unindexed": measure(search._unindexed_pks, query, offset, repeat),
+                }
+
+        client = Client()
+        timings = []
+        for _ in range(repeat):
+            with timer() as elapsed:
+                response = client.get(reverse("web:search_events"), {"q": QUERIES[0]})
+            assert response.status_code == 200
+            timings.append(elapsed["seconds"] * 1000)
+        results["view"] = round(statistics.median(timings), 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.events, args.groups, args.repeat, args.seed)
+    view = results.pop("view")
+
+    print(f"{'query':>16} {'offset':>6} {'indexed ms':>11} {'unindexed ms':>13} {'results':>8}")
+    for (query, offset), result in results.items():
+        print(
+            f"{query:>16} {offset:>6} {result['indexed']['median_ms']:>11} "
+            f"{result['unindexed']['median_ms']:>13} {result['indexed']['results']:>8}"
+        )
+    print(f"search view, first page: {view} ms")
+
+
+if __name__ == "__main__":
+    main()
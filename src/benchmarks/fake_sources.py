@@ -0,0 +1,283 @@
+"""A local stand-in for Meetup and the Eventbrite API, for load testing the scrapers.
+
+Pages and API responses are generated from the fixtures in `web/tests/data/`:
+
+- `/meetup/<group>-<n>/`: a group homepage listing `events_per_group` upcoming events;
+- `/meetup/<group>-<n>/events/<id>/`: an event page;
+- `/eventbrite/v3/organizers/<id>/events/`: an organizer's `events_per_group`
+  upcoming events, paginated like the real API;
+- `/eventbrite/v3/venues/<id>/` and `/eventbrite/v3/events/<id>/description/`;
+- `/meetup/photos/<id>.jpeg` and `/eventbrite/images/<id>.jpg`: images.
+
+Every response is delayed by `latency` seconds, a fraction `error_rate` of
+requests fail with a 503, and `image` replaces the fixture images if it's given.
+Point the scrapers at the server with the homepages of the tech groups, and the
+`MEETUP_DOMAIN` and `EVENTBRITE_API_URL` settings.
+
+Run on its own, it serves until interrupted and prints those settings, and
+`--create-groups N` creates N tech groups that are scraped from it:
+
+    python -m benchmarks.fake_sources --events 50 --latency 0.05 --create-groups 100
+"""
+
+import argparse
+import copy
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.utils import DATA_DIR, setup_django
+
+FIXTURE_EVENT_ID = "298213205"
+FIXTURE_IMAGE_URL = "https://secure.meetupstatic.com/photos/event/1/0/a/e/highres_519844270.jpeg"
+EVENTBRITE_PAGE_SIZE = 50
+EVENTBRITE_VENUES_PER_ORGANIZATION = 5
+
+
+class FakeSourcesServer(ThreadingHTTPServer):
+    """Serve generated Meetup pages and Eventbrite API responses."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        events_per_group: int = 50,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        image: bytes | None = None,
+    ) -> None:
+        super().__init__((host, port), FakeSourcesHandler)
+        self.events_per_group = events_per_group
+        self.latency = latency
+        self.error_rate = error_rate
+        self.event_page = (DATA_DIR / "meetup-with-json.html").read_text()
+        self.meetup_image = image or (DATA_DIR / "meetup-image.jpeg").read_bytes()
+        self.eventbrite_image = image or (DATA_DIR / "eventbrite" / "event_image.jpg").read_bytes()
+        self.eventbrite_event = json.loads((DATA_DIR / "eventbrite" / "organizer_events.json").read_text())["events"][0]
+        self.eventbrite_venue = json.loads((DATA_DIR / "eventbrite" / "event_venue.json").read_text())
+        self._start = datetime.now().astimezone().replace(microsecond=0) + timedelta(days=1)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"  # type: ignore
+
+    @property
+    def meetup_url(self) -> str:
+        """The URL that group homepages are under. Use `meetup_homepage()` for a homepage URL."""
+        return f"{self.base_url}/meetup/"
+
+    @property
+    def eventbrite_api_url(self) -> str:
+        return f"{self.base_url}/eventbrite/v3/"
+
+    def meetup_homepage(self, group_number: int) -> str:
+        return f"{self.meetup_url}group-{group_number}/"
+
+    def start(self) -> threading.Thread:
+        """Serve requests from a daemon thread until `shutdown()` is called."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def event_ids(self, number: int, offset: int = 0) -> range:
+        first_id = offset + 100_000 * (number + 1)
+        return range(first_id, first_id + self.events_per_group)
+
+    def event_date_time(self, index: int) -> datetime:
+        return self._start + timedelta(days=index)
+
+    def homepage(self, group: str, group_number: int) -> str:
+        events = {
+            f"Event:{event_id}": {
+                "id": str(event_id),
+                "dateTime": self.event_date_time(i).isoformat(),
+                "eventUrl": f"{self.meetup_url}{group}/events/{event_id}/",
+            }
+            for i, event_id in enumerate(self.event_ids(group_number))
+        }
+        next_data = {"props": {"pageProps": {"__APOLLO_STATE__": events}}}
+        return f'<html><body><script id="__NEXT_DATA__">{json.dumps(next_data)}</script></body></html>'
+
+    def event(self, event_id: str) -> str:
+        page = self.event_page.replace(FIXTURE_EVENT_ID, event_id)
+        return page.replace(FIXTURE_IMAGE_URL, f"{self.meetup_url}photos/{event_id}.jpeg")
+
+    def organizer_events(self, organization_id: int, expand: list[str], continuation: int) -> dict:
+        # Eventbrite event IDs are offset so they don't collide with the Meetup ones.
+        event_ids = self.event_ids(organization_id, offset=10**12)
+        page = event_ids[continuation : continuation + EVENTBRITE_PAGE_SIZE]
+        events = [
+            self.eventbrite_organizer_event(organization_id, continuation + i, event_id, expand)
+            for i, event_id in enumerate(page)
+        ]
+        has_more_items = continuation + EVENTBRITE_PAGE_SIZE < len(event_ids)
+        pagination = {
+            "object_count": len(event_ids),
+            "page_size": EVENTBRITE_PAGE_SIZE,
+            "has_more_items": has_more_items,
+        }
+        if has_more_items:
+            pagination["continuation"] = str(continuation + EVENTBRITE_PAGE_SIZE)
+        return {"pagination": pagination, "events": events}
+
+    def eventbrite_organizer_event(self, organization_id: int, index: int, event_id: int, expand: list[str]) -> dict:
+        event = copy.deepcopy(self.eventbrite_event)
+        start = self.event_date_time(index)
+        image_url = f"{self.base_url}/eventbrite/images/{event_id}.jpg"
+        venue_id = f"{organization_id}{index % EVENTBRITE_VENUES_PER_ORGANIZATION:02d}"
+        event.update(
+            id=str(event_id),
+            url=f"{self.base_url}/eventbrite/e/{event_id}",
+            organization_id=str(organization_id),
+            start={"utc": start.isoformat(), "local": start.isoformat(), "timezone": "UTC"},
+            end={"utc": (start + timedelta(hours=2)).isoformat(), "local": "", "timezone": "UTC"},
+            venue_id=venue_id,
+        )
+        event["name"]["text"] = f"{event['name']['text']} #{index + 1}"
+        event["logo"]["original"]["url"] = image_url
+        event["logo"]["url"] = image_url
+        if "venue" in expand:
+            event["venue"] = self.venue(venue_id)
+        return event
+
+    def venue(self, venue_id: str) -> dict:
+        return {**self.eventbrite_venue, "id": venue_id, "resource_uri": f"{self.eventbrite_api_url}venues/{venue_id}/"}
+
+    def description(self, event_id: str) -> dict:
+        description = self.eventbrite_event["description"]["html"]
+        return {"description": f"<div><p>Event {event_id}</p>{description}</div>"}
+
+
+class FakeSourcesHandler(BaseHTTPRequestHandler):
+    server: FakeSourcesServer
+
+    ROUTES = (
+        (re.compile(r"/meetup/photos/\d+\.jpeg"), "meetup_image"),
+        (re.compile(r"/meetup/(?P<group>[\w-]+-(?P<number>\d+))/events/(?P<event_id>\d+)/"), "meetup_event"),
+        (re.compile(r"/meetup/(?P<group>[\w-]+-(?P<number>\d+))/"), "meetup_homepage"),
+        (re.compile(r"/eventbrite/v3/organizers/(?P<organization_id>\d+)/events/"), "eventbrite_events"),
+        (re.compile(r"/eventbrite/v3/venues/(?P<venue_id>\d+)/"), "eventbrite_venue"),
+        (re.compile(r"/eventbrite/v3/events/(?P<event_id>\d+)/description/"), "eventbrite_description"),
+        (re.compile(r"/eventbrite/images/\d+\.jpg"), "eventbrite_image"),
+    )
+
+    def do_GET(self) -> None:
+        time.sleep(self.server.latency)
+        url = urllib.parse.urlsplit(self.path)
+        if random.random() < self.server.error_rate:
+            self._respond_error(url.path, 503, "SERVICE_UNAVAILABLE")
+            return
+
+        query = urllib.parse.parse_qs(url.query)
+        for pattern, name in self.ROUTES:
+            if match := pattern.fullmatch(url.path):
+                getattr(self, name)(query, **match.groupdict())
+                return
+        self._respond_error(url.path, 404, "NOT_FOUND")
+
+    def meetup_homepage(self, query: dict, group: str, number: str) -> None:
+        self._respond(self.server.homepage(group, int(number)).encode(), "text/html")
+
+    def meetup_event(self, query: dict, group: str, number: str, event_id: str) -> None:
+        self._respond(self.server.event(event_id).encode(), "text/html")
+
+    def meetup_image(self, query: dict) -> None:
+        self._respond(self.server.meetup_image, "image/jpeg")
+
+    def eventbrite_events(self, query: dict, organization_id: str) -> None:
+        expand = query.get("expand", [""])[0].split(",")
+        continuation = int(query.get("continuation", ["0"])[0])
+        self._respond_json(self.server.organizer_events(int(organization_id), expand, continuation))
+
+    def eventbrite_venue(self, query: dict, venue_id: str) -> None:
+        self._respond_json(self.server.venue(venue_id))
+
+    def eventbrite_description(self, query: dict, event_id: str) -> None:
+        self._respond_json(self.server.description(event_id))
+
+    def eventbrite_image(self, query: dict) -> None:
+        self._respond(self.server.eventbrite_image, "image/jpeg")
+
+    def _respond_error(self, path: str, status: int, error: str) -> None:
+        # The Eventbrite API describes errors in JSON.
+        if path.startswith("/eventbrite/v3/"):
+            self._respond_json({"status_code": status, "error": error, "error_description": error}, status)
+        else:
+            self.send_error(status)
+
+    def _respond_json(self, data: dict, status: int = 200) -> None:
+        self._respond(json.dumps(data).encode(), "application/json", status)
+
+    def _respond(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def create_groups(server: FakeSourcesServer, count: int) -> int:
+    """Create `count` tech groups, each with an Eventbrite organization, scraped from `server`."""
+    from web.models import EventbriteOrganization, TechGroup
+
+    existing = TechGroup.objects.filter(homepage__startswith=server.meetup_url).count()
+    for number in range(existing, count):
+        tech_group = TechGroup.objects.create(
+            name=f"Load Test Group {number}",
+            homepage=server.meetup_homepage(number),
+        )
+        EventbriteOrganization.objects.create(
+            tech_group=tech_group,
+            url=f"{server.base_url}/eventbrite/o/{number}",
+            eventbrite_id=str(number),
+        )
+    return max(count - existing, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--events", type=int, default=50, help="events per group and organization")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail with a 503")
+    parser.add_argument(
+        "--create-groups",
+        type=int,
+        default=0,
+        metavar="N",
+        help="create N tech groups, each with an Eventbrite organization, that are scraped from the server",
+    )
+    args = parser.parse_args()
+
+    server = FakeSourcesServer(
+        args.host, args.port, events_per_group=args.events, latency=args.latency, error_rate=args.error_rate
+    )
+    if args.create_groups:
+        setup_django()
+        print(f"Created {create_groups(server, args.create_groups)} tech groups.")
+
+    print(f"MEETUP_DOMAIN={server.meetup_url}")
+    print(f"EVENTBRITE_API_URL={server.eventbrite_api_url}")
+    print("Quit the server with CONTROL-C.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark the memory used to download and save event images.
+
+Scrapes a tech group with `--events` events from `benchmarks.fake_sources`, a
+local stand-in for Meetup, where every event has a large `--image-size` JPEG.
+Each run is in a fresh process and reports its peak resident set size, which
+should stay flat as the number of events grows: images are streamed to
+temporary files, at most a few of them are downloaded ahead of being saved,
+and they are written to storage in chunks.
+
+    python -m benchmarks.image_memory --events 10 40 160 --image-size 3000x2000
+"""
+
+import argparse
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.utils import peak_rss_kib, setup_django, temporary_database, timer
+
+
+def make_image(width: int, height: int) -> bytes:
+    """Return a JPEG of noise, which compresses poorly, so it's about as large as a photo can be."""
+    from PIL import Image
+
+    file = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert("RGB").save(file, format="JPEG", quality=95)
+    return file.getvalue()
+
+
+def run_case(meetup_homepage: str, meetup_url: str, workers: int) -> dict:
+    """Scrape and save one tech group's events. This runs in its own process."""
+    setup_django()
+    from django.test.utils import override_settings
+
+    from web import models, services
+    from web.http_client import HttpClient
+
+    # The stand-in server is a single host, so per-host limits must not cap the run.
+    with temporary_database(), override_settings(MEETUP_DOMAIN=meetup_url, SCRAPER_HOST_RATE=0):
+        rss_before = peak_rss_kib()
+        tech_group = models.TechGroup.objects.create(name="Group", homepage=meetup_homepage)
+        http_client = HttpClient(max_connections_per_host=workers)
+        service = services.MeetupService(max_workers=workers, http_client=http_client)
+        with timer() as elapsed:
+            service.save_events_for([tech_group])
+        saved = models.Event.all.exclude(image="").count()
+
+    rss_after = peak_rss_kib()
+    return {
+        "images": saved,
+        "seconds": round(elapsed["seconds"], 2),
+        "peak_rss_kib": rss_after,
+        "rss_growth_kib": rss_after - rss_before,
+    }
+
+
+def run(event_counts: list[int], image: bytes, workers: int) -> list[dict]:
+    from benchmarks.fake_sources import FakeSourcesServer
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for events in event_counts:
+        server = FakeSourcesServer(events_per_group=events, image=image)
+        server.start()
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, server.meetup_homepage(0), server.meetup_url, workers).result()
+        finally:
+            server.shutdown()
+            server.server_close()
+        results.append({"events": events, **result})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[10, 40, 160], help="events scraped per run")
+    parser.add_argument("--image-size", default="3000x2000", help="width x height of every event's image")
+    parser.add_argument("--workers", type=int, default=8, help="pages and images fetched at once")
+    args = parser.parse_args()
+
+    width, height = (int(n) for n in args.image_size.split("x"))
+    image = make_image(width, height)
+    print(f"image: {args.image_size}, {len(image) // 1024} KiB")
+
+    results = run(args.events, image, args.workers)
+
+    print(f"{'events':>7} {'images':>7} {'seconds':>8} {'peak_rss_kib':>13} {'rss_growth_kib':>15}")
+    for result in results:
+        print(
+            f"{result['events']:>7} {result['images']:>7} {result['seconds']:>8} "
+            f"{result['peak_rss_kib']:>13} {result['rss_growth_kib']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Load test ingesting events from a local stand-in for Meetup and Eventbrite.
+
+Starts `benchmarks.fake_sources.FakeSourcesServer`, creates `--groups` tech
+groups (each with an Eventbrite organization) in a throwaway database, then
+scrapes and saves every group's events with `MeetupService` and
+`EventbriteService`. Run it a second time with `--runs 2` to measure
+re-scraping events that already exist.
+
+    python -m benchmarks.ingest_load --groups 500 --events 50 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import logging
+
+import requests
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def run(groups: int, events: int, latency: float, error_rate: float, workers: int, runs: int) -> list[dict]:
+    from django.test.utils import override_settings
+
+    from web import models, scrapers, services
+    from benchmarks.fake_sources import FakeSourcesServer
+    from web.http_client import HttpClient
+
+    server = FakeSourcesServer(events_per_group=events, latency=latency, error_rate=error_rate)
+    server.start()
+
+    results = []
+    try:
+        with (
+            temporary_database(),
+            # The stand-in server is a single host, so per-host limits must not cap the run.
+            override_settings(
+                MEETUP_DOMAIN=server.meetup_url, EVENTBRITE_API_URL=server.eventbrite_api_url, SCRAPER_HOST_RATE=0
+            ),
+        ):
+            for number in range(groups):
+                tech_group = models.TechGroup.objects.create(
+                    name=f"Group {number}", homepage=server.meetup_homepage(number)
+                )
+                models.EventbriteOrganization.objects.create(
+                    tech_group=tech_group, url=server.base_url, eventbrite_id=str(number)
+                )
+
+            http_client = HttpClient(max_connections_per_host=workers)
+            meetup_service = services.MeetupService(max_workers=workers, http_client=http_client)
+            eventbrite_service = services.EventbriteService(
+                scrapers.EventbriteScraper(api_token="load-test", http_client=http_client, max_workers=workers)
+            )
+
+            for run_number in range(1, runs + 1):
+                with timer() as elapsed:
+                    counts = meetup_service.save_events_for(
+                        models.TechGroup.objects.filter(homepage__icontains=server.meetup_url)
+                    )
+                results.append(_result("meetup", run_number, groups * events, counts, 0, elapsed["seconds"]))
+
+                counts = services.SaveCounts()
+                failed = 0
+                with timer() as elapsed:
+                    for organization in models.EventbriteOrganization.objects.select_related("tech_group"):
+                        try:
+                            counts += eventbrite_service.save_events_for(organization)
+                        except (requests.RequestException, ValueError):
+                            failed += 1
+                results.append(_result("eventbrite", run_number, groups * events, counts, failed, elapsed["seconds"]))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def _result(source: str, run_number: int, expected: int, counts, failed: int, seconds: float) -> dict:
+    ingested = counts.created + counts.updated + counts.unchanged
+    return {
+        "source": source,
+        "run": run_number,
+        "expected": expected,
+        "created": counts.created,
+        "updated": counts.updated,
+        "unchanged": counts.unchanged,
+        "failed": failed,
+        "seconds": round(seconds, 2),
+        "events_per_second": round(ingested / seconds, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--events", type=int, default=50, help="events per group and organization")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail with a 503")
+    parser.add_argument("--workers", type=int, default=8, help="pages and images fetched at once")
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    setup_django()
+    # Failed pages are logged with tracebacks, which would drown out the results.
+    logging.disable(logging.CRITICAL)
+    results = run(args.groups, args.events, args.latency, args.error_rate, args.workers, args.runs)
+
+    print(
+        f"{'source':>10} {'run':>4} {'expected':>9} {'created':>8} {'updated':>8} {'unchanged':>10} "
+        f"{'failed':>7} {'seconds':>8} {'events/s':>9}"
+    )
+    for result in results:
+        print(
+            f"{result['source']:>10} {result['run']:>4} {result['expected']:>9} {result['created']:>8} "
+            f"{result['updated']:>8} {result['unchanged']:>10} {result['failed']:>7} {result['seconds']:>8} "
+            f"{result['events_per_second']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark parsing the Meetup pages in `web/tests/data/`.
+
+For every fixture page this measures the time and peak memory of:
+
+- `soup`: building a full lxml-backed BeautifulSoup tree and finding
+  `__NEXT_DATA__` in it, which is how pages used to be parsed;
+- `next_data`: `MeetupScraperMixin._parse_apollo_state`, which scans the bytes;
+- `scrape`: a complete `scrape()` of the page, served from memory.
+
+    python -m benchmarks.parse_meetup --repeat 20
+"""
+
+import argparse
+import functools
+import json
+import statistics
+import tracemalloc
+
+from benchmarks.utils import DATA_DIR, FixtureHttpClient, setup_django, timer
+
+FIXTURES = {
+    "meetup-with-json.html": "event",
+    "meetup-without-json.html": "event",
+    "meetup-homepage-with-json.html": "homepage",
+    "meetup-homepage-without-json.html": "homepage",
+}
+
+
+def measure(fn, repeat: int) -> dict:
+    seconds = []
+    for _ in range(repeat):
+        with timer() as elapsed:
+            fn()
+        seconds.append(elapsed["seconds"])
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": round(statistics.median(seconds) * 1000, 2), "peak_kib": round(peak / 1024)}
+
+
+def run(repeat: int) -> list[dict]:
+    from bs4 import BeautifulSoup
+
+    from web import scrapers
+
+    def soup(content: bytes) -> None:
+        next_data = BeautifulSoup(content, "lxml").find_all(attrs={"id": "__NEXT_DATA__"})
+        if next_data:
+            json.loads(next_data[0].text)
+
+    event_scraper = scrapers.MeetupEventScraper(FixtureHttpClient(b""))  # type: ignore
+
+    def next_data(content: bytes) -> None:
+        try:
+            event_scraper._parse_apollo_state(content)
+        except LookupError:
+            pass
+
+    def scrape(content: bytes, page_type: str) -> None:
+        http_client = FixtureHttpClient(content)
+        if page_type == "event":
+            scraper = scrapers.MeetupEventScraper(http_client)  # type: ignore
+            scraper.scrape("https://www.meetup.com/python-spokane/events/298213205/")
+        else:
+            scraper = scrapers.MeetupHomepageScraper(http_client)  # type: ignore
+            scraper.scrape("https://www.meetup.com/python-spokane/")
+
+    results = []
+    for filename, page_type in FIXTURES.items():
+        content = (DATA_DIR / filename).read_bytes()
+        for name, fn in (
+            ("soup", functools.partial(soup, content)),
+            ("next_data", functools.partial(next_data, content)),
+            ("scrape", functools.partial(scrape, content, page_type)),
+        ):
+            results.append({"fixture": filename, "parser": name, **measure(fn, repeat)})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per measurement")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.repeat)
+
+    print(f"{'fixture':>34} {'parser':>10} {'ms':>8} {'peak KiB':>9}")
+    for result in results:
+        print(f"{result['fixture']:>34} {result['parser']:>10} {result['ms']:>8} {result['peak_kib']:>9}")
+
+
+if __name__ == "__main__":
+    main()
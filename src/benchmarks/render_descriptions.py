@@ -0,0 +1,77 @@
+"""Benchmark rendering event descriptions on every page view against once when events are saved.
+
+Renders a list of `--events` events, each with an Eventbrite-style HTML
+description of about `--description-kib` KiB, the way `web/partials/event_list.htm`
+did before descriptions were precomputed (Markdown and sanitizing every
+description, then truncating it) and the way it does now (reading the stored
+excerpt). Also reports the one-off cost of rendering the descriptions when saving.
+
+    python -m benchmarks.render_descriptions --events 100 --description-kib 8
+"""
+
+import argparse
+
+from benchmarks.utils import setup_django, timer
+
+PARAGRAPH = (
+    '<div style="margin: 0 0 1em"><p><strong>Join us</strong> for an evening of talks about '
+    '<a href="https://www.python.org/" target="_blank" rel="noopener">Python</a>, data and the web. '
+    '<img src="https://img.evbuc.com/photo.jpg" alt="Speakers"> Food and drinks are provided by our '
+    "<em>sponsors</em>, and there's time to meet other developers afterwards.</p>"
+    "<ul><li>6:00 PM: Doors open</li><li>6:30 PM: Talks</li><li>8:00 PM: Networking</li></ul></div>"
+)
+
+
+def make_description(kib: int) -> str:
+    return PARAGRAPH * max(1, kib * 1024 // len(PARAGRAPH))
+
+
+def run(events: int, description_kib: int, repeat: int) -> dict:
+    from django.template import engines
+
+    from web import descriptions
+    from web.models import Event
+
+    description = make_description(description_kib)
+    objects = [Event(name=f"Event {i}", description=description + f"<p>{i}</p>") for i in range(events)]
+
+    with timer() as save_elapsed:
+        for event in objects:
+            event.render_description()
+
+    engine = engines["django"]
+    on_view = engine.from_string(
+        "{% load markdownify %}{% for object in events %}"
+        "{{ object.description|markdownify|truncatewords_html:50 }}{% endfor %}"
+    )
+    precomputed = engine.from_string("{% for object in events %}{{ object.description_excerpt|safe }}{% endfor %}")
+    assert on_view.render({"events": objects}) == precomputed.render({"events": objects})
+
+    results = {"events": events, "description_bytes": len(description), "excerpt_words": descriptions.EXCERPT_WORDS}
+    for name, template in (("on_view", on_view), ("precomputed", precomputed)):
+        with timer() as elapsed:
+            for _ in range(repeat):
+                template.render({"events": objects})
+        results[f"{name}_ms"] = round(elapsed["seconds"] / repeat * 1000, 2)
+    results["render_on_save_ms"] = round(save_elapsed["seconds"] * 1000, 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100, help="events in the list")
+    parser.add_argument("--description-kib", type=int, default=8, help="approximate size of each description")
+    parser.add_argument("--repeat", type=int, default=5, help="times the list is rendered")
+    args = parser.parse_args()
+
+    setup_django()
+    result = run(args.events, args.description_kib, args.repeat)
+
+    print(f"{result['events']} events with {result['description_bytes'] // 1024} KiB descriptions")
+    print(f"list rendered with markdownify per view: {result['on_view_ms']:>9} ms")
+    print(f"list rendered from stored excerpts:      {result['precomputed_ms']:>9} ms")
+    print(f"rendering every description once, on save: {result['render_on_save_ms']:>7} ms")
+
+
+if __name__ == "__main__":
+    main()
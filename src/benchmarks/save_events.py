@@ -0,0 +1,104 @@
+"""Benchmark saving scraped events with `EventService`.
+
+Compares saving every event in its own call to `save_event_from_result` with
+saving them all at once with `save_results`, both for new events and for
+re-saving events that already exist.
+
+    python -m benchmarks.save_events --events 1000 --tags 5
+"""
+
+import argparse
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def make_results(events: int, tags: int) -> list:
+    from django.utils import timezone
+
+    from web import models
+
+    return [
+        (
+            models.Event(
+                name=f"Event {i}",
+                description="A description of the event.",
+                date_time=timezone.localtime(),
+                external_id=str(i),
+                url=f"https://www.meetup.com/group/events/{i}/",
+            ),
+            [models.Tag(value=f"Tag {(i + j) % (tags * 4)}") for j in range(tags)],
+            None,
+        )
+        for i in range(events)
+    ]
+
+
+class QueryCounter:
+    """Count queries with a database execute wrapper.
+
+    The debug query log can't be used because it only keeps the last 9,000 queries.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run(events: int, tags: int) -> list[dict]:
+    from django.db import connection, transaction
+
+    from web import models, services
+
+    def one_at_a_time(service, results, tech_group):
+        for result in results:
+            with transaction.atomic():
+                service.save_event_from_result(result, tech_group)
+
+    def all_at_once(service, results, tech_group):
+        service.save_results(results, tech_group)
+
+    results = []
+    with temporary_database():
+        tech_group = models.TechGroup.objects.create(name="Group")
+        service = services.EventService()
+        for strategy in (one_at_a_time, all_at_once):
+            models.Event.all.all().delete()
+            models.Tag.objects.all().delete()
+            for run_name in ("insert", "update"):
+                queries = QueryCounter()
+                with connection.execute_wrapper(queries), timer() as elapsed:
+                    strategy(service, make_results(events, tags), tech_group)
+                results.append(
+                    {
+                        "strategy": strategy.__name__,
+                        "run": run_name,
+                        "events": models.Event.all.count(),
+                        "queries": queries.count,
+                        "seconds": round(elapsed["seconds"], 3),
+                    }
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--tags", type=int, default=5, help="tags per event")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.events, args.tags)
+
+    print(f"{'strategy':>14} {'run':>7} {'events':>7} {'queries':>8} {'seconds':>8}")
+    for result in results:
+        print(
+            f"{result['strategy']:>14} {result['run']:>7} {result['events']:>7} "
+            f"{result['queries']:>8} {result['seconds']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
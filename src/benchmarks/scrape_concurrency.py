@@ -0,0 +1,78 @@
+"""Benchmark `MeetupService` run time against `benchmarks.fake_sources`, a local stand-in for Meetup.
+
+Every response from the server is delayed by `--latency` seconds to
+simulate the round trip to meetup.com, so the run time shows how well page
+and image fetches overlap at each concurrency level.
+
+    python -m benchmarks.scrape_concurrency --groups 4 --events 10 --latency 0.05
+"""
+
+import argparse
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def run(groups: int, events: int, latency: float, concurrency_levels: list[int]) -> list[dict]:
+    from django.test.utils import override_settings
+
+    from web import models, scrapers, services
+    from benchmarks.fake_sources import FakeSourcesServer
+    from web.http_client import HttpClient
+
+    server = FakeSourcesServer(events_per_group=events, latency=latency)
+    server.start()
+
+    results = []
+    try:
+        # The stand-in server is a single host, so per-host limits must not cap the run.
+        with temporary_database(), override_settings(SCRAPER_HOST_RATE=0):
+            tech_groups = [
+                models.TechGroup.objects.create(name=f"Group {i}", homepage=server.meetup_homepage(i))
+                for i in range(groups)
+            ]
+            for max_workers in concurrency_levels:
+                models.Event.all.all().delete()
+                http_client = HttpClient(max_connections_per_host=max_workers)
+                service = services.MeetupService(
+                    scrapers.MeetupHomepageScraper(http_client),
+                    scrapers.MeetupEventScraper(http_client),
+                    max_workers=max_workers,
+                )
+                with timer() as elapsed:
+                    service.save_events_for(tech_groups)
+
+                saved = models.Event.all.count()
+                results.append(
+                    {
+                        "max_workers": max_workers,
+                        "events": saved,
+                        "seconds": round(elapsed["seconds"], 3),
+                        "events_per_second": round(saved / elapsed["seconds"], 1),
+                    }
+                )
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--events", type=int, default=10, help="events per group")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.groups, args.events, args.latency, args.concurrency)
+
+    print(f"{'workers':>8} {'events':>7} {'seconds':>8} {'events/s':>9}")
+    for result in results:
+        print(
+            f"{result['max_workers']:>8} {result['events']:>7} {result['seconds']:>8} {result['events_per_second']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark constructing `MeetupHomepageScraper` and the timezone index it uses.
+
+`before` rebuilds the timezone abbreviation index every time a scraper is
+constructed, which is what `MeetupHomepageScraper.__init__` used to do. `after`
+constructs scrapers as they are now, with the index built once per process.
+
+    python -m benchmarks.scraper_startup --scrapers 20
+"""
+
+import argparse
+
+from benchmarks.utils import setup_django, timer
+
+
+def run(count: int) -> list[dict]:
+    from web import scrapers
+    from web.http_client import HttpClient
+
+    http_client = HttpClient()
+
+    def before() -> None:
+        scrapers.timezones_by_abbreviation.cache_clear()
+        scrapers.MeetupHomepageScraper(http_client)
+        scrapers.timezones_by_abbreviation()
+
+    def after() -> None:
+        scrapers.MeetupHomepageScraper(http_client)
+        scrapers.timezones_by_abbreviation()
+
+    results = []
+    for strategy in (before, after):
+        scrapers.timezones_by_abbreviation.cache_clear()
+        with timer() as first:
+            strategy()
+        with timer() as rest:
+            for _ in range(count - 1):
+                strategy()
+        results.append(
+            {
+                "strategy": strategy.__name__,
+                "first_ms": round(first["seconds"] * 1000, 2),
+                "per_scraper_ms": round(rest["seconds"] * 1000 / max(count - 1, 1), 3),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrapers", type=int, default=20, help="number of scrapers to construct")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.scrapers)
+
+    print(f"{'strategy':>8} {'first ms':>9} {'per scraper ms':>15}")
+    for result in results:
+        print(f"{result['strategy']:>8} {result['first_ms']:>9} {result['per_scraper_ms']:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Benchmark suite for parsing scraped pages, run offline against `web/tests/data/`.
+
+Every case scrapes pages served from memory, either the fixtures or
+synthetically enlarged variants of them (homepages with hundreds of event
+cards, event pages with multi-MiB descriptions), and measures:
+
+- `ms`: the median wall-clock time of a run, and `mib_per_s`, the input
+  processed per second;
+- `peak_kib`: the peak memory allocated by Python during a run, traced with
+  `tracemalloc`;
+- `peak_rss_kib`: the peak resident set size of the process. Every case runs
+  in a fresh process, so this isn't inflated by the cases before it.
+
+Results can be saved as JSON and compared with an earlier run. The comparison
+exits with status 1 if any case got slower, or used more memory, by more than
+the threshold.
+
+    python -m benchmarks.scraper_suite --output baseline.json
+    python -m benchmarks.scraper_suite --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+from benchmarks.utils import DATA_DIR, FixtureHttpClient, peak_rss_kib, setup_django, timer
+
+HOMEPAGE_URL = "https://www.meetup.com/python-spokane/"
+EVENT_URL = "https://www.meetup.com/python-spokane/events/298213205/"
+COMPARED_METRICS = ("ms", "peak_kib", "peak_rss_kib")
+
+
+def make_description(size: int) -> str:
+    """Return a Markdown description of `size` characters."""
+    paragraph = (
+        "**Join us** for our monthly meetup! We'll have a presentation, lightning talks "
+        "and time to chat. See https://spokanetech.org/ for details.\n\n"
+    )
+    return (paragraph * (size // len(paragraph) + 1))[:size]
+
+
+def replace_apollo_state(page: bytes, update: Callable[[dict], None]) -> bytes:
+    """Return the page with its `__NEXT_DATA__` Apollo state changed by `update`."""
+    from web.scrapers import MeetupScraperMixin
+
+    start = MeetupScraperMixin.NEXT_DATA_START.search(page)
+    assert start, "__NEXT_DATA__ script not found"
+    end = page.find(b"</script>", start.end())
+    next_data = json.loads(page[start.end() : end])
+    update(next_data["props"]["pageProps"]["__APOLLO_STATE__"])
+    return page[: start.end()] + json.dumps(next_data).encode() + page[end:]
+
+
+def add_events_to_state(apollo_state: dict, count: int) -> None:
+    """Add `count` upcoming events, copied from the first event, to a homepage's Apollo state."""
+    template = next(value for key, value in apollo_state.items() if key.startswith("Event:"))
+    start = datetime.now(UTC)
+    for i in range(count):
+        event_id = str(900000000 + i)
+        date_time = start + timedelta(days=i + 1)
+        apollo_state[f"Event:{event_id}"] = {
+            **template,
+            "id": event_id,
+            "eventUrl": f"{HOMEPAGE_URL}events/{event_id}/",
+            "dateTime": date_time.isoformat(),
+            "endTime": (date_time + timedelta(hours=2)).isoformat(),
+        }
+
+
+def add_event_cards(page: bytes, count: int) -> bytes:
+    """Return a homepage without `__NEXT_DATA__` with `count` upcoming event cards, copied from the first card."""
+    start = page.index(b'<li><div id="e-1"')
+    end = page.index(b'<li><div id="e-2"')
+    card = page[start:end].replace(b", 2024,", f", {datetime.now(UTC).year + 1},".encode())
+    cards = [
+        card.replace(b"e-1", f"e-{i + 1000}".encode()).replace(b"298213205", str(900000000 + i).encode())
+        for i in range(count)
+    ]
+    return page[:start] + b"".join(cards) + page[end:]
+
+
+def set_event_description(apollo_state: dict, description: str) -> None:
+    event_key = next(key for key in apollo_state if key.startswith("Event:"))
+    apollo_state[event_key]["description"] = description
+
+
+def add_description_html(page: bytes, description: str) -> bytes:
+    """Return an event page without `__NEXT_DATA__` with `description` added to its details."""
+    details = page.index(b'<div class="break-words">', page.index(b'id="event-details"'))
+    insert_at = details + len(b'<div class="break-words">')
+    paragraphs = "".join(f'<p class="mb-4">{paragraph}</p>\n' for paragraph in description.split("\n\n"))
+    return page[:insert_at] + paragraphs.encode() + page[insert_at:]
+
+
+def meetup_homepage(page: bytes) -> tuple[Callable[[], object], int]:
+    from web import scrapers
+
+    scraper = scrapers.MeetupHomepageScraper(FixtureHttpClient(page))  # type: ignore
+    return functools.partial(scraper.scrape, HOMEPAGE_URL), len(page)
+
+
+def meetup_event(page: bytes) -> tuple[Callable[[], object], int]:
+    from web import scrapers
+
+    scraper = scrapers.MeetupEventScraper(FixtureHttpClient(page))  # type: ignore
+    return functools.partial(scraper.scrape, EVENT_URL), len(page)
+
+
+def eventbrite_map_to_event(eventbrite_events: list[dict], description: str | None) -> tuple[Callable[[], object], int]:
+    from web import scrapers
+
+    scraper = scrapers.EventbriteScraper(api_token="benchmark", http_client=FixtureHttpClient(b""))  # type: ignore
+    location = "123 Main St, Spokane, WA 99201"
+
+    def map_events() -> None:
+        for eventbrite_event in eventbrite_events:
+            scraper.map_to_event(
+                eventbrite_event, location, description or eventbrite_event["description"]["html"], None
+            )
+
+    input_size = len(json.dumps(eventbrite_events)) + len(description or "") * len(eventbrite_events)
+    return map_events, input_size
+
+
+def fixture(name: str) -> bytes:
+    return (DATA_DIR / name).read_bytes()
+
+
+def organizer_events(count: int | None = None) -> list[dict]:
+    events = json.loads(fixture("eventbrite/organizer_events.json"))["events"]
+    if count is None:
+        return events
+    return [{**events[i % len(events)], "id": str(900000000 + i)} for i in range(count)]
+
+
+CASES: dict[str, Callable[[int, int], tuple[Callable[[], object], int]]] = {
+    "meetup_homepage/json": lambda events, size: meetup_homepage(fixture("meetup-homepage-with-json.html")),
+    "meetup_homepage/html": lambda events, size: meetup_homepage(fixture("meetup-homepage-without-json.html")),
+    "meetup_homepage/json_many_events": lambda events, size: meetup_homepage(
+        replace_apollo_state(
+            fixture("meetup-homepage-with-json.html"), functools.partial(add_events_to_state, count=events)
+        )
+    ),
+    "meetup_homepage/html_many_events": lambda events, size: meetup_homepage(
+        add_event_cards(fixture("meetup-homepage-without-json.html"), events)
+    ),
+    "meetup_event/json": lambda events, size: meetup_event(fixture("meetup-with-json.html")),
+    "meetup_event/html": lambda events, size: meetup_event(fixture("meetup-without-json.html")),
+    "meetup_event/json_large_description": lambda events, size: meetup_event(
+        replace_apollo_state(
+            fixture("meetup-with-json.html"),
+            functools.partial(set_event_description, description=make_description(size)),
+        )
+    ),
+    "meetup_event/html_large_description": lambda events, size: meetup_event(
+        add_description_html(fixture("meetup-without-json.html"), make_description(size))
+    ),
+    "eventbrite_map_to_event/fixture": lambda events, size: eventbrite_map_to_event(organizer_events(), None),
+    "eventbrite_map_to_event/many_events": lambda events, size: eventbrite_map_to_event(organizer_events(events), None),
+    "eventbrite_map_to_event/large_description": lambda events, size: eventbrite_map_to_event(
+        organizer_events(), make_description(size)
+    ),
+}
+
+
+def run_case(name: str, repeat: int, events: int, description_mib: float) -> dict:
+    """Measure one case. This runs in its own process."""
+    setup_django()
+    fn, input_size = CASES[name](events, int(description_mib * 1024 * 1024))
+    rss_before = peak_rss_kib()
+    fn()  # warm up caches, such as the timezone index
+
+    seconds = []
+    for _ in range(repeat):
+        with timer() as elapsed:
+            fn()
+        seconds.append(elapsed["seconds"])
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(seconds)
+    rss_after = peak_rss_kib()
+    return {
+        "input_kib": round(input_size / 1024),
+        "ms": round(median * 1000, 3),
+        "ops_per_s": round(1 / median, 1),
+        "mib_per_s": round(input_size / 1024 / 1024 / median, 2),
+        "peak_kib": round(peak / 1024),
+        "peak_rss_kib": rss_after,
+        "rss_growth_kib": rss_after - rss_before,
+    }
+
+
+def run(names: list[str], repeat: int, events: int, description_mib: float) -> dict[str, dict]:
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[name] = pool.submit(run_case, name, repeat, events, description_mib).result()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        process = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return process.stdout.strip()
+
+
+def compare(baseline: dict, report: dict, threshold: float) -> dict[str, list[str]]:
+    """Return the regressions in each case of `report` that is also in `baseline`."""
+    regressions: dict[str, list[str]] = {}
+    for name, result in report["cases"].items():
+        baseline_result = baseline["cases"].get(name)
+        if not baseline_result:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = baseline_result[metric], result[metric]
+            if before > 0 and after > before * (1 + threshold):
+                regressions.setdefault(name, []).append(f"{metric} {before} -> {after} (+{after / before - 1:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per case")
+    parser.add_argument("--events", type=int, default=500, help="events in the enlarged homepages and Eventbrite lists")
+    parser.add_argument("--description-mib", type=float, default=4, help="size of the enlarged descriptions")
+    parser.add_argument("--case", action="append", choices=CASES, help="run only these cases")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="compare the results with this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative increase reported as a regression")
+    args = parser.parse_args()
+
+    parameters = {"repeat": args.repeat, "events": args.events, "description_mib": args.description_mib}
+    report = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "cases": run(args.case or list(CASES), args.repeat, args.events, args.description_mib),
+    }
+
+    print(f"{'case':>42} {'input KiB':>10} {'ms':>9} {'MiB/s':>8} {'peak KiB':>9} {'peak RSS KiB':>13}")
+    for name, result in report["cases"].items():
+        print(
+            f"{name:>42} {result['input_kib']:>10} {result['ms']:>9} {result['mib_per_s']:>8} "
+            f"{result['peak_kib']:>9} {result['peak_rss_kib']:>13}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["parameters"] != parameters:
+            print(f"\nWarning: the baseline was run with {baseline['parameters']}")
+        regressions = compare(baseline, report, args.threshold)
+        print(f"\nCompared with {args.compare} ({baseline['commit'] or 'unknown commit'}):")
+        for name, problems in regressions.items():
+            print(f"{name}: {', '.join(problems)}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
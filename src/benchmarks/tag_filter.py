@@ -0,0 +1,96 @@
+"""Benchmark filtering events on tags, through group tags against through effective tags.
+
+Creates `--groups` tech groups with `--events` events each in a throwaway
+database. A third of the events have tags of their own and the rest inherit
+their group's. Then filters on `--filter-tags` tags the way the events list used
+to (events with the tags, OR'd with events without tags whose group has them,
+through both M2M tables) and the way it does now (a subquery on the maintained
+effective tags), and checks they find the same events.
+
+    python -m benchmarks.tag_filter --groups 50 --events 200 --tags 40 --filter-tags 3
+"""
+
+import argparse
+import functools
+import random
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+
+def make_data(groups: int, events: int, tags: int) -> None:
+    from django.utils import timezone
+
+    from web import models
+
+    rng = random.Random(0)
+    now = timezone.localtime()
+    all_tags = models.Tag.objects.bulk_create([models.Tag(value=f"Tag {i}") for i in range(tags)])
+    EventTag = models.Event.tags.through
+    GroupTag = models.TechGroup.tags.through
+    for number in range(groups):
+        tech_group = models.TechGroup.objects.create(name=f"Group {number}")
+        GroupTag.objects.bulk_create(
+            GroupTag(techgroup_id=tech_group.pk, tag_id=tag.pk) for tag in rng.sample(all_tags, 3)
+        )
+        group_events = models.Event.all.bulk_create(
+            models.Event(name=f"Event {number}-{i}", date_time=now, approved_at=now, group=tech_group)
+            for i in range(events)
+        )
+        EventTag.objects.bulk_create(
+            EventTag(event_id=event.pk, tag_id=tag.pk) for event in group_events[::3] for tag in rng.sample(all_tags, 2)
+        )
+    models.Event.all.update_effective_tags()
+
+
+def run(groups: int, events: int, tags: int, filter_tags: int, repeat: int) -> dict:
+    from django.db import models as db_models
+
+    from web import models
+
+    with temporary_database():
+        with timer() as setup_elapsed:
+            make_data(groups, events, tags)
+        tag_pks = [str(pk) for pk in models.Tag.objects.values_list("pk", flat=True)[:filter_tags]]
+
+        def group_tags():
+            # The query the events list ran before effective tags. It used `group__tags__in=pk`, which
+            # matched each digit of a multi-digit primary key, so `group__tags=pk` is used to find the same events.
+            with_group_tags = models.Event.objects.filter(
+                db_models.Q(tags=None)
+                & functools.reduce(lambda a, b: a | b, (db_models.Q(group__tags=pk) for pk in tag_pks))
+            )
+            return list((models.Event.objects.filter(tags__in=tag_pks) | with_group_tags).values_list("pk", flat=True))
+
+        def effective_tags():
+            return list(models.Event.objects.filter_effective_tags(tag_pks).values_list("pk", flat=True))
+
+        result = {"events": groups * events, "setup_seconds": round(setup_elapsed["seconds"], 2)}
+        assert set(group_tags()) == set(effective_tags())
+        for name, query in (("group_tags", group_tags), ("effective_tags", effective_tags)):
+            with timer() as elapsed:
+                for _ in range(repeat):
+                    pks = query()
+            result[f"{name}_rows"] = len(pks)
+            result[f"{name}_ms"] = round(elapsed["seconds"] / repeat * 1000, 2)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--events", type=int, default=200, help="events per group")
+    parser.add_argument("--tags", type=int, default=40)
+    parser.add_argument("--filter-tags", type=int, default=3, help="tags filtered on")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    result = run(args.groups, args.events, args.tags, args.filter_tags, args.repeat)
+
+    print(f"{result['events']} events, filtering on {args.filter_tags} tags")
+    print(f"through group tags:     {result['group_tags_ms']:>9} ms, {result['group_tags_rows']} rows")
+    print(f"through effective tags: {result['effective_tags_ms']:>9} ms, {result['effective_tags_rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
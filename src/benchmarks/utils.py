@@ -0,0 +1,80 @@
+import contextlib
+import os
+import pathlib
+import resource
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from typing import IO
+
+import requests
+
+DATA_DIR = pathlib.Path(__file__).resolve().parent.parent / "web" / "tests" / "data"
+
+
+def setup_django() -> None:
+    """Configure Django so benchmarks can use the ORM and services."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "spokanetech.settings")
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def temporary_database() -> Iterator[None]:
+    """Run the block against a throwaway test database and media directory."""
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def timer() -> Iterator[dict[str, float]]:
+    """Measure the wall-clock time of the block, in seconds, as `result["seconds"]`."""
+    result: dict[str, float] = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def peak_rss_kib() -> int:
+    """Return the peak resident set size of this process, in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class FixtureHttpClient:
+    """Serve a fixture page for every page URL, and a fixture image for every image URL."""
+
+    response_cache = None
+
+    def __init__(self, page: bytes) -> None:
+        self.page = page
+        self.image = (DATA_DIR / "meetup-image.jpeg").read_bytes()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.image if "/photos/" in url else self.page
+        response.unchanged = False  # type: ignore
+        return response
+
+    get_cached = get
+
+    def download(self, url: str, file: IO[bytes], **kwargs) -> requests.Response:
+        response = self.get(url)
+        file.write(response.content)
+        return response
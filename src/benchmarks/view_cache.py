@@ -0,0 +1,98 @@
+"""Benchmark requests per second to the list pages with and without the page cache.
+
+Creates `--groups` tech groups with `--events` upcoming events each, all tagged,
+in a throwaway database, then requests each page `--requests` times with the
+Django test client: first with `VIEW_CACHE_TIMEOUT=0`, then with the page cache.
+Full page and HTMX requests are measured separately, since HTMX requests only
+render the list. The cache is local memory unless `CACHE_REDIS_URL` is set.
+
+    python -m benchmarks.view_cache --groups 20 --events 10 --requests 200
+"""
+
+import argparse
+import datetime
+
+from benchmarks.utils import setup_django, temporary_database, timer
+
+PAGES = ("web:index", "web:list_events", "web:list_tech_groups")
+
+
+def make_data(groups: int, events: int, tags: int) -> None:
+    from django.utils import timezone
+
+    from web import models
+
+    now = timezone.localtime()
+    all_tags = models.Tag.objects.bulk_create([models.Tag(value=f"Tag {i}") for i in range(tags)])
+    for number in range(groups):
+        tech_group = models.TechGroup.objects.create(
+            name=f"Group {number}",
+            description="A group that organizes events.",
+            homepage=f"https://www.meetup.com/group-{number}/",
+        )
+        tech_group.tags.set(all_tags[number % tags :][:3])
+        group_events = models.Event.objects.bulk_create(
+            models.Event(
+                name=f"Event {number}-{i}",
+                description="A description of the event.",
+                date_time=now + datetime.timedelta(days=i + 1),
+                approved_at=now,
+                group=tech_group,
+            )
+            for i in range(events)
+        )
+        for i, event in enumerate(group_events):
+            event.tags.set(all_tags[i % tags :][:2])
+
+
+def run(groups: int, events: int, tags: int, requests: int) -> list[dict]:
+    from django.core.cache import cache
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.urls import reverse
+
+    results = []
+    # In development the debug toolbar is shown when DEBUG is on, and it would dominate the timings.
+    with temporary_database(), override_settings(DEBUG=False):
+        make_data(groups, events, tags)
+        client = Client()
+        for page in PAGES:
+            url = reverse(page)
+            for htmx in (False, True):
+                headers = {"HX-Request": "true"} if htmx else {}
+                result = {"page": url, "htmx": htmx}
+                for cached, timeout in (("uncached", 0), ("cached", 300)):
+                    cache.clear()
+                    with override_settings(VIEW_CACHE_TIMEOUT=timeout):
+                        client.get(url, headers=headers)
+                        with timer() as elapsed:
+                            for _ in range(requests):
+                                response = client.get(url, headers=headers)
+                                assert response.status_code == 200
+                    result[cached] = round(requests / elapsed["seconds"], 1)
+                result["speedup"] = round(result["cached"] / result["uncached"], 1)
+                results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--events", type=int, default=10, help="upcoming events per group")
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="requests to each page")
+    args = parser.parse_args()
+
+    setup_django()
+    results = run(args.groups, args.events, args.tags, args.requests)
+
+    print(f"{'page':>10} {'htmx':>5} {'uncached/s':>11} {'cached/s':>9} {'speedup':>8}")
+    for result in results:
+        print(
+            f"{result['page']:>10} {result['htmx']!s:>5} {result['uncached']:>11} "
+            f"{result['cached']:>9} {result['speedup']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
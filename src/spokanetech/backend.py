@@ -1,3 +1,4 @@
+from azure.storage.blob import BlobServiceClient
 from django.conf import settings
 from storages.backends.azure_storage import AzureStorage
 
@@ -10,6 +11,18 @@ class AzureMediaStorage(AzureStorage):
     azure_container = "media"
     expiration_secs = None
 
+    def _get_service_client(self) -> BlobServiceClient:
+        """Return a client that uploads media larger than `AZURE_UPLOAD_BLOCK_SIZE` a block at a time.
+
+        django-storages 1.14 has no setting for the client's options, so the client is built here.
+        """
+        return BlobServiceClient(
+            f"{self.azure_protocol}://{self.account_name}.blob.{self.endpoint_suffix}",
+            credential={"account_name": self.account_name, "account_key": self.account_key},
+            max_single_put_size=settings.AZURE_UPLOAD_BLOCK_SIZE,
+            max_block_size=settings.AZURE_UPLOAD_BLOCK_SIZE,
+        )
+
 
 class AzureStaticStorage(AzureStorage):
     """Azure static storage backend."""
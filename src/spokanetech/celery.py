@@ -12,13 +12,10 @@ if settings.CELERY_ENABLED:
     app.autodiscover_tasks()
 
     app.conf.beat_schedule = {
-        "Scrape Events from Meetup": {
-            "task": "web.tasks.scrape_events_from_meetup",
-            "schedule": crontab(hour="0", minute="0"),
-        },
-        "Scrape Events from Eventbrite": {
-            "task": "web.tasks.scrape_events_from_eventbrite",
-            "schedule": crontab(hour="0", minute="0"),
+        # Each tech group and organization is scraped on its own schedule; see `services.ScrapeScheduler`.
+        "Dispatch Due Scrapes": {
+            "task": "web.tasks.dispatch_due_scrapes",
+            "schedule": crontab(minute="*/5"),
         },
         "Send Events to Discord": {
             "task": "web.tasks.send_events_to_discord",
@@ -126,6 +126,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "web.view_cache.csrf_token_placeholder",
             ],
         },
     },
@@ -212,6 +213,8 @@ if USE_AZURE:
     STATIC_URL = f"https://{AZURE_CUSTOM_DOMAIN}/{STATIC_LOCATION}/"
     MEDIA_URL = f"https://{AZURE_CUSTOM_DOMAIN}/{MEDIA_LOCATION}/"
     MEDIA_UPLOAD_URL = f"https://{AZURE_CUSTOM_DOMAIN}/{MEDIA_LOCATION}"
+    # Media larger than one block is uploaded a block at a time, rather than read into memory whole.
+    AZURE_UPLOAD_BLOCK_SIZE = int(os.environ.get("AZURE_UPLOAD_BLOCK_SIZE", str(4 * 1024 * 1024)))
 else:
     STATIC_ROOT = BASE_DIR / "staticfiles"
 
@@ -250,12 +253,84 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
 
+# Cache
+# Shared by every process through Redis, by default the Celery broker's. Without Redis, each process has
+# its own cache, which pages saved by other processes (e.g. Celery workers scraping events) can't expire.
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "")
+if not CACHE_REDIS_URL and CELERY_ENABLED and CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+    CACHE_REDIS_URL = CELERY_BROKER_URL
+if CACHE_REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Pages are cached for this many seconds, or until the events, tech groups or tags they show change.
+# Upcoming events are listed as of when a page was cached. Set to 0 to disable.
+VIEW_CACHE_TIMEOUT = int(os.environ.get("VIEW_CACHE_TIMEOUT", "300"))
+# Browsers and proxies may reuse cached pages for anonymous visitors that have no CSRF token, e.g. HTMX
+# partials, for this many seconds without revalidating them. Other pages are revalidated every time.
+VIEW_CACHE_MAX_AGE = int(os.environ.get("VIEW_CACHE_MAX_AGE", "60"))
+
+
+# Pagination
+# Upcoming events are listed this many at a time, and more are loaded as the list is scrolled.
+EVENTS_PAGE_SIZE = int(os.environ.get("EVENTS_PAGE_SIZE", "24"))
+# Results per page of the JSON API, unless a request asks for fewer, or more up to `web.api.MAX_PAGE_SIZE`.
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", "50"))
+
+
 # Discord
 DISCORD_WEBHOOK_URL = os.environ["DISCORD_WEBHOOK_URL"]
 
 
 # Eventbrite
 EVENTBRITE_API_TOKEN = os.environ["EVENTBRITE_API_TOKEN"]
+EVENTBRITE_API_URL = os.environ.get("EVENTBRITE_API_URL", "https://www.eventbriteapi.com/v3/")
+
+
+# Meetup
+# Tech groups are scraped from Meetup if their homepage contains this.
+MEETUP_DOMAIN = os.environ.get("MEETUP_DOMAIN", "meetup.com")
+
+
+# Scraping
+# Total number of pages/images fetched at once, and the most fetched from any one host.
+SCRAPER_MAX_WORKERS = int(os.environ.get("SCRAPER_MAX_WORKERS", "8"))
+SCRAPER_MAX_CONNECTIONS_PER_HOST = int(os.environ.get("SCRAPER_MAX_CONNECTIONS_PER_HOST", "4"))
+# Transient failures (connection errors, 429s and 5xxs) are retried with exponential backoff.
+SCRAPER_HTTP_RETRIES = int(os.environ.get("SCRAPER_HTTP_RETRIES", "3"))
+SCRAPER_HTTP_BACKOFF_FACTOR = float(os.environ.get("SCRAPER_HTTP_BACKOFF_FACTOR", "0.5"))
+SCRAPER_HTTP_CONNECT_TIMEOUT = float(os.environ.get("SCRAPER_HTTP_CONNECT_TIMEOUT", "5"))
+SCRAPER_HTTP_TOTAL_TIMEOUT = float(os.environ.get("SCRAPER_HTTP_TOTAL_TIMEOUT", "30"))
+# Scraped pages are cached on disk so unchanged pages can be skipped. Set to an empty string to disable.
+SCRAPER_CACHE_DIR = os.environ.get("SCRAPER_CACHE_DIR", "" if IS_DEVELOPMENT else str(BASE_DIR / ".scraper_cache"))
+SCRAPER_CACHE_TTL = int(os.environ.get("SCRAPER_CACHE_TTL", str(7 * 24 * 60 * 60)))
+SCRAPER_CACHE_MAX_BYTES = int(os.environ.get("SCRAPER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Images are streamed to a temporary file, kept in memory up to SPOOL_BYTES. Larger images are skipped.
+SCRAPER_IMAGE_MAX_BYTES = int(os.environ.get("SCRAPER_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+SCRAPER_IMAGE_SPOOL_BYTES = int(os.environ.get("SCRAPER_IMAGE_SPOOL_BYTES", str(256 * 1024)))
+# Requests to each host are rate limited with a token bucket, which slows down while the host responds
+# with 429s. SCRAPER_HOST_RATE is in requests per second; set it to 0 for no limit.
+SCRAPER_HOST_RATE = float(os.environ.get("SCRAPER_HOST_RATE", "10"))
+SCRAPER_HOST_BURST = int(os.environ.get("SCRAPER_HOST_BURST", "20"))
+# After this many consecutive failures, requests to a host fail fast until it has had time to recover.
+SCRAPER_CIRCUIT_FAILURES = int(os.environ.get("SCRAPER_CIRCUIT_FAILURES", "5"))
+SCRAPER_CIRCUIT_RESET_SECONDS = float(os.environ.get("SCRAPER_CIRCUIT_RESET_SECONDS", "60"))
+# Rate limits and circuit breakers are shared by every worker through Redis, by default the Celery broker's.
+SCRAPER_THROTTLE_REDIS_URL = os.environ.get("SCRAPER_THROTTLE_REDIS_URL", "")
+if not SCRAPER_THROTTLE_REDIS_URL and CELERY_ENABLED and CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+    SCRAPER_THROTTLE_REDIS_URL = CELERY_BROKER_URL
+# Scraping is split into one Celery task per tech group/organization. These limit how often each
+# worker starts one, in Celery's rate limit format (e.g. "30/m"). Set to an empty string for no limit.
+SCRAPER_MEETUP_TASK_RATE_LIMIT = os.environ.get("SCRAPER_MEETUP_TASK_RATE_LIMIT", "30/m") or None
+SCRAPER_EVENTBRITE_TASK_RATE_LIMIT = os.environ.get("SCRAPER_EVENTBRITE_TASK_RATE_LIMIT", "30/m") or None
+# Each tech group and Eventbrite organization is scraped on its own schedule: as often as every MIN_INTERVAL
+# seconds while its events keep changing or one is coming up, and as rarely as every MAX_INTERVAL when it's
+# dormant. Every few minutes, up to BATCH_SIZE of each source's due groups are scraped.
+SCRAPER_SCHEDULE_MIN_INTERVAL = int(os.environ.get("SCRAPER_SCHEDULE_MIN_INTERVAL", str(60 * 60)))
+SCRAPER_SCHEDULE_MAX_INTERVAL = int(os.environ.get("SCRAPER_SCHEDULE_MAX_INTERVAL", str(7 * 24 * 60 * 60)))
+SCRAPER_SCHEDULE_BATCH_SIZE = int(os.environ.get("SCRAPER_SCHEDULE_BATCH_SIZE", "20"))
+# Eventbrite venue locations are cached in the database and refetched after this many seconds.
+SCRAPER_EVENTBRITE_VENUE_TTL = int(os.environ.get("SCRAPER_EVENTBRITE_VENUE_TTL", str(30 * 24 * 60 * 60)))
 
 
 # Markdownify
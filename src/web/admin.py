@@ -1,8 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import TruncDate
 from django.db.models.query import QuerySet
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 
-from web.models import Event, EventbriteOrganization, Tag, TechGroup
+from web.instrumentation import PHASES
+from web.models import (
+    Event,
+    EventbriteOrganization,
+    EventbriteVenue,
+    ScrapeRun,
+    ScrapeRunItem,
+    Tag,
+    TechGroup,
+)
 
 
 class TagAdmin(admin.ModelAdmin):
@@ -27,20 +44,165 @@ class EventAdmin(admin.ModelAdmin):
         return Event.all.all()
 
 
+class EventbriteVenueAdmin(admin.ModelAdmin):
+    list_display = ["eventbrite_id", "location", "updated_at"]
+    search_fields = ["eventbrite_id", "location"]
+
+
 class TechGroupAdmin(admin.ModelAdmin):
     list_display = [
         "name",
         "enabled",
         "homepage",
+        "last_scraped_at",
+        "next_scrape_at",
         "created_at",
         "updated_at",
     ]
     search_fields = ["id", "name", "homepage"]
     list_filter = ["enabled"]
+    readonly_fields = ["last_scraped_at", "last_changed_at", "change_rate", "next_scrape_at"]
+
+
+class EventbriteOrganizationAdmin(admin.ModelAdmin):
+    list_display = ["eventbrite_id", "tech_group", "last_scraped_at", "next_scrape_at"]
+    readonly_fields = ["last_scraped_at", "last_changed_at", "change_rate", "next_scrape_at"]
+
+
+class ScrapeRunItemInline(admin.TabularInline):
+    model = ScrapeRunItem
+    extra = 0
+    can_delete = False
+    fields = [
+        "tech_group",
+        "duration",
+        *(f"{phase}_seconds" for phase in PHASES),
+        "bytes_transferred",
+        "http_status_counts",
+        "rate_limit_wait_seconds",
+        "throttled",
+        "circuit_rejected",
+        "staleness",
+        "created",
+        "updated",
+        "unchanged",
+        "error",
+    ]
+    readonly_fields = fields
+
+    def has_add_permission(self, request: HttpRequest, obj=None) -> bool:
+        return False
+
+
+class ScrapeRunAdmin(admin.ModelAdmin):
+    change_list_template = "admin/web/scraperun/change_list.html"
+    list_display = [
+        "started_at",
+        "source",
+        "duration",
+        "events_per_second",
+        *(f"{phase}_seconds" for phase in PHASES),
+        "bytes_transferred",
+        "throttled",
+        "circuit_rejected",
+        "created",
+        "updated",
+        "unchanged",
+        "failed",
+    ]
+    list_filter = ["source"]
+    date_hierarchy = "started_at"
+    inlines = [ScrapeRunItemInline]
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj=None) -> bool:
+        return False
+
+    @admin.display(description="events/s")
+    def events_per_second(self, obj: ScrapeRun) -> str:
+        return f"{obj.events_per_second:.1f}"
+
+    def get_urls(self):
+        return [
+            path("trends/", self.admin_site.admin_view(self.trends_view), name="web_scraperun_trends"),
+            *super().get_urls(),
+        ]
+
+    def trends_view(self, request: HttpRequest) -> HttpResponse:
+        """Daily averages of each source's scrape runs, to make throughput regressions easy to spot."""
+        try:
+            days = max(1, int(request.GET.get("days", 30)))
+        except ValueError:
+            days = 30
+
+        rows = list(
+            ScrapeRun.objects.filter(started_at__gte=timezone.now() - timedelta(days=days))
+            .annotate(day=TruncDate("started_at"))
+            .values("day", "source")
+            .annotate(
+                runs=Count("id"),
+                total_duration=Sum("duration"),
+                events=Sum(F("created") + F("updated") + F("unchanged")),
+                bytes_transferred=Sum("bytes_transferred"),
+                failed=Sum("failed"),
+                **{f"{phase}_seconds": Avg(f"{phase}_seconds") for phase in PHASES},
+            )
+            .order_by("-day", "source")
+        )
+        for row in rows:
+            seconds = row["total_duration"].total_seconds() if row["total_duration"] else 0
+            row["average_duration"] = seconds / row["runs"]
+            row["events_per_second"] = row["events"] / seconds if seconds else 0.0
+            row["phases"] = [row[f"{phase}_seconds"] or 0.0 for phase in PHASES]
+        self._add_freshness(rows, days)
+        fastest = max((row["events_per_second"] for row in rows), default=0.0)
+        for row in rows:
+            row["throughput_percent"] = round(100 * row["events_per_second"] / fastest) if fastest else 0
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Scrape run trends",
+            "days": days,
+            "phases": [phase.replace("_", " ") for phase in PHASES],
+            "rows": rows,
+        }
+        return TemplateResponse(request, "admin/web/scraperun/trends.html", context)
+
+    def _add_freshness(self, rows: list[dict], days: int) -> None:
+        """Add how many groups were scraped each day, how stale they were and how many scrapes found changes.
+
+        Scrapes avoided are counted against scraping every group once a day.
+        """
+        items = (
+            ScrapeRunItem.objects.filter(run__started_at__gte=timezone.now() - timedelta(days=days))
+            .annotate(day=TruncDate("run__started_at"))
+            .values("day", "run__source")
+            .annotate(
+                scrapes=Count("id"),
+                changed=Count("id", filter=Q(created__gt=0) | Q(updated__gt=0)),
+                staleness=Avg("staleness"),
+            )
+        )
+        items_by_day = {(item["day"], item["run__source"]): item for item in items}
+        groups = {
+            ScrapeRun.Source.MEETUP: TechGroup.objects.filter(homepage__icontains=settings.MEETUP_DOMAIN).count(),
+            ScrapeRun.Source.EVENTBRITE: EventbriteOrganization.objects.count(),
+        }
+        for row in rows:
+            item = items_by_day.get((row["day"], row["source"]), {"scrapes": 0, "changed": 0, "staleness": None})
+            row["scrapes"] = item["scrapes"]
+            row["changed_percent"] = round(100 * item["changed"] / item["scrapes"]) if item["scrapes"] else 0
+            row["staleness_hours"] = item["staleness"].total_seconds() / 3600 if item["staleness"] else None
+            row["scrapes_avoided"] = groups.get(row["source"], 0) - item["scrapes"]
 
 
 # register models
 admin.site.register(Event, EventAdmin)
 admin.site.register(TechGroup, TechGroupAdmin)
 admin.site.register(Tag, TagAdmin)
-admin.site.register(EventbriteOrganization)
+admin.site.register(EventbriteOrganization, EventbriteOrganizationAdmin)
+admin.site.register(EventbriteVenue, EventbriteVenueAdmin)
+admin.site.register(ScrapeRun, ScrapeRunAdmin)
@@ -0,0 +1,312 @@
+"""A read-only JSON API for events, tech groups and tags, under /api/v1/.
+
+Every response is a JSON object with the results as `data`. Lists also have
+`next`, the URL of the next page, or null on the last page. Pages are found with
+a cursor rather than an offset, like the events list, and hold `limit` results,
+up to `MAX_PAGE_SIZE`.
+
+`fields` is a comma-separated list of the fields to return, from each
+resource's `fields`; all of them by default. Only the columns and related rows
+those fields need are queried, so e.g. `?fields=name,date_time` doesn't read
+descriptions or tags.
+
+Events are approved ones, from now on unless `start` is given, in order of
+date_time. They can be filtered with `start` and `end` (ISO dates or datetimes),
+`group` (tech group ids) and `tag` (tag ids, matched against effective tags),
+and `group` and `tag` can be repeated. Tech groups are enabled ones, and can be
+filtered on `tag`.
+
+Responses are cached by `view_cache`, like the HTML pages, and expired when
+the events, tech groups or tags they show change.
+"""
+
+import base64
+import binascii
+import dataclasses
+import datetime
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.db import models
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.duration import duration_iso_string
+from django.views import View
+
+from web import pagination, view_cache
+from web.models import Event, Tag, TechGroup
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidParameter(ValueError):
+    """A query parameter of an API request is invalid."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Field:
+    """A field of a resource, and what must be queried to serialize it."""
+
+    serialize: Callable[[Any, HttpRequest], Any]
+    only: tuple[str, ...] = ()
+    select_related: tuple[str, ...] = ()
+    prefetch_related: tuple[models.Prefetch | str, ...] = ()
+
+
+def _attribute(name: str) -> Field:
+    return Field(lambda obj, request: getattr(obj, name), only=(name,))
+
+
+def _image(obj: Event | TechGroup, request: HttpRequest) -> str | None:
+    return request.build_absolute_uri(obj.image.url) if obj.image else None
+
+
+def _web_url(obj: Event | TechGroup, request: HttpRequest) -> str:
+    return request.build_absolute_uri(obj.get_absolute_url())
+
+
+def _tag_values(tags: models.Manager) -> list[str]:
+    return [tag.value for tag in tags.all()]
+
+
+EVENT_FIELDS = {
+    "id": Field(lambda event, request: event.pk),
+    "name": _attribute("name"),
+    "description": _attribute("description"),
+    "description_html": _attribute("description_html"),
+    "date_time": Field(lambda event, request: timezone.localtime(event.date_time).isoformat(), only=("date_time",)),
+    "duration": Field(
+        lambda event, request: duration_iso_string(event.duration) if event.duration else None, only=("duration",)
+    ),
+    "location": _attribute("location"),
+    "url": _attribute("url"),
+    "group": Field(
+        lambda event, request: {"id": event.group.pk, "name": event.group.name} if event.group else None,
+        only=("group", "group__name"),
+        select_related=("group",),
+    ),
+    "tags": Field(
+        lambda event, request: _tag_values(event.effective_tags),
+        prefetch_related=(models.Prefetch("effective_tags", Tag.objects.only("value")),),
+    ),
+    "image": Field(_image, only=("image",)),
+    "web_url": Field(_web_url),
+}
+
+TECH_GROUP_FIELDS = {
+    "id": Field(lambda tech_group, request: tech_group.pk),
+    "name": _attribute("name"),
+    "description": _attribute("description"),
+    "homepage": _attribute("homepage"),
+    "icon": _attribute("icon"),
+    "tags": Field(
+        lambda tech_group, request: _tag_values(tech_group.tags),
+        prefetch_related=(models.Prefetch("tags", Tag.objects.only("value")),),
+    ),
+    "image": Field(_image, only=("image",)),
+    "web_url": Field(_web_url),
+}
+
+TAG_FIELDS = {
+    "id": Field(lambda tag, request: tag.pk),
+    "value": _attribute("value"),
+}
+
+
+class ApiView(view_cache.CachedViewMixin, View):
+    """Serialize objects of `model` with the `fields` requested."""
+
+    model: type[models.Model]
+    fields: dict[str, Field]
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except InvalidParameter as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    def get_fields(self) -> dict[str, Field]:
+        """Return the fields named in the `fields` query parameter, or all of them."""
+        if not (names := self.request.GET.get("fields")):
+            return self.fields
+        names = [name.strip() for name in names.split(",")]
+        if unknown := [name for name in names if name not in self.fields]:
+            raise InvalidParameter(f"Unknown fields: {', '.join(unknown)}")
+        return {name: self.fields[name] for name in names}
+
+    def get_queryset(self, fields: dict[str, Field]) -> models.QuerySet:
+        """Return `get_base_queryset()`, querying only what `fields` need."""
+        only = {"pk", *self.get_required_columns()}
+        select_related, prefetch_related = [], []
+        for field in fields.values():
+            only.update(field.only)
+            select_related.extend(field.select_related)
+            prefetch_related.extend(field.prefetch_related)
+        queryset = self.get_base_queryset().only(*only)
+        # select_related() without arguments would follow every foreign key.
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.prefetch_related(*prefetch_related)
+
+    def get_base_queryset(self) -> models.QuerySet:
+        return self.model._default_manager.all()
+
+    def get_required_columns(self) -> tuple[str, ...]:
+        """Return the columns needed whichever fields are requested, e.g. to paginate."""
+        return ()
+
+    def serialize(self, obj: models.Model, fields: dict[str, Field]) -> dict[str, Any]:
+        return {name: field.serialize(obj, self.request) for name, field in fields.items()}
+
+
+class ApiListView(ApiView):
+    """A page of objects, in order of primary key."""
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        fields = self.get_fields()
+        limit = self.get_limit()
+        queryset = self.filter_queryset(self.get_queryset(fields))
+        objects, next_cursor = self.paginate(queryset, request.GET.get(pagination.CURSOR_PARAM), limit)
+        next_url = None
+        if next_cursor:
+            query_params = request.GET.copy()
+            query_params[pagination.CURSOR_PARAM] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{query_params.urlencode()}")
+        return JsonResponse({"data": [self.serialize(obj, fields) for obj in objects], "next": next_url})
+
+    def get_limit(self) -> int:
+        try:
+            limit = int(self.request.GET.get("limit", settings.API_PAGE_SIZE))
+        except ValueError as e:
+            raise InvalidParameter("limit must be a number") from e
+        return max(1, min(limit, MAX_PAGE_SIZE))
+
+    def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        return queryset
+
+    def paginate(self, queryset: models.QuerySet, cursor: str | None, limit: int) -> tuple[list, str | None]:
+        """Return the `limit` objects after `cursor`, and the cursor of the next page if there is one."""
+        queryset = queryset.order_by("pk")
+        if cursor:
+            queryset = queryset.filter(pk__gt=_decode_pk(cursor))
+        # One more than a page is fetched to tell whether there's a next page, without counting.
+        objects = list(queryset[: limit + 1])
+        if len(objects) <= limit:
+            return objects, None
+        objects = objects[:limit]
+        return objects, _encode_pk(objects[-1].pk)
+
+
+class ApiDetailView(ApiView):
+    """A single object."""
+
+    def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        fields = self.get_fields()
+        try:
+            obj = self.get_queryset(fields).get(pk=pk)
+        except self.model.DoesNotExist:
+            return JsonResponse({"error": f"{self.model._meta.verbose_name} {pk} does not exist"}, status=404)
+        return JsonResponse({"data": self.serialize(obj, fields)})
+
+
+class EventsMixin:
+    model = Event
+    fields = EVENT_FIELDS
+
+    def get_required_columns(self) -> tuple[str, ...]:
+        return ("date_time",)
+
+
+class ListEvents(EventsMixin, ApiListView):
+    cache_models = (Event, TechGroup, Tag)
+
+    def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        query_params = self.request.GET
+        queryset = queryset.filter(date_time__gte=_parse_date_time(query_params, "start") or timezone.localtime())
+        if end := _parse_date_time(query_params, "end"):
+            queryset = queryset.filter(date_time__lt=end)
+        if groups := _parse_ids(query_params, "group"):
+            queryset = queryset.filter(group__in=groups)
+        if tags := _parse_ids(query_params, "tag"):
+            queryset = queryset.filter_effective_tags(tags)
+        return queryset
+
+    def paginate(self, queryset: models.QuerySet, cursor: str | None, limit: int) -> tuple[list, str | None]:
+        try:
+            decoded = pagination.Cursor.decode(cursor) if cursor else None
+        except ValueError as e:
+            raise InvalidParameter(str(e)) from e
+        page = pagination.paginate(queryset, decoded, limit)
+        return page.object_list, page.next_cursor.encode() if page.next_cursor else None
+
+
+class DetailEvent(EventsMixin, ApiDetailView):
+    def get_cache_dependencies(self) -> list[str]:
+        return [
+            view_cache.dependency(Event, self.kwargs["pk"]),
+            view_cache.dependency(TechGroup),
+            view_cache.dependency(Tag),
+        ]
+
+
+class TechGroupsMixin:
+    model = TechGroup
+    fields = TECH_GROUP_FIELDS
+
+    def get_base_queryset(self) -> models.QuerySet:
+        return TechGroup.objects.filter(enabled=True)
+
+
+class ListTechGroups(TechGroupsMixin, ApiListView):
+    cache_models = (TechGroup, Tag)
+
+    def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        if tags := _parse_ids(self.request.GET, "tag"):
+            queryset = queryset.filter(tags__in=tags).distinct()
+        return queryset
+
+
+class DetailTechGroup(TechGroupsMixin, ApiDetailView):
+    def get_cache_dependencies(self) -> list[str]:
+        return [view_cache.dependency(TechGroup, self.kwargs["pk"]), view_cache.dependency(Tag)]
+
+
+class ListTags(ApiListView):
+    model = Tag
+    fields = TAG_FIELDS
+    cache_models = (Tag,)
+
+
+def _encode_pk(pk: int) -> str:
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def _decode_pk(value: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidParameter(f"Invalid cursor: {value!r}") from e
+
+
+def _parse_ids(query_params, name: str) -> list[int]:
+    try:
+        return [int(value) for value in query_params.getlist(name)]
+    except ValueError as e:
+        raise InvalidParameter(f"{name} must be ids") from e
+
+
+def _parse_date_time(query_params, name: str) -> datetime.datetime | None:
+    """Parse an ISO datetime, or an ISO date as midnight, in the current time zone if it has none."""
+    if not (value := query_params.get(name)):
+        return None
+    try:
+        date_time = parse_datetime(value)
+        if date_time is None and (date := parse_date(value)):
+            date_time = datetime.datetime.combine(date, datetime.time())
+    except ValueError:
+        date_time = None
+    if date_time is None:
+        raise InvalidParameter(f"{name} must be an ISO date or datetime")
+    return timezone.make_aware(date_time) if timezone.is_naive(date_time) else date_time
@@ -0,0 +1,78 @@
+import collections
+import contextlib
+import contextvars
+import itertools
+import threading
+import urllib.parse
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class HostLimiter:
+    """Limit the number of in-flight requests to any single host.
+
+    A limiter is shared by every thread that makes requests, so the limit
+    applies across all of the scrapers running in a process.
+    """
+
+    def __init__(self, max_per_host: int) -> None:
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1")
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+
+    @contextlib.contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """Block until a request to the URL's host is allowed."""
+        with self._get_semaphore(urllib.parse.urlsplit(url).netloc):
+            yield
+
+    def _get_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            try:
+                return self._semaphores[host]
+            except KeyError:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+                return semaphore
+
+
+def map_concurrently(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+) -> Iterator[tuple[T, R]]:
+    """Call `fn` on every item using a thread pool.
+
+    Results are yielded in the same order as `items` so that callers can
+    consume them (e.g. write them to the database) from the calling thread.
+    If `fn` raises, the pending calls are cancelled and the error is re-raised.
+    Each call runs in a copy of the calling thread's context variables.
+
+    At most `2 * max_workers` calls are submitted ahead of the caller, so
+    results (e.g. downloaded images) don't pile up faster than they are consumed.
+    """
+    items = iter(items)
+    window = 2 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures: collections.deque[tuple[T, Future[R]]] = collections.deque()
+
+        def submit(count: int) -> None:
+            for item in itertools.islice(items, count):
+                futures.append((item, executor.submit(contextvars.copy_context().run, fn, item)))
+
+        submit(window)
+        try:
+            while futures:
+                item, future = futures.popleft()
+                result = future.result()
+                submit(1)
+                yield item, result
+        finally:
+            for _, future in futures:
+                future.cancel()
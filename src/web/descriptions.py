@@ -0,0 +1,27 @@
+"""Rendering of event descriptions into the HTML shown on pages.
+
+Descriptions are Markdown, or HTML from Eventbrite, which is sanitized by
+`markdownify` with the `MARKDOWNIFY` settings. That's slow for long
+descriptions, so it's done when an event is saved rather than whenever a
+page shows it. The text of the HTML, without its markup, is what's searched.
+"""
+
+import html
+
+from django.template.defaultfilters import truncatewords_html
+from django.utils.html import strip_tags
+from markdownify.templatetags.markdownify import markdownify
+
+EXCERPT_WORDS = 50
+
+
+def render(description: str | None) -> tuple[str, str]:
+    """Return the description as sanitized HTML, and an excerpt of it with at most `EXCERPT_WORDS` words."""
+    html = str(markdownify(description or ""))
+    return html, truncatewords_html(html, EXCERPT_WORDS)
+
+
+def text(description_html: str) -> str:
+    """Return the words of rendered HTML, without its tags, separated by single spaces."""
+    # Tags are replaced by a space, so that e.g. the words of adjacent paragraphs aren't joined.
+    return " ".join(html.unescape(strip_tags(description_html.replace("<", " <"))).split())
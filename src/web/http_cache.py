@@ -0,0 +1,272 @@
+import dataclasses
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from typing import IO
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseTooLarge(requests.RequestException):
+    """A response body was larger than the caller allows."""
+
+
+def iter_body(
+    response: requests.Response, max_bytes: int | None = None, chunk_size: int = 64 * 1024
+) -> Iterator[bytes]:
+    """Iterate over the body of a streamed response in chunks.
+
+    Raises `ResponseTooLarge` as soon as the body is known to be larger than `max_bytes`.
+    """
+    content_length = response.headers.get("Content-Length", "")
+    if max_bytes is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise ResponseTooLarge(f"{response.url} is {content_length} bytes, more than {max_bytes}", response=response)
+    size = 0
+    for chunk in response.iter_content(chunk_size):
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise ResponseTooLarge(f"{response.url} is more than {max_bytes} bytes", response=response)
+        yield chunk
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """Counters describing how well the response cache is working."""
+
+    hits: int = 0
+    """Requests answered with 304 Not Modified."""
+    misses: int = 0
+    """Requests that downloaded a full body."""
+    unchanged: int = 0
+    """Full downloads whose body was identical to the cached one."""
+    bytes_saved: int = 0
+    """Body bytes that did not need to be downloaded thanks to a 304."""
+
+    def __sub__(self, other: "CacheStats") -> "CacheStats":
+        return CacheStats(**{f.name: getattr(self, f.name) - getattr(other, f.name) for f in dataclasses.fields(self)})
+
+
+@dataclasses.dataclass
+class CacheEntry:
+    url: str
+    etag: str
+    last_modified: str
+    content_hash: str
+    size: int
+    fetched_at: float
+    content_type: str = ""
+
+
+class ResponseCache:
+    """A filesystem-backed cache of response bodies and their validators.
+
+    The cache lets the HTTP client send conditional requests
+    (`If-None-Match`/`If-Modified-Since`) and tells callers when a page is
+    unchanged since the last time it was fetched, so they can skip parsing it.
+
+    Entries older than `ttl` seconds are ignored, so every page is fully
+    re-fetched at least that often, and the oldest entries are evicted once the
+    cache grows past `max_bytes`. Files are written atomically, so a cache can be
+    shared by the threads of a process.
+    """
+
+    def __init__(self, directory: str | os.PathLike, ttl: float, max_bytes: int) -> None:
+        self.directory = pathlib.Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    def get(
+        self, session: requests.Session, url: str, max_bytes: int | None = None, commit: bool = True, **kwargs
+    ) -> requests.Response:
+        """Send a (conditional) GET request and cache the response.
+
+        The returned response always has a body. It has an extra `unchanged`
+        attribute which is True when the body is the same as the cached one,
+        and responses answered with 304 have a `from_cache` attribute set to True.
+
+        With `stream=True`, the body is streamed to the cache rather than read
+        into memory, and the returned response streams it back from the cache.
+        `ResponseTooLarge` is raised if it's larger than `max_bytes`.
+
+        With `commit=False`, a new body is kept aside and only becomes the
+        cached one once `commit` is called, e.g. when what was scraped from it
+        has been saved. Until then, the page isn't `unchanged` the next time.
+        """
+        stream = kwargs.get("stream", False)
+        entry = self._load_entry(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = session.get(url, headers=headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            cached_response = self._replay(entry, response, stream)
+            if cached_response is not None:
+                self._count(hits=1, bytes_saved=entry.size)
+                return cached_response
+            response.close()
+            response = session.get(url, **kwargs)  # The cached body is gone; fetch it again.
+
+        response.unchanged = False  # type: ignore
+        if response.status_code == 200:
+            body_path = self._path(url).with_suffix(".body" if commit else ".pending.body")
+            if stream:
+                content_hash, size = self._save_streamed_body(body_path, response, max_bytes)
+            else:
+                content_hash, size = hashlib.sha256(response.content).hexdigest(), len(response.content)
+                self._write_atomic(body_path, response.content)
+            response.unchanged = entry is not None and entry.content_hash == content_hash  # type: ignore
+            self._count(misses=1, unchanged=int(response.unchanged))  # type: ignore
+            self._save_entry(url, response, content_hash, size, ".json" if commit else ".pending.json")
+        return response
+
+    def commit(self, url: str) -> None:
+        """Make the body kept aside by `get(url, commit=False)` the cached one, if there is one."""
+        path = self._path(url)
+        if not path.with_suffix(".pending.json").exists():
+            return
+        # The old metadata is removed first, so it never describes the new body.
+        path.with_suffix(".json").unlink(missing_ok=True)
+        try:
+            os.replace(path.with_suffix(".pending.body"), path.with_suffix(".body"))
+            os.replace(path.with_suffix(".pending.json"), path.with_suffix(".json"))
+        except FileNotFoundError:
+            pass  # Committed by another thread.
+
+    def forget(self, url: str) -> None:
+        """Delete the cached body of `url`, so that it's fetched in full and isn't `unchanged` the next time."""
+        path = self._path(url)
+        for suffix in (".json", ".body", ".pending.json", ".pending.body"):
+            path.with_suffix(suffix).unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Delete expired entries, then the oldest entries until the cache fits in `max_bytes`.
+
+        Returns the number of entries deleted.
+        """
+        now = time.time()
+        entries: list[tuple[float, int, pathlib.Path]] = []
+        for metadata_path in self.directory.glob("*/*.json"):
+            try:
+                entry = CacheEntry(**json.loads(metadata_path.read_text()))
+            except (OSError, ValueError, TypeError):
+                continue
+            entries.append((entry.fetched_at, entry.size, metadata_path))
+
+        deleted = 0
+        total_bytes = sum(size for _, size, _ in entries)
+        for fetched_at, size, metadata_path in sorted(entries):
+            if now - fetched_at <= self.ttl and total_bytes <= self.max_bytes:
+                break
+            metadata_path.unlink(missing_ok=True)
+            metadata_path.with_suffix(".body").unlink(missing_ok=True)
+            total_bytes -= size
+            deleted += 1
+        return deleted
+
+    def _path(self, url: str) -> pathlib.Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / key[:2] / key
+
+    def _load_entry(self, url: str) -> CacheEntry | None:
+        try:
+            entry = CacheEntry(**json.loads(self._path(url).with_suffix(".json").read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.url != url or time.time() - entry.fetched_at > self.ttl:
+            return None
+        return entry
+
+    def _save_entry(
+        self, url: str, response: requests.Response, content_hash: str, size: int, suffix: str = ".json"
+    ) -> None:
+        # This is called once the body is written, so that metadata never points at a missing or stale body.
+        entry = CacheEntry(
+            url=url,
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+            content_hash=content_hash,
+            size=size,
+            fetched_at=time.time(),
+            content_type=response.headers.get("Content-Type", ""),
+        )
+        self._write_atomic(self._path(url).with_suffix(suffix), json.dumps(dataclasses.asdict(entry)).encode())
+
+    def _save_streamed_body(
+        self, path: pathlib.Path, response: requests.Response, max_bytes: int | None
+    ) -> tuple[str, int]:
+        """Stream a response's body to `path`, then make the response stream it from there."""
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = tempfile.NamedTemporaryFile(dir=path.parent, delete=False)  # noqa: SIM115
+            try:
+                with temp_file:
+                    for chunk in iter_body(response, max_bytes):
+                        temp_file.write(chunk)
+                        sha256.update(chunk)
+                        size += len(chunk)
+                # Open the body before moving it into place, so that this response reads
+                # this body even if another thread saves a newer one in the meantime.
+                body = open(temp_file.name, "rb")  # noqa: SIM115
+            except BaseException:
+                os.unlink(temp_file.name)
+                raise
+        finally:
+            response.close()
+        os.replace(temp_file.name, path)
+        self._stream_from(response, body)
+        return sha256.hexdigest(), size
+
+    def _replay(self, entry: CacheEntry, not_modified: requests.Response, stream: bool) -> requests.Response | None:
+        body_path = self._path(entry.url).with_suffix(".body")
+        response = requests.Response()
+        try:
+            if stream:
+                self._stream_from(response, open(body_path, "rb"))  # noqa: SIM115
+            else:
+                response._content = body_path.read_bytes()
+        except OSError:
+            return None
+
+        response.status_code = 200
+        response.url = entry.url
+        # The headers describing the body are the cached body's, not the 304's.
+        response.headers = CaseInsensitiveDict(not_modified.headers)
+        response.headers["Content-Length"] = str(entry.size)
+        if entry.content_type:
+            response.headers["Content-Type"] = entry.content_type
+        response.request = not_modified.request
+        response.unchanged = True  # type: ignore
+        response.from_cache = True  # type: ignore
+        return response
+
+    def _stream_from(self, response: requests.Response, file: IO[bytes]) -> None:
+        """Make a response stream its body from a file. `iter_content()` reads from `raw`."""
+        response.raw = file
+        response._content = False
+        response._content_consumed = False
+
+    def _write_atomic(self, path: pathlib.Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as temp_file:
+            temp_file.write(data)
+        os.replace(temp_file.name, path)
+
+    def _count(self, **counts: int) -> None:
+        with self._stats_lock:
+            for name, count in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + count)
@@ -0,0 +1,149 @@
+import functools
+from typing import IO
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, Timeout
+
+from web import instrumentation
+from web.concurrency import HostLimiter
+from web.http_cache import ResponseCache, ResponseTooLarge, iter_body
+from web.throttle import CircuitOpen, HostThrottle
+
+__all__ = ["CircuitOpen", "HttpClient", "ResponseTooLarge", "UnexpectedContentType", "get_default_client"]
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UnexpectedContentType(requests.RequestException):
+    """A response wasn't the type of content the caller asked for."""
+
+
+class HttpClient:
+    """A pooled HTTP client shared by the scrapers and the Eventbrite API client.
+
+    Connections are kept alive and reused per host. Requests that fail to
+    connect, time out or return a transient status (429/5xx) are retried with
+    exponential backoff and jitter, honoring any `Retry-After` header.
+
+    Requests are also rate limited per host by `throttle`, which slows down for
+    hosts that respond with 429s and fails fast (raising `CircuitOpen`) for
+    hosts that keep failing. By default it's configured from settings.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections_per_host: int | None = None,
+        retries: int | None = None,
+        backoff_factor: float | None = None,
+        connect_timeout: float | None = None,
+        total_timeout: float | None = None,
+        response_cache: ResponseCache | None = None,
+        throttle: HostThrottle | None = None,
+    ) -> None:
+        max_connections_per_host = max_connections_per_host or settings.SCRAPER_MAX_CONNECTIONS_PER_HOST
+        if backoff_factor is None:
+            backoff_factor = settings.SCRAPER_HTTP_BACKOFF_FACTOR
+        retry = Retry(
+            total=settings.SCRAPER_HTTP_RETRIES if retries is None else retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=max_connections_per_host, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = Timeout(
+            connect=connect_timeout or settings.SCRAPER_HTTP_CONNECT_TIMEOUT,
+            total=total_timeout or settings.SCRAPER_HTTP_TOTAL_TIMEOUT,
+        )
+        self.host_limiter = HostLimiter(max_connections_per_host)
+        self.response_cache = response_cache
+        self.throttle = throttle or HostThrottle.from_settings()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request, waiting for a free connection to the host if needed."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self.throttle.limit(url), self.host_limiter.limit(url):
+            response = self.session.get(url, **kwargs)
+        self.throttle.record(url, response)
+        instrumentation.record_response(response)
+        return response
+
+    def get_cached(self, url: str, commit: bool = True, **kwargs) -> requests.Response:
+        """Like `get`, but go through the response cache if there is one.
+
+        The response has an extra `unchanged` attribute which is True when the
+        body is the same as the last time it was fetched. See `ResponseCache.get`
+        for `commit`.
+        """
+        if self.response_cache is None:
+            response = self.get(url, **kwargs)
+            response.unchanged = False  # type: ignore
+            return response
+
+        kwargs.setdefault("timeout", self.timeout)
+        with self.throttle.limit(url), self.host_limiter.limit(url):
+            response = self.response_cache.get(self.session, url, commit=commit, **kwargs)
+        self.throttle.record(url, response)
+        instrumentation.record_response(response)
+        return response
+
+    def download(
+        self,
+        url: str,
+        file: IO[bytes],
+        *,
+        max_bytes: int,
+        content_type: str = "",
+        **kwargs,
+    ) -> requests.Response:
+        """Like `get_cached`, but stream the body into `file` instead of reading it into memory.
+
+        Raises `HTTPError` for error statuses, `UnexpectedContentType` if the
+        response's Content-Type doesn't start with `content_type`, and
+        `ResponseTooLarge` if the body is larger than `max_bytes`. The returned
+        response has no content.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        size = 0
+        with self.throttle.limit(url), self.host_limiter.limit(url):
+            if self.response_cache is None:
+                response = self.session.get(url, stream=True, **kwargs)
+                response.unchanged = False  # type: ignore
+            else:
+                response = self.response_cache.get(self.session, url, max_bytes=max_bytes, stream=True, **kwargs)
+            self.throttle.record(url, response)
+            try:
+                response.raise_for_status()
+                if not response.headers.get("Content-Type", "").startswith(content_type):
+                    raise UnexpectedContentType(
+                        f"{url} is {response.headers.get('Content-Type')!r}, not {content_type!r}", response=response
+                    )
+                for chunk in iter_body(response, max_bytes):
+                    file.write(chunk)
+                    size += len(chunk)
+            finally:
+                response.close()
+                instrumentation.record_response(response, size)
+        return response
+
+
+@functools.cache
+def get_default_client() -> HttpClient:
+    """Return the HTTP client shared by everything in this process."""
+    response_cache = None
+    if settings.SCRAPER_CACHE_DIR:
+        response_cache = ResponseCache(
+            settings.SCRAPER_CACHE_DIR,
+            ttl=settings.SCRAPER_CACHE_TTL,
+            max_bytes=settings.SCRAPER_CACHE_MAX_BYTES,
+        )
+    return HttpClient(response_cache=response_cache)
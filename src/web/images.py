@@ -0,0 +1,112 @@
+import hashlib
+import io
+import logging
+from typing import IO, NamedTuple
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+def digest(content: bytes) -> str:
+    """Return the SHA-256 hex digest of an image's contents."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_digest(file: IO[bytes], chunk_size: int = 64 * 1024) -> tuple[str, int]:
+    """Return the SHA-256 hex digest and size of a file, reading it in chunks."""
+    sha256 = hashlib.sha256()
+    size = 0
+    while chunk := file.read(chunk_size):
+        sha256.update(chunk)
+        size += len(chunk)
+    return sha256.hexdigest(), size
+
+
+# Widths of the resized copies of each image, which cover event cards and event pages
+# at 1x and 2x pixel density on most screens.
+RENDITION_WIDTHS = (400, 800, 1600)
+RENDITION_QUALITY = 80
+
+
+class Rendition(NamedTuple):
+    width: int
+    height: int
+    format: str
+
+    def name(self, image_sha256: str) -> str:
+        """Return the storage name of the rendition of an image."""
+        return f"renditions/{image_sha256}/{self.width}w.{self.format}"
+
+
+def open_image(file: IO[bytes]) -> Image.Image:
+    """Open an image, rotated as its EXIF orientation says. Raises `ValueError` if Pillow can't read it."""
+    try:
+        with Image.open(file) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Could not read image: {e}") from e
+    return image
+
+
+def plan_renditions(image: Image.Image) -> list[Rendition]:
+    """Return the renditions of an image: each of `RENDITION_WIDTHS`, as WebP and as JPEG (or PNG, if it's transparent).
+
+    Images are never enlarged. An image narrower than a rendition width gets a
+    rendition at its own width instead.
+    """
+    fallback_format = "png" if _is_transparent(image) else "jpeg"
+    widths = [width for width in RENDITION_WIDTHS if width < image.width]
+    if image.width <= RENDITION_WIDTHS[-1]:
+        widths.append(image.width)
+    return [
+        Rendition(width, max(round(image.height * width / image.width), 1), format)
+        for width in widths
+        for format in ("webp", fallback_format)
+    ]
+
+
+def resize(image: Image.Image, width: int, height: int) -> Image.Image:
+    """Resize an image for a rendition, in a mode that WebP, JPEG and PNG can all store."""
+    image = image.convert("RGBA" if _is_transparent(image) else "RGB")
+    if width == image.width:
+        return image
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def encode(image: Image.Image, format: str) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=format, quality=RENDITION_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def _is_transparent(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def save_renditions(storage: Storage, image_sha256: str, file: IO[bytes]) -> list[dict]:
+    """Make and store the renditions of an image, and return where they were stored.
+
+    Renditions are named after the digest of the image, so an image used more
+    than once (such as a group's logo on all of its events) is only resized and
+    stored once. Returns an empty list if the file isn't an image.
+    """
+    try:
+        image = open_image(file)
+    except ValueError:
+        logger.warning("Could not make renditions of image %s", image_sha256, exc_info=True)
+        return []
+
+    stored = []
+    resized: dict[int, Image.Image] = {}
+    for rendition in plan_renditions(image):
+        name = rendition.name(image_sha256)
+        if not storage.exists(name):
+            if rendition.width not in resized:
+                resized[rendition.width] = resize(image, rendition.width, rendition.height)
+            name = storage.save(name, ContentFile(encode(resized[rendition.width], rendition.format)))
+        stored.append({"name": name, **rendition._asdict()})
+    return stored
@@ -0,0 +1,111 @@
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+from collections.abc import Iterator
+
+import requests
+
+PHASES = ("fetch", "parse", "image_download", "storage_upload", "db_write")
+
+
+class ScrapeMetrics:
+    """Time spent in each phase of a scrape, bytes downloaded, HTTP status counts and throttling.
+
+    Metrics are recorded from every thread working on a scrape, so phase
+    durations add up the time spent by all threads and can exceed the run's
+    wall-clock time.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.bytes_transferred = 0
+        self.status_counts: collections.Counter[str] = collections.Counter()
+        self.rate_limit_wait_seconds = 0.0
+        self.throttled = 0
+        self.circuit_rejected = 0
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[name] += elapsed
+
+    def record_response(self, response: requests.Response, size: int | None = None) -> None:
+        # Responses replayed from the response cache were answered with a 304 and no body.
+        from_cache = getattr(response, "from_cache", False)
+        with self._lock:
+            self.status_counts[str(304 if from_cache else response.status_code)] += 1
+            if not from_cache:
+                self.bytes_transferred += len(response.content) if size is None else size
+
+    def record_throttling(self, wait_seconds: float = 0.0, throttled: int = 0, circuit_rejected: int = 0) -> None:
+        with self._lock:
+            self.rate_limit_wait_seconds += wait_seconds
+            self.throttled += throttled
+            self.circuit_rejected += circuit_rejected
+
+    def as_dict(self) -> dict:
+        """Return the metrics in a JSON serializable form."""
+        with self._lock:
+            return {
+                "seconds": dict(self.seconds),
+                "bytes_transferred": self.bytes_transferred,
+                "status_counts": dict(self.status_counts),
+                "rate_limit_wait_seconds": self.rate_limit_wait_seconds,
+                "throttled": self.throttled,
+                "circuit_rejected": self.circuit_rejected,
+            }
+
+
+_current_metrics: contextvars.ContextVar[ScrapeMetrics | None] = contextvars.ContextVar("current_metrics", default=None)
+
+
+@contextlib.contextmanager
+def collect() -> Iterator[ScrapeMetrics]:
+    """Record the metrics of everything scraped in the block.
+
+    Work submitted with `map_concurrently` is recorded too, since it runs in
+    a copy of the submitting thread's context.
+    """
+    metrics = ScrapeMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to a phase of the current scrape, if metrics are being collected."""
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(name):
+        yield
+
+
+def record_response(response: requests.Response, size: int | None = None) -> None:
+    """Count a response in the current scrape's metrics, if metrics are being collected.
+
+    `size` is the size of the body of a streamed response, which can't be read again.
+    """
+    if metrics := _current_metrics.get():
+        metrics.record_response(response, size)
+
+
+def record_throttling(wait_seconds: float = 0.0, throttled: int = 0, circuit_rejected: int = 0) -> None:
+    """Count time spent waiting for rate limits, 429 responses and requests refused by circuit breakers.
+
+    These are recorded in the current scrape's metrics, if metrics are being collected.
+    """
+    if metrics := _current_metrics.get():
+        metrics.record_throttling(wait_seconds, throttled, circuit_rejected)
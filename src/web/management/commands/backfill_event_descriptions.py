@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from web import view_cache
+from web.models import Event
+
+
+class Command(BaseCommand):
+    help = "Render the descriptions of events saved before descriptions were rendered when saved."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="render every event's description again, e.g. after the MARKDOWNIFY settings change",
+        )
+
+    def handle(self, *args, batch_size: int, all: bool, **options) -> None:
+        queryset = Event.all.exclude(description=None).exclude(description="").order_by("pk")
+        if not all:
+            queryset = queryset.filter(description_html="")
+        queryset = queryset.only("pk", "description")
+
+        pks = []
+        last_pk = 0
+        while batch := list(queryset.filter(pk__gt=last_pk)[:batch_size]):
+            for event in batch:
+                event.render_description()
+            Event.all.bulk_update(batch, Event.RENDERED_DESCRIPTION_FIELDS)
+            pks.extend(event.pk for event in batch)
+            last_pk = batch[-1].pk
+
+        if pks:
+            # Bulk updates don't send the signals that expire cached pages.
+            view_cache.invalidate(Event, pks)
+        self.stdout.write(f"Rendered the descriptions of {len(pks)} events.")
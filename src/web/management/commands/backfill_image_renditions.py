@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import models
+
+from web import images
+from web.models import Event, TechGroup
+
+
+class Command(BaseCommand):
+    help = "Make resized renditions of Event and TechGroup images saved before renditions were made."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, batch_size: int, **options) -> None:
+        for queryset in (Event.all.all(), TechGroup.objects.all()):
+            count = self.backfill(queryset, batch_size)
+            self.stdout.write(f"Made renditions of {count} {queryset.model._meta.verbose_name_plural} images.")
+
+    def backfill(self, queryset: models.QuerySet, batch_size: int) -> int:
+        queryset = queryset.exclude(image="").exclude(image=None).filter(image_renditions=[]).order_by("pk")
+        count = 0
+        last_pk = 0
+        while batch := list(queryset.filter(pk__gt=last_pk)[:batch_size]):
+            for obj in batch:
+                try:
+                    with obj.image.open("rb") as file:
+                        if not obj.image_sha256:
+                            obj.image_sha256, obj.image_size = images.file_digest(file)
+                            file.seek(0)
+                        obj.image_renditions = images.save_renditions(obj.image.storage, obj.image_sha256, file)
+                except OSError as e:
+                    self.stderr.write(f"Could not read image for {obj!r}: {e}")
+            queryset.model._base_manager.bulk_update(batch, ["image_sha256", "image_size", "image_renditions"])
+            count += sum(1 for obj in batch if obj.image_renditions)
+            last_pk = batch[-1].pk
+        return count
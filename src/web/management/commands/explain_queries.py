@@ -0,0 +1,114 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, models
+from django.utils import timezone
+
+from web import pagination
+from web.models import Event, Tag, TechGroup
+
+
+def list_events(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """The first page of `ListEvents`."""
+    return pagination.seek(Event.objects.filter(date_time__gte=now), None)[: settings.EVENTS_PAGE_SIZE + 1]
+
+
+def list_events_next_page(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """A later page of `ListEvents`."""
+    cursor = pagination.Cursor(now + timedelta(days=30), 0)
+    return pagination.seek(Event.objects.filter(date_time__gte=now), cursor)[: settings.EVENTS_PAGE_SIZE + 1]
+
+
+def list_events_tags(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """The first page of `ListEvents`, filtered on tags."""
+    queryset = Event.objects.filter(date_time__gte=now).filter_effective_tags(tags)
+    return pagination.seek(queryset, None)[: settings.EVENTS_PAGE_SIZE + 1]
+
+
+def sidebar(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """The upcoming events in `BuildSidebar`."""
+    return Event.objects.filter(date_time__gte=now).order_by("date_time")
+
+
+def tech_group_events(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """The upcoming events prefetched by `DetailTechGroup`."""
+    return Event.objects.filter(group__in=[group], date_time__gte=now)
+
+
+def calendar(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """A month of `EventCalendarView`."""
+    return Event.objects.filter(date_time__year=now.year, date_time__month=now.month)
+
+
+def discord_events(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """The week of events sent by `DiscordService.send_events`."""
+    return (
+        Event.objects.filter(date_time__gte=now, date_time__lt=now + timedelta(days=7))
+        .select_related("group")
+        .order_by("date_time")
+    )
+
+
+def next_group_event(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """A tech group's next event, found by `ScrapeScheduler` to schedule its next scrape."""
+    return Event.all.filter(group=group, date_time__gt=now).order_by("date_time").values_list("date_time")[:1]
+
+
+def scraped_events(now: datetime, group: int, tags: list[int]) -> models.QuerySet:
+    """The stored fingerprints of scraped events, read by `EventService.save_results`."""
+    return Event.all.filter(external_id__in=["1", "2", "3"]).values_list("external_id", "scrape_fingerprint")
+
+
+QUERIES: dict[str, Callable[[datetime, int, list[int]], models.QuerySet]] = {
+    query.__name__: query
+    for query in (
+        list_events,
+        list_events_next_page,
+        list_events_tags,
+        sidebar,
+        tech_group_events,
+        calendar,
+        discord_events,
+        next_group_event,
+        scraped_events,
+    )
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plans of the queries that read events most often, "
+        "to check which indexes they use after changing the schema."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "queries",
+            nargs="*",
+            metavar="query",
+            help=f"queries to explain, out of {', '.join(QUERIES)}; defaults to all of them",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="run the queries and show the rows and time each step took (PostgreSQL only)",
+        )
+
+    def handle(self, *args, queries: list[str], analyze: bool, **options) -> None:
+        if unknown := set(queries) - set(QUERIES):
+            raise CommandError(f"Unknown queries: {', '.join(sorted(unknown))}")
+        if analyze and connection.vendor != "postgresql":
+            raise CommandError("--analyze is only supported on PostgreSQL.")
+
+        now = timezone.localtime()
+        # The plans don't depend on whether these exist.
+        group = TechGroup.objects.values_list("pk", flat=True).first() or 0
+        tags = list(Tag.objects.values_list("pk", flat=True)[:3]) or [0]
+        for name in queries or QUERIES:
+            queryset = QUERIES[name](now, group, tags)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**({"analyze": True, "buffers": True} if analyze else {})))
+            self.stdout.write("")
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0014_event_image_techgroup_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='image_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='image_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='image_source_url',
+            field=models.URLField(blank=True, editable=False, help_text='URL the image was downloaded from, if it was scraped', max_length=2048),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='image_sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='image_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='image_source_url',
+            field=models.URLField(blank=True, editable=False, help_text='URL the image was downloaded from, if it was scraped', max_length=2048),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:55
+
+import django.apps
+from django.db import migrations, models
+
+
+def migrate(apps: django.apps.registry.Apps, schema_editor) -> None:
+    """Make external_id unique: blank IDs become NULL, and only the newest of any duplicates keeps its ID."""
+    Event = apps.get_model("web", "Event")
+    Event.objects.filter(external_id="").update(external_id=None)
+    duplicates = (
+        Event.objects.exclude(external_id=None)
+        .values("external_id")
+        .annotate(newest_pk=models.Max("pk"), count=models.Count("pk"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        Event.objects.filter(external_id=duplicate["external_id"]).exclude(pk=duplicate["newest_pk"]).update(
+            external_id=None
+        )
+
+
+def reverse(apps, schema_editor) -> None:
+    pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0015_image_digests'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrate, reverse),
+        migrations.AlterField(
+            model_name='event',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='ID field for tracking a unique external event', max_length=1024, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0016_event_external_id_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventbriteVenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eventbrite_id', models.CharField(max_length=256, unique=True)),
+                ('location', models.CharField(max_length=1024)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0017_eventbritevenue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='scrape_fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Digest of the scraped data this event was last saved from, used to skip unchanged events', max_length=64),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:04
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0018_event_scrape_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration', models.DurationField(default=datetime.timedelta)),
+                ('fetch_seconds', models.FloatField(default=0, help_text='time spent fetching pages and API responses')),
+                ('parse_seconds', models.FloatField(default=0, help_text='time spent parsing pages')),
+                ('image_download_seconds', models.FloatField(default=0, help_text='time spent downloading images')),
+                ('storage_upload_seconds', models.FloatField(default=0, help_text='time spent reading and writing image storage')),
+                ('db_write_seconds', models.FloatField(default=0, help_text='time spent saving events to the database')),
+                ('bytes_transferred', models.PositiveBigIntegerField(default=0)),
+                ('http_status_counts', models.JSONField(blank=True, default=dict)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('unchanged', models.PositiveIntegerField(default=0)),
+                ('source', models.CharField(choices=[('meetup', 'Meetup'), ('eventbrite', 'Eventbrite')], max_length=32)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('failed', models.PositiveIntegerField(default=0, help_text='number of groups that could not be scraped')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['source', 'started_at'], name='web_scraper_source_3a6329_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrapeRunItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration', models.DurationField(default=datetime.timedelta)),
+                ('fetch_seconds', models.FloatField(default=0, help_text='time spent fetching pages and API responses')),
+                ('parse_seconds', models.FloatField(default=0, help_text='time spent parsing pages')),
+                ('image_download_seconds', models.FloatField(default=0, help_text='time spent downloading images')),
+                ('storage_upload_seconds', models.FloatField(default=0, help_text='time spent reading and writing image storage')),
+                ('db_write_seconds', models.FloatField(default=0, help_text='time spent saving events to the database')),
+                ('bytes_transferred', models.PositiveBigIntegerField(default=0)),
+                ('http_status_counts', models.JSONField(blank=True, default=dict)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('unchanged', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='web.scraperun')),
+                ('tech_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='web.techgroup')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0019_scraperun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Resized copies of the image, made by `images.save_renditions`'),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Resized copies of the image, made by `images.save_renditions`'),
+        ),
+    ]
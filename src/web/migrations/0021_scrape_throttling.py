@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0020_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scraperun',
+            name='circuit_rejected',
+            field=models.PositiveIntegerField(default=0, help_text='number of requests not sent because the host kept failing'),
+        ),
+        migrations.AddField(
+            model_name='scraperun',
+            name='rate_limit_wait_seconds',
+            field=models.FloatField(default=0, help_text='time spent waiting for per-host rate limits'),
+        ),
+        migrations.AddField(
+            model_name='scraperun',
+            name='throttled',
+            field=models.PositiveIntegerField(default=0, help_text='number of 429 Too Many Requests responses'),
+        ),
+        migrations.AddField(
+            model_name='scraperunitem',
+            name='circuit_rejected',
+            field=models.PositiveIntegerField(default=0, help_text='number of requests not sent because the host kept failing'),
+        ),
+        migrations.AddField(
+            model_name='scraperunitem',
+            name='rate_limit_wait_seconds',
+            field=models.FloatField(default=0, help_text='time spent waiting for per-host rate limits'),
+        ),
+        migrations.AddField(
+            model_name='scraperunitem',
+            name='throttled',
+            field=models.PositiveIntegerField(default=0, help_text='number of 429 Too Many Requests responses'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0021_scrape_throttling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventbriteorganization',
+            name='change_rate',
+            field=models.FloatField(default=0.5, editable=False, help_text='moving average of how often scrapes find new or updated events'),
+        ),
+        migrations.AddField(
+            model_name='eventbriteorganization',
+            name='last_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='when a scrape last found new or updated events', null=True),
+        ),
+        migrations.AddField(
+            model_name='eventbriteorganization',
+            name='last_scraped_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventbriteorganization',
+            name='next_scrape_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='when events are next scraped; empty means as soon as possible', null=True),
+        ),
+        migrations.AddField(
+            model_name='scraperunitem',
+            name='staleness',
+            field=models.DurationField(blank=True, help_text='time since the group was last scraped, or empty if it never was', null=True),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='change_rate',
+            field=models.FloatField(default=0.5, editable=False, help_text='moving average of how often scrapes find new or updated events'),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='last_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='when a scrape last found new or updated events', null=True),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='last_scraped_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='techgroup',
+            name='next_scrape_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='when events are next scraped; empty means as soon as possible', null=True),
+        ),
+    ]
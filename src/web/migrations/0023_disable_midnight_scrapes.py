@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:29
+
+import django.apps
+from django.db import migrations
+
+MIDNIGHT_SCRAPES = ["Scrape Events from Meetup", "Scrape Events from Eventbrite"]
+
+
+def migrate(apps: django.apps.registry.Apps, schema_editor) -> None:
+    """Disable the midnight scrapes of every group, now that each group is scraped on its own schedule.
+
+    The database scheduler keeps periodic tasks that were removed from `beat_schedule`.
+    """
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name__in=MIDNIGHT_SCRAPES).update(enabled=False)
+
+
+def reverse(apps: django.apps.registry.Apps, schema_editor) -> None:
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name__in=MIDNIGHT_SCRAPES).update(enabled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0022_scrape_schedule'),
+        ('django_celery_beat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrate, reverse)
+    ]
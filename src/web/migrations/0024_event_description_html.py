@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0023_disable_midnight_scrapes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='description_excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='the start of `description_html`, shown in lists of events'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False, help_text='`description` rendered to sanitized HTML when the event is saved'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0024_event_description_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='effective_tags',
+            field=models.ManyToManyField(blank=True, editable=False, help_text="the event's own tags, or its group's if it has none; kept up to date by `web.signals`", related_name='effective_events', to='web.tag'),
+        ),
+    ]
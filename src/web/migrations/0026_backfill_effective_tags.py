@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:47
+
+import django.apps
+from django.db import migrations
+
+
+def migrate(apps: django.apps.registry.Apps, schema_editor) -> None:
+    """Set every event's effective tags: its own tags, or its group's if it has none."""
+    Event = apps.get_model("web", "Event")
+    EventTag = Event.tags.through
+    EffectiveTag = Event.effective_tags.through
+
+    tags = set(EventTag.objects.values_list("event_id", "tag_id"))
+    tags.update(
+        Event.objects.filter(group__tags__isnull=False)
+        .exclude(pk__in=EventTag.objects.values("event_id"))
+        .values_list("pk", "group__tags")
+    )
+    EffectiveTag.objects.bulk_create(
+        [EffectiveTag(event_id=event_id, tag_id=tag_id) for event_id, tag_id in tags],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0025_event_effective_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrate, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0026_backfill_effective_tags'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='web_event_approve_979e74_idx',
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='group',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='web.techgroup'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('approved_at__isnull', False)), fields=['date_time', 'id'], name='web_event_approved_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['group', 'date_time'], name='web_event_group_date_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0027_event_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_keywords',
+            field=models.TextField(blank=True, editable=False, help_text="names of the event's tech group and effective tags, searched by `web.search`"),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:06
+
+import collections
+
+import django.apps
+from django.db import migrations
+
+# The SQL of web.search.install() and uninstall() when this migration was written. It's copied rather than
+# imported so that later changes to the search index don't change what this migration did.
+POSTGRESQL_INSTALL = [
+    "ALTER TABLE web_event ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(search_keywords, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(location, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description_html, '')), 'D')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS web_event_search_vector_idx ON web_event USING GIN (search_vector)",
+]
+POSTGRESQL_UNINSTALL = [
+    "DROP INDEX IF EXISTS web_event_search_vector_idx",
+    "ALTER TABLE web_event DROP COLUMN IF EXISTS search_vector",
+]
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS web_event_fts USING fts5("
+    "name, search_keywords, location, description_html, "
+    "content='web_event', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER web_event_fts_insert AFTER INSERT ON web_event BEGIN "
+    "INSERT INTO web_event_fts(rowid, name, search_keywords, location, description_html) "
+    "VALUES (new.id, new.name, new.search_keywords, new.location, new.description_html); "
+    "END",
+    "CREATE TRIGGER web_event_fts_delete AFTER DELETE ON web_event BEGIN "
+    "INSERT INTO web_event_fts(web_event_fts, rowid, name, search_keywords, location, description_html) "
+    "VALUES ('delete', old.id, old.name, old.search_keywords, old.location, old.description_html); "
+    "END",
+    "CREATE TRIGGER web_event_fts_update AFTER UPDATE OF name, search_keywords, location, description_html "
+    "ON web_event BEGIN "
+    "INSERT INTO web_event_fts(web_event_fts, rowid, name, search_keywords, location, description_html) "
+    "VALUES ('delete', old.id, old.name, old.search_keywords, old.location, old.description_html); "
+    "INSERT INTO web_event_fts(rowid, name, search_keywords, location, description_html) "
+    "VALUES (new.id, new.name, new.search_keywords, new.location, new.description_html); "
+    "END",
+    "INSERT INTO web_event_fts(web_event_fts) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS web_event_fts_insert",
+    "DROP TRIGGER IF EXISTS web_event_fts_delete",
+    "DROP TRIGGER IF EXISTS web_event_fts_update",
+    "DROP TABLE IF EXISTS web_event_fts",
+]
+
+
+def set_search_keywords(apps: django.apps.registry.Apps, schema_editor) -> None:
+    """Set every event's search keywords: the names of its tech group and effective tags."""
+    Event = apps.get_model("web", "Event")
+    EffectiveTag = Event.effective_tags.through
+
+    names = collections.defaultdict(list)
+    for event_id, value in EffectiveTag.objects.values_list("event_id", "tag__value"):
+        names[event_id].append(value)
+    events = [
+        Event(pk=pk, search_keywords=" ".join([group_name or "", *sorted(names[pk])]).strip())
+        for pk, group_name in Event.objects.values_list("pk", "group__name")
+    ]
+    Event.objects.bulk_update([event for event in events if event.search_keywords], ["search_keywords"], batch_size=500)
+
+
+def _execute(schema_editor, statements: dict[str, list[str]]) -> None:
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def install_search_index(apps: django.apps.registry.Apps, schema_editor) -> None:
+    _execute(schema_editor, {"postgresql": POSTGRESQL_INSTALL, "sqlite": SQLITE_INSTALL})
+
+
+def uninstall_search_index(apps: django.apps.registry.Apps, schema_editor) -> None:
+    _execute(schema_editor, {"postgresql": POSTGRESQL_UNINSTALL, "sqlite": SQLITE_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0028_event_search_keywords'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_search_keywords, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.0.8 on 2026-10-17 17:32
+
+import html
+
+import django.apps
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+
+def search_index_sql(description_column: str) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+    """Return the SQL that creates and drops the search index of events, by database vendor.
+
+    This is the SQL of web.search.install() and uninstall() when this migration was written, indexing
+    `description_column`. It's copied rather than imported so that later changes to the search index
+    don't change what this migration did.
+    """
+    columns = f"name, search_keywords, location, {description_column}"
+    new = f"new.id, new.name, new.search_keywords, new.location, new.{description_column}"
+    old = f"'delete', old.id, old.name, old.search_keywords, old.location, old.{description_column}"
+    # description_column is one of this migration's column names, never user input.
+    insert = f"INSERT INTO web_event_fts(rowid, {columns}) VALUES ({new});"  # nosec B608
+    delete = f"INSERT INTO web_event_fts(web_event_fts, rowid, {columns}) VALUES ({old});"  # nosec B608
+    install = {
+        "postgresql": [
+            "ALTER TABLE web_event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(search_keywords, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(location, '')), 'C') || "
+            f"setweight(to_tsvector('english', coalesce({description_column}, '')), 'D')"
+            ") STORED",
+            "CREATE INDEX web_event_search_vector_idx ON web_event USING GIN (search_vector)",
+        ],
+        "sqlite": [
+            f"CREATE VIRTUAL TABLE web_event_fts USING fts5({columns}, "
+            "content='web_event', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER web_event_fts_insert AFTER INSERT ON web_event BEGIN {insert} END",
+            f"CREATE TRIGGER web_event_fts_delete AFTER DELETE ON web_event BEGIN {delete} END",
+            f"CREATE TRIGGER web_event_fts_update AFTER UPDATE OF {columns} ON web_event BEGIN {delete} {insert} END",
+            "INSERT INTO web_event_fts(web_event_fts) VALUES ('rebuild')",
+        ],
+    }
+    uninstall = {
+        "postgresql": [
+            "DROP INDEX IF EXISTS web_event_search_vector_idx",
+            "ALTER TABLE web_event DROP COLUMN IF EXISTS search_vector",
+        ],
+        "sqlite": [
+            "DROP TRIGGER IF EXISTS web_event_fts_insert",
+            "DROP TRIGGER IF EXISTS web_event_fts_delete",
+            "DROP TRIGGER IF EXISTS web_event_fts_update",
+            "DROP TABLE IF EXISTS web_event_fts",
+        ],
+    }
+    return install, uninstall
+
+
+def set_description_text(apps: django.apps.registry.Apps, schema_editor) -> None:
+    """Set every event's description text: its rendered description without the tags, as web.descriptions.text()."""
+    Event = apps.get_model("web", "Event")
+    events = [
+        Event(pk=pk, description_text=" ".join(html.unescape(strip_tags(description_html.replace("<", " <"))).split()))
+        for pk, description_html in Event.objects.exclude(description_html="").values_list("pk", "description_html")
+    ]
+    Event.objects.bulk_update(events, ["description_text"], batch_size=500)
+
+
+def _reindex(schema_editor, old_column: str, new_column: str) -> None:
+    """Replace the search index of `old_column` with one of `new_column`."""
+    vendor = schema_editor.connection.vendor
+    _, uninstall = search_index_sql(old_column)
+    install, _ = search_index_sql(new_column)
+    for statement in [*uninstall.get(vendor, []), *install.get(vendor, [])]:
+        schema_editor.execute(statement)
+
+
+def index_description_text(apps: django.apps.registry.Apps, schema_editor) -> None:
+    _reindex(schema_editor, "description_html", "description_text")
+
+
+def index_description_html(apps: django.apps.registry.Apps, schema_editor) -> None:
+    _reindex(schema_editor, "description_text", "description_html")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0029_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='description_text',
+            field=models.TextField(blank=True, editable=False, help_text='the text of `description_html`, searched by `web.search`'),
+        ),
+        migrations.RunPython(set_description_text, migrations.RunPython.noop),
+        # Descriptions were indexed with their markup, so e.g. "href" and "strong" matched almost every event.
+        migrations.RunPython(index_description_text, index_description_html),
+    ]
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import functools
+import collections
+from datetime import timedelta
 
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from handyhelpers.models import HandyHelperBaseModel
 
+from web import descriptions, images
+
 
 class Tag(HandyHelperBaseModel):
     """A Tag that describes attributes of a Event."""
@@ -19,7 +22,67 @@ class Tag(HandyHelperBaseModel):
         return self.value
 
 
-class TechGroup(HandyHelperBaseModel):
+class ImageDigestMixin(models.Model):
+    """Keep a digest of `image` so it can be compared without downloading it from storage."""
+
+    image_sha256 = models.CharField(max_length=64, blank=True, editable=False)
+    image_size = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    image_source_url = models.URLField(
+        max_length=2048,
+        blank=True,
+        editable=False,
+        help_text="URL the image was downloaded from, if it was scraped",
+    )
+    image_renditions = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="Resized copies of the image, made by `images.save_renditions`",
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs) -> None:
+        if not self.image:
+            self.image_sha256, self.image_size, self.image_source_url = "", None, ""
+            self.image_renditions = []
+        elif not self.image._committed:
+            # A newly uploaded image, e.g. from a form or the admin.
+            self.image_sha256, self.image_size = images.file_digest(self.image)
+            self.image.seek(0)
+            self.image_renditions = images.save_renditions(self.image.storage, self.image_sha256, self.image)
+            self.image.seek(0)
+            self.image_source_url = ""
+        super().save(*args, **kwargs)
+
+
+class ScrapeScheduleMixin(models.Model):
+    """When a source of events was last scraped, how often its events change and when it's next scraped.
+
+    See `services.ScrapeScheduler`.
+    """
+
+    next_scrape_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        help_text="when events are next scraped; empty means as soon as possible",
+    )
+    last_scraped_at = models.DateTimeField(blank=True, null=True, editable=False)
+    last_changed_at = models.DateTimeField(
+        blank=True, null=True, editable=False, help_text="when a scrape last found new or updated events"
+    )
+    change_rate = models.FloatField(
+        default=0.5, editable=False, help_text="moving average of how often scrapes find new or updated events"
+    )
+
+    class Meta:
+        abstract = True
+
+
+class TechGroup(ImageDigestMixin, ScrapeScheduleMixin, HandyHelperBaseModel):
     """A group that organizes events."""
 
     name = models.CharField(max_length=1024, unique=True)
@@ -45,22 +108,67 @@ class TechGroup(HandyHelperBaseModel):
 
 
 class EventQuerySet(models.QuerySet):
-    def filter_group_tags(self, tags: list[str]):
-        return self.filter(
-            models.Q(tags=None)
-            & functools.reduce(
-                lambda a, b: a | b,
-                (models.Q(group__tags__in=tag_id) for tag_id in tags),
-            ),
-        )
+    def filter_effective_tags(self, tags: list[str]):
+        """Return the events whose effective tags include any of `tags`."""
+        EffectiveTag = self.model.effective_tags.through
+        return self.filter(pk__in=EffectiveTag.objects.filter(tag_id__in=tags).values("event_id"))
+
+    def update_effective_tags(self, batch_size: int = 500) -> None:
+        """Set the effective tags of these events: their own tags, or their group's if they have none."""
+        EventTag = self.model.tags.through
+        EffectiveTag = self.model.effective_tags.through
+        pks = list(self.values_list("pk", flat=True))
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            tags = set(EventTag.objects.filter(event_id__in=batch).values_list("event_id", "tag_id"))
+            with_own_tags = {event_id for event_id, _ in tags}
+            tags.update(
+                self.model._base_manager.filter(pk__in=batch, group__tags__isnull=False)
+                .exclude(pk__in=with_own_tags)
+                .values_list("pk", "group__tags")
+            )
+            with transaction.atomic(savepoint=False):
+                existing = {
+                    (event_id, tag_id): pk
+                    for pk, event_id, tag_id in EffectiveTag.objects.filter(event_id__in=batch).values_list(
+                        "pk", "event_id", "tag_id"
+                    )
+                }
+                if stale := [pk for key, pk in existing.items() if key not in tags]:
+                    EffectiveTag.objects.filter(pk__in=stale).delete()
+                EffectiveTag.objects.bulk_create(
+                    [EffectiveTag(event_id=event_id, tag_id=tag_id) for event_id, tag_id in tags - existing.keys()],
+                    ignore_conflicts=True,
+                )
+
+    def update_search_keywords(self, batch_size: int = 500) -> None:
+        """Set the search keywords of these events: the names of their tech group and effective tags."""
+        EffectiveTag = self.model.effective_tags.through
+        pks = list(self.values_list("pk", flat=True))
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            names = collections.defaultdict(list)
+            for event_id, value in EffectiveTag.objects.filter(event_id__in=batch).values_list(
+                "event_id", "tag__value"
+            ):
+                names[event_id].append(value)
+            changed = []
+            for pk, group_name, keywords in self.model._base_manager.filter(pk__in=batch).values_list(
+                "pk", "group__name", "search_keywords"
+            ):
+                new_keywords = " ".join([group_name or "", *sorted(names[pk])]).strip()
+                if new_keywords != keywords:
+                    changed.append(self.model(pk=pk, search_keywords=new_keywords))
+            self.model._base_manager.bulk_update(changed, ["search_keywords"])
 
 
 class ApprovedEventManager(models.Manager):
     def get_queryset(self):
-        return super().get_queryset().exclude(approved_at=None)
+        # `IS NOT NULL` rather than `NOT (... IS NULL)`, which SQLite doesn't match to Event's partial indexes.
+        return super().get_queryset().filter(approved_at__isnull=False)
 
 
-class Event(HandyHelperBaseModel):
+class Event(ImageDigestMixin, HandyHelperBaseModel):
     """An event on a specific day and time.
 
     Note: Event.objects filters out unapproved events by default. Use
@@ -69,6 +177,15 @@ class Event(HandyHelperBaseModel):
 
     name = models.CharField(max_length=1024)
     description = models.TextField(blank=True, null=True)
+    description_html = models.TextField(
+        blank=True, editable=False, help_text="`description` rendered to sanitized HTML when the event is saved"
+    )
+    description_excerpt = models.TextField(
+        blank=True, editable=False, help_text="the start of `description_html`, shown in lists of events"
+    )
+    description_text = models.TextField(
+        blank=True, editable=False, help_text="the text of `description_html`, searched by `web.search`"
+    )
     date_time = models.DateTimeField(auto_now=False, auto_now_add=False, help_text="")
     duration = models.DurationField(
         blank=True,
@@ -90,29 +207,153 @@ class Event(HandyHelperBaseModel):
         max_length=1024,
         blank=True,
         null=True,
+        unique=True,
         help_text="ID field for tracking a unique external event",
     )
-    group = models.ForeignKey(TechGroup, blank=True, null=True, on_delete=models.SET_NULL)
+    # Indexed by web_event_group_date_idx.
+    group = models.ForeignKey(TechGroup, blank=True, null=True, on_delete=models.SET_NULL, db_index=False)
     tags = models.ManyToManyField(Tag, blank=True)
+    effective_tags = models.ManyToManyField(
+        Tag,
+        blank=True,
+        editable=False,
+        related_name="effective_events",
+        help_text="the event's own tags, or its group's if it has none; kept up to date by `web.signals`",
+    )
+    search_keywords = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="names of the event's tech group and effective tags, searched by `web.search`",
+    )
     approved_at = models.DateTimeField(blank=True, null=True)
     image = models.ImageField(upload_to="tech_events/", blank=True, null=True)
+    scrape_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="Digest of the scraped data this event was last saved from, used to skip unchanged events",
+    )
 
     objects = ApprovedEventManager.from_queryset(EventQuerySet)()
     all = EventQuerySet.as_manager()
 
+    # Fields set from `description` by `render_description()`.
+    RENDERED_DESCRIPTION_FIELDS = ("description_html", "description_excerpt", "description_text")
+
     class Meta:
         indexes = [
-            models.Index(fields=["approved_at"]),
+            # Almost every page lists approved events from now on, in order of date_time. pk breaks ties for
+            # keyset pagination. Unapproved events are few and only read by staff, so they're left out.
+            models.Index(
+                fields=["date_time", "id"],
+                condition=models.Q(approved_at__isnull=False),
+                name="web_event_approved_date_idx",
+            ),
+            # A tech group's upcoming events, approved or not. Also serves as the index on the foreign key.
+            models.Index(fields=["group", "date_time"], name="web_event_group_date_idx"),
         ]
 
     def __str__(self) -> str:
         return self.name  # type: ignore
 
+    def save(self, *args, **kwargs) -> None:
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "description" in update_fields:
+            self.render_description()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *self.RENDERED_DESCRIPTION_FIELDS}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self) -> str:
         return reverse("web:get_event", kwargs={"pk": self.pk})
 
+    def render_description(self) -> None:
+        """Render `description` into `description_html`, `description_excerpt` and `description_text`."""
+        self.description_html, self.description_excerpt = descriptions.render(self.description)
+        self.description_text = descriptions.text(self.description_html)
 
-class EventbriteOrganization(models.Model):
+
+class EventbriteOrganization(ScrapeScheduleMixin, models.Model):
     tech_group = models.ForeignKey(TechGroup, on_delete=models.CASCADE)
     url = models.URLField()
     eventbrite_id = models.CharField(max_length=256)
+
+
+class EventbriteVenue(models.Model):
+    """A cache of Eventbrite venue locations, so venues don't have to be fetched on every scrape."""
+
+    eventbrite_id = models.CharField(max_length=256, unique=True)
+    location = models.CharField(max_length=1024)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return self.location
+
+
+class ScrapeStats(models.Model):
+    """Where time went during a scrape, how much was downloaded and what was saved.
+
+    Phase durations add up the time spent by every thread, so together they can
+    exceed the wall-clock duration.
+    """
+
+    duration = models.DurationField(default=timedelta)
+    fetch_seconds = models.FloatField(default=0, help_text="time spent fetching pages and API responses")
+    parse_seconds = models.FloatField(default=0, help_text="time spent parsing pages")
+    image_download_seconds = models.FloatField(default=0, help_text="time spent downloading images")
+    storage_upload_seconds = models.FloatField(default=0, help_text="time spent reading and writing image storage")
+    db_write_seconds = models.FloatField(default=0, help_text="time spent saving events to the database")
+    bytes_transferred = models.PositiveBigIntegerField(default=0)
+    http_status_counts = models.JSONField(default=dict, blank=True)
+    rate_limit_wait_seconds = models.FloatField(default=0, help_text="time spent waiting for per-host rate limits")
+    throttled = models.PositiveIntegerField(default=0, help_text="number of 429 Too Many Requests responses")
+    circuit_rejected = models.PositiveIntegerField(
+        default=0, help_text="number of requests not sent because the host kept failing"
+    )
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def events_per_second(self) -> float:
+        seconds = self.duration.total_seconds()
+        return (self.created + self.updated + self.unchanged) / seconds if seconds else 0.0
+
+
+class ScrapeRun(ScrapeStats):
+    """A scheduled scrape of every tech group on a source."""
+
+    class Source(models.TextChoices):
+        MEETUP = "meetup", "Meetup"
+        EVENTBRITE = "eventbrite", "Eventbrite"
+
+    source = models.CharField(max_length=32, choices=Source.choices)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    failed = models.PositiveIntegerField(default=0, help_text="number of groups that could not be scraped")
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["source", "started_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_source_display()} scrape at {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class ScrapeRunItem(ScrapeStats):
+    """The scrape of one tech group (or Eventbrite organization) during a `ScrapeRun`."""
+
+    run = models.ForeignKey(ScrapeRun, on_delete=models.CASCADE, related_name="items")
+    tech_group = models.ForeignKey(TechGroup, blank=True, null=True, on_delete=models.SET_NULL)
+    error = models.TextField(blank=True)
+    staleness = models.DurationField(
+        blank=True, null=True, help_text="time since the group was last scraped, or empty if it never was"
+    )
+
+    def __str__(self) -> str:
+        return f"{self.tech_group or 'Deleted tech group'} in {self.run}"
@@ -0,0 +1,80 @@
+"""Keyset pagination of events, in order of `(date_time, pk)`.
+
+Instead of an offset, each page's URL has a cursor: the `date_time` and `pk` of
+the last event on the page before it. The next page is the events after that
+one, which the database finds by seeking in the index rather than counting past
+every earlier event, so every page costs the same. Events added or removed
+while someone is scrolling don't shift the pages they haven't seen yet.
+"""
+
+import base64
+import binascii
+import dataclasses
+import datetime
+from collections.abc import Iterator
+
+from django.db import models
+
+CURSOR_PARAM = "cursor"
+
+
+@dataclasses.dataclass(frozen=True)
+class Cursor:
+    """The position after the event with this `date_time` and `pk`."""
+
+    date_time: datetime.datetime
+    pk: int
+
+    def encode(self) -> str:
+        value = f"{self.date_time.isoformat()}|{self.pk}"
+        return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """Return the cursor encoded in `value`. Raises `ValueError` if it isn't one."""
+        try:
+            decoded = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+            date_time, pk = decoded.split("|")
+            cursor = cls(datetime.datetime.fromisoformat(date_time), int(pk))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {value!r}") from e
+        if cursor.date_time.tzinfo is None:
+            raise ValueError(f"Invalid cursor: {value!r}")
+        return cursor
+
+
+@dataclasses.dataclass
+class Page:
+    """A page of events, iterated over like the queryset it came from."""
+
+    object_list: list
+    next_cursor: Cursor | None
+    next_url: str = ""
+
+    def __iter__(self) -> Iterator:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+def seek(queryset: models.QuerySet, cursor: Cursor | None) -> models.QuerySet:
+    """Order `queryset` by `(date_time, pk)`, starting after `cursor`."""
+    queryset = queryset.order_by("date_time", "pk")
+    if cursor is None:
+        return queryset
+    # The redundant `date_time >= ` bounds the range scanned in an index on `date_time`, which the OR can't.
+    return queryset.filter(date_time__gte=cursor.date_time).filter(
+        models.Q(date_time__gt=cursor.date_time) | models.Q(pk__gt=cursor.pk)
+    )
+
+
+def paginate(queryset: models.QuerySet, cursor: Cursor | None, page_size: int) -> Page:
+    """Return the page of `page_size` events after `cursor`, with the cursor of the next page if there is one."""
+    queryset = seek(queryset, cursor)
+    # One more than a page is fetched to tell whether there's a next page, without counting.
+    events = list(queryset[: page_size + 1])
+    if len(events) <= page_size:
+        return Page(events, None)
+    events = events[:page_size]
+    return Page(events, Cursor(events[-1].date_time, events[-1].pk))
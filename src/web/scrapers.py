@@ -1,11 +1,15 @@
 import functools
+import io
 import json
+import logging
 import pathlib
 import re
+import tempfile
 import urllib.parse
 import zoneinfo
+from collections.abc import Callable
 from datetime import datetime, timedelta
-from typing import Any, Protocol, TypeAlias, TypeVar
+from typing import IO, Any, NamedTuple, Protocol, TypeAlias, TypeVar
 
 import eventbrite.access_methods
 import requests
@@ -14,8 +18,14 @@ from bs4.element import Tag
 from django.conf import settings
 from django.utils import timezone
 from eventbrite import Eventbrite
+from eventbrite.decorators import objectify
+from eventbrite.utils import format_path
 
-from web import models
+from web import images, instrumentation, models
+from web.concurrency import map_concurrently
+from web.http_client import HttpClient, ResponseTooLarge, UnexpectedContentType, get_default_client
+
+logger = logging.getLogger(__name__)
 
 ST = TypeVar("ST", covariant=True)
 
@@ -34,23 +44,110 @@ setattr(eventbrite.access_methods.AccessMethodsMixin, "get_venue", get_venue)
 setattr(eventbrite.access_methods.AccessMethodsMixin, "get_event_description", get_event_description)
 
 
+class EventbriteClient(Eventbrite):
+    """Eventbrite API client that sends its requests through our shared `HttpClient`."""
+
+    def __init__(self, oauth_token: str, http_client: HttpClient) -> None:
+        super().__init__(oauth_token, settings.EVENTBRITE_API_URL)
+        self.http_client = http_client
+
+    @objectify
+    def get(self, path, data=None, expand=()):
+        headers = self.headers
+        headers.pop("content-type", None)
+        path = format_path(path, self.eventbrite_api_url)
+
+        data = data or {}
+        if not data.get("expand"):
+            data["expand"] = ",".join(expand) if expand else "none"
+        with instrumentation.phase("fetch"):
+            return self.http_client.get(path, headers=headers, params=data)
+
+
+@functools.cache
+def timezones_by_abbreviation() -> dict[str, zoneinfo.ZoneInfo]:
+    """Map timezone abbreviations, like "PST" and "PDT", to a timezone that uses them.
+
+    Loading every timezone is slow, so the index is built once per process, on
+    first use. Abbreviations in effect in January and July are both included,
+    so the index stays correct across daylight saving time changes.
+    """
+    # See https://gist.github.com/ajosephau/2a22698faaf6206ce195c7aa78e48247
+    year = datetime.now().year
+    dates = [datetime(year, 1, 1), datetime(year, 7, 1)]
+    index: dict[str, zoneinfo.ZoneInfo] = {}
+    for key in sorted(zoneinfo.available_timezones()):
+        tz = zoneinfo.ZoneInfo(key)
+        for date in dates:
+            if abbreviation := tz.tzname(date):
+                index.setdefault(abbreviation, tz)
+    return index
+
+
+class PageUnchanged(Exception):
+    """The page is unchanged since it was last scraped, so there is nothing new to save."""
+
+
 class Scraper(Protocol[ST]):
     def scrape(self, url: str) -> ST:
         """Scrape the URL and return a typed object."""
         ...
 
 
-ImageResult: TypeAlias = tuple[str, bytes]
+class ImageResult(NamedTuple):
+    name: str
+    file: IO[bytes]
+    """The downloaded image, which is closed once the image is saved."""
+    sha256: str
+    size: int
+    source_url: str = ""
+    unchanged: bool = False
+    """True when the image at `source_url` is the same as the last time it was downloaded."""
+
+    @classmethod
+    def from_content(cls, name: str, content: bytes, source_url: str = "", unchanged: bool = False) -> "ImageResult":
+        return cls(name, io.BytesIO(content), images.digest(content), len(content), source_url, unchanged)
+
+
 EventScraperResult: TypeAlias = tuple[models.Event, list[models.Tag], ImageResult | None]
 
 
 class ScraperMixin:
-    def _get_image(self, image_url: str) -> ImageResult:
-        image_name = self._parse_image_name(image_url)
-        response = requests.get(image_url, timeout=10)
+    def __init__(self, http_client: HttpClient | None = None) -> None:
+        self.http_client = http_client or get_default_client()
+
+    def _get(self, url: str) -> requests.Response:
+        with instrumentation.phase("fetch"):
+            response = self.http_client.get(url)
+        response.raise_for_status()
+        return response
+
+    def _get_cached(self, url: str, commit: bool = True) -> requests.Response:
+        with instrumentation.phase("fetch"):
+            response = self.http_client.get_cached(url, commit=commit)
         response.raise_for_status()
-        image = response.content
-        return image_name, image
+        return response
+
+    def _get_image(self, image_url: str) -> ImageResult | None:
+        """Download an image to a temporary file, or return None if it's too large or isn't an image."""
+        image_name = self._parse_image_name(image_url)
+        file = tempfile.SpooledTemporaryFile(max_size=settings.SCRAPER_IMAGE_SPOOL_BYTES)  # noqa: SIM115
+        try:
+            with instrumentation.phase("image_download"):
+                response = self.http_client.download(
+                    image_url, file, max_bytes=settings.SCRAPER_IMAGE_MAX_BYTES, content_type="image/"
+                )
+                file.seek(0)
+                image_sha256, image_size = images.file_digest(file)
+                file.seek(0)
+        except (ResponseTooLarge, UnexpectedContentType) as e:
+            file.close()
+            logger.warning("Skipping image %s: %s", image_url, e)
+            return None
+        except BaseException:
+            file.close()
+            raise
+        return ImageResult(image_name, file, image_sha256, image_size, image_url, response.unchanged)  # type: ignore
 
     def _parse_image_name(self, image_url: str) -> str:
         return image_url.rsplit("/", maxsplit=1)[-1].split("?", maxsplit=1)[0]
@@ -59,9 +156,21 @@ class ScraperMixin:
 class MeetupScraperMixin(ScraperMixin):
     """Common Meetup scraping functionality."""
 
-    def _parse_apollo_state(self, soup: BeautifulSoup) -> dict:
-        next_data = soup.find_all(attrs={"id": "__NEXT_DATA__"})[0].text
-        next_data = json.loads(next_data)
+    NEXT_DATA_START = re.compile(rb"<script\b[^>]*\bid=[\"']?__NEXT_DATA__\b[^>]*>")
+
+    def _parse_apollo_state(self, content: bytes) -> dict:
+        """Parse the Apollo state from the page's `__NEXT_DATA__` script.
+
+        The script payload is found with a byte scan instead of parsing the
+        whole page, which is much faster and uses far less memory.
+        """
+        start = self.NEXT_DATA_START.search(content)
+        if not start:
+            raise LookupError("__NEXT_DATA__ script not found")
+        end = content.find(b"</script>", start.end())
+        if end == -1:
+            raise LookupError("__NEXT_DATA__ script is not closed")
+        next_data = json.loads(content[start.end() : end])
         apollo_state: dict[str, Any] = next_data["props"]["pageProps"]["__APOLLO_STATE__"]
         return apollo_state
 
@@ -69,33 +178,38 @@ class MeetupScraperMixin(ScraperMixin):
         event_keys = [key for key in apollo_state.keys() if key.split(":")[0] == "Event"]
         return [apollo_state[key] for key in event_keys]
 
+    def _soup(self, response: requests.Response) -> Callable[[], BeautifulSoup]:
+        """Return a function that parses the page the first time it is called.
+
+        Pages with `__NEXT_DATA__` don't need to be parsed as HTML at all.
+        """
+        return functools.cache(lambda: BeautifulSoup(response.content, "lxml"))
+
 
 class MeetupHomepageScraper(MeetupScraperMixin, Scraper[list[str]]):
     """Scrape a list of upcoming events from a Meetup group's home page."""
 
-    def __init__(self) -> None:
-        self.event_scraper = MeetupEventScraper()
-
-        naive_now = datetime.now()
+    def __init__(self, http_client: HttpClient | None = None) -> None:
+        super().__init__(http_client)
+        self.event_scraper = MeetupEventScraper(self.http_client)
         self._now = timezone.localtime()
-        # See https://gist.github.com/ajosephau/2a22698faaf6206ce195c7aa78e48247
-        self._timezones_by_abbreviation = {
-            zoneinfo.ZoneInfo(tz).tzname(naive_now): tz for tz in zoneinfo.available_timezones()
-        }
 
     def scrape(self, url: str) -> list[str]:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "lxml")
+        # Unchanged homepages are still parsed, since which events are upcoming changes over time.
+        response = self._get_cached(url)
+        with instrumentation.phase("parse"):
+            return self._parse(response)
 
+    def _parse(self, response: requests.Response) -> list[str]:
         try:
-            apollo_state = self._parse_apollo_state(soup)
+            apollo_state = self._parse_apollo_state(response.content)
         except LookupError:
             apollo_state = {}
 
         if apollo_state:
             event_urls = self._parse_event_urls_from_state(apollo_state)
         else:
+            soup = BeautifulSoup(response.content, "lxml")
             upcoming_section = soup.find_all(id="upcoming-section")[0]
             events = upcoming_section.find_all_next(id=re.compile(r"event-card-"))
             filtered_event_containers: list[Tag] = [event for event in events if self._filter_event_tag(event)]  # type: ignore
@@ -113,8 +227,7 @@ class MeetupHomepageScraper(MeetupScraperMixin, Scraper[list[str]]):
     def _filter_event_tag(self, event: Tag) -> bool:
         time: str = event.find_all("time")[0].text
         time, tz_abbrv = time.rsplit(maxsplit=1)
-        tz = self._timezones_by_abbreviation[tz_abbrv]
-        tz = zoneinfo.ZoneInfo(tz)
+        tz = timezones_by_abbreviation()[tz_abbrv]
         event_datetime = datetime.strptime(time, "%a, %b %d, %Y, %I:%M %p").astimezone(tz)
         return event_datetime > self._now
 
@@ -131,15 +244,31 @@ class MeetupEventScraper(MeetupScraperMixin, Scraper[EventScraperResult]):
     DURATION_PATTERN = re.compile(r"1?\d:\d{2} [AP]M to 1?\d:\d{2} [AP]M")
 
     def scrape(self, url: str) -> EventScraperResult:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "lxml")
+        """Scrape the event on the page at `url`.
+
+        Raises `PageUnchanged` if the page is the same as when it was last
+        scraped. A new page only counts as scraped once it's committed to the
+        response cache, which the caller does after saving the event.
+        """
+        response = self._get_cached(url, commit=False)
+        if response.unchanged:  # type: ignore
+            raise PageUnchanged(url)
+        with instrumentation.phase("parse"):
+            event, tags, image_url = self._parse(url, response)
+
+        image_result = None
+        if image_url:
+            image_result = self._get_image(image_url)
+        return (event, tags, image_result)
+
+    def _parse(self, url: str, response: requests.Response) -> tuple[models.Event, list[models.Tag], str | None]:
+        soup = self._soup(response)
 
         try:
-            apollo_state = self._parse_apollo_state(soup)
+            apollo_state = self._parse_apollo_state(response.content)
             event_json = self._parse_events_json(apollo_state)[0]
         except LookupError:
-            event_json = {}
+            apollo_state, event_json = {}, {}
 
         try:
             name = event_json["title"]
@@ -151,24 +280,24 @@ class MeetupEventScraper(MeetupScraperMixin, Scraper[EventScraperResult]):
             location = f"{location_data['address']}, {location_data['city']}, {location_data['state']}"
             external_id = event_json["id"]
         except (TypeError, KeyError):
-            name = self._parse_name(soup)
-            description = self._parse_description(soup)
-            date_time = self._parse_date_time(soup)
-            duration = self._parse_duration(soup)
-            location = self._parse_location(soup)
+            name = self._parse_name(soup())
+            description = self._parse_description(soup())
+            date_time = self._parse_date_time(soup())
+            duration = self._parse_duration(soup())
+            location = self._parse_location(soup())
             external_id = self._parse_external_id(url)
 
         try:
             event_photo = event_json["featuredEventPhoto"]["__ref"]
             image_url = apollo_state[event_photo].get("highResUrl", apollo_state[event_photo]["baseUrl"])
         except (TypeError, KeyError):
-            image_url = self._parse_image(soup)
+            image_url = self._parse_image(soup())
 
-        image_result = None
-        if image_url:
-            image_result = self._get_image(image_url)
+        try:
+            tags = self._parse_tags_from_state(apollo_state, event_json)
+        except (TypeError, KeyError):
+            tags = self._parse_tags(soup())
 
-        tags = self._parse_tags(soup)
         event = models.Event(
             name=name,
             description=description,
@@ -178,7 +307,7 @@ class MeetupEventScraper(MeetupScraperMixin, Scraper[EventScraperResult]):
             external_id=external_id,
             url=url,
         )
-        return (event, tags, image_result)
+        return (event, tags, image_url)
 
     def _parse_name(self, soup: BeautifulSoup) -> str:
         name: str = soup.find_all("h1")[0].text
@@ -222,6 +351,10 @@ class MeetupEventScraper(MeetupScraperMixin, Scraper[EventScraperResult]):
         external_id = pathlib.PurePosixPath(urllib.parse.unquote(parsed_url)).parts[-1]
         return external_id
 
+    def _parse_tags_from_state(self, apollo_state: dict, event_json: dict) -> list[models.Tag]:
+        topics = [apollo_state[edge["node"]["__ref"]]["name"] for edge in event_json["topics"]["edges"]]
+        return [models.Tag(value=" ".join(topic.split())) for topic in topics]
+
     def _parse_tags(self, soup: BeautifulSoup) -> list[models.Tag]:
         tags = soup.find_all("a", id=re.compile("topics-link-"))
         tags = [re.sub(r"\s+", " ", t.text) for t in tags]  # Some tags have newlines & extra spaces
@@ -239,47 +372,122 @@ class MeetupEventScraper(MeetupScraperMixin, Scraper[EventScraperResult]):
 
 
 class EventbriteScraper(ScraperMixin, Scraper[list[EventScraperResult]]):
-    def __init__(self, api_token: str | None = None):
-        self.client = Eventbrite(api_token or settings.EVENTBRITE_API_TOKEN)
-        self._location_by_venue_id: dict[str, str] = {}
+    """Fetch upcoming events for an Eventbrite organization from the Eventbrite API.
 
-    def scrape(self, organization_id: str) -> list[EventScraperResult]:
-        response = self.client.get_organizer_events(
-            organization_id,
-            status="live",
-            expand="logo",
-        )
-        if not str(response.status_code).startswith("2"):
-            raise ValueError(response.status_code, response.reason)
-        results = [self.map_to_event(eventbrite_event) for eventbrite_event in response["events"]]
-        return results
+    Venues are requested as an expansion of the events. Venues that can't be
+    expanded are looked up in a database cache before they are fetched. Event
+    descriptions and images are fetched concurrently.
+    """
 
-    def map_to_event(self, eventbrite_event: dict) -> EventScraperResult:
-        name = eventbrite_event["name"]["text"]
-        start = datetime.fromisoformat(eventbrite_event["start"]["utc"])
-        end = datetime.fromisoformat(eventbrite_event["end"]["utc"])
-        duration = end - start
-        external_id = eventbrite_event["id"]
-        url = eventbrite_event["url"]
-        venue_id = eventbrite_event["venue_id"]
-        location = self._get_venue_location(venue_id)
+    EXPANSIONS = ("venue", "logo")
+
+    def __init__(
+        self,
+        api_token: str | None = None,
+        http_client: HttpClient | None = None,
+        max_workers: int | None = None,
+    ):
+        super().__init__(http_client)
+        self.client = EventbriteClient(api_token or settings.EVENTBRITE_API_TOKEN, self.http_client)
+        self.max_workers = max_workers or settings.SCRAPER_MAX_WORKERS
 
+    def scrape(self, organization_id: str) -> list[EventScraperResult]:
+        eventbrite_events = self._get_organizer_events(organization_id)
+        location_by_venue_id = self._get_venue_locations(eventbrite_events)
+        details = map_concurrently(self._get_details, eventbrite_events, self.max_workers)
+        return [
+            self.map_to_event(
+                eventbrite_event, location_by_venue_id.get(eventbrite_event.get("venue_id")), *event_details
+            )
+            for eventbrite_event, event_details in details
+        ]
+
+    def _get_organizer_events(self, organization_id: str) -> list[dict]:
+        """Fetch every page of the organization's live events."""
+        eventbrite_events: list[dict] = []
+        params = {"status": "live", "expand": ",".join(self.EXPANSIONS)}
+        while True:
+            response = self.client.get_organizer_events(organization_id, **params)
+            if not str(response.status_code).startswith("2"):
+                raise ValueError(response.status_code, response.reason)
+            eventbrite_events.extend(response["events"])
+
+            pagination = response.get("pagination") or {}
+            if not pagination.get("has_more_items") or not pagination.get("continuation"):
+                return eventbrite_events
+            params["continuation"] = pagination["continuation"]
+
+    def _get_venue_locations(self, eventbrite_events: list[dict]) -> dict[str, str]:
+        """Return the location of every event's venue, from the expanded venue if possible.
+
+        Other venues are read from the `EventbriteVenue` cache, and fetched (and
+        cached) only if they are missing or older than `SCRAPER_EVENTBRITE_VENUE_TTL`.
+        """
+        location_by_venue_id: dict[str, str] = {}
+        for eventbrite_event in eventbrite_events:
+            venue = eventbrite_event.get("venue")
+            if venue and venue.get("address") and eventbrite_event.get("venue_id"):
+                location_by_venue_id[eventbrite_event["venue_id"]] = self._format_location(venue["address"])
+
+        venue_ids = {event["venue_id"] for event in eventbrite_events if event.get("venue_id")}
+        if missing_venue_ids := venue_ids - location_by_venue_id.keys():
+            fresh_after = timezone.now() - timedelta(seconds=settings.SCRAPER_EVENTBRITE_VENUE_TTL)
+            cached_venues = models.EventbriteVenue.objects.filter(
+                eventbrite_id__in=missing_venue_ids,
+                updated_at__gte=fresh_after,
+            )
+            location_by_venue_id.update((venue.eventbrite_id, venue.location) for venue in cached_venues)
+
+        if missing_venue_ids := venue_ids - location_by_venue_id.keys():
+            fetched = dict(map_concurrently(self._get_venue_location, sorted(missing_venue_ids), self.max_workers))
+            models.EventbriteVenue.objects.bulk_create(
+                [
+                    models.EventbriteVenue(eventbrite_id=venue_id, location=location)
+                    for venue_id, location in fetched.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["eventbrite_id"],
+                update_fields=["location", "updated_at"],
+            )
+            location_by_venue_id.update(fetched)
+        return location_by_venue_id
+
+    def _get_details(self, eventbrite_event: dict) -> tuple[str, ImageResult | None]:
+        """Fetch the full description and the image of an event. This is called from worker threads."""
         try:
             # full event description
-            description = self.client.get_event_description(external_id)["description"]  # type: ignore
-        except requests.RequestException:
+            description = self.client.get_event_description(eventbrite_event["id"])["description"]  # type: ignore
+        except (requests.RequestException, KeyError):
             # short description
             description = eventbrite_event["description"]["html"]
 
         try:
             image_url = eventbrite_event["logo"]["original"]["url"]
             image_result = self._get_image(image_url)
-        except (KeyError, requests.HTTPError):
+        except (KeyError, TypeError, requests.HTTPError):
+            image_result = None
+        if image_result is None:
+            # The original image is missing or too large, so fall back to the cropped one.
             try:
                 image_url = eventbrite_event["logo"]["url"]
                 image_result = self._get_image(image_url)
-            except KeyError:
+            except (KeyError, TypeError):
                 image_result = None
+        return description, image_result
+
+    def map_to_event(
+        self,
+        eventbrite_event: dict,
+        location: str | None,
+        description: str,
+        image_result: ImageResult | None,
+    ) -> EventScraperResult:
+        name = eventbrite_event["name"]["text"]
+        start = datetime.fromisoformat(eventbrite_event["start"]["utc"])
+        end = datetime.fromisoformat(eventbrite_event["end"]["utc"])
+        duration = end - start
+        external_id = eventbrite_event["id"]
+        url = eventbrite_event["url"]
 
         event = models.Event(
             name=name,
@@ -302,10 +510,11 @@ class EventbriteScraper(ScraperMixin, Scraper[list[EventScraperResult]]):
 
         return event, [], image_result
 
-    @functools.lru_cache
     def _get_venue_location(self, venue_id: str) -> str:
         venue_response = self.client.get_venue(venue_id)  # type: ignore
-        address = venue_response["address"]
+        return self._format_location(venue_response["address"])
+
+    def _format_location(self, address: dict) -> str:
         address_1 = address["address_1"]
         address_2 = address["address_2"]
         street_address = f"{address_1} {address_2}" if address_2 else address_1
@@ -0,0 +1,151 @@
+"""Full-text search of events, with the database's own search index.
+
+Events are searched on their name, their tech group's and effective tags' names
+(`Event.search_keywords`), their location and the text of their description
+(`Event.description_text`, without the markup of `description_html`), weighted
+in that order. The index isn't part of the Event model, since it's different on
+each database:
+
+- On PostgreSQL, a stored generated `tsvector` column, `web_event.search_vector`,
+  with a GIN index. PostgreSQL keeps it up to date itself.
+- On SQLite, an FTS5 table, `web_event_fts`, with `web_event` as its content and
+  kept up to date by triggers.
+
+Migrations create the index with their own copy of the SQL in `install`, so
+changing it needs a migration too. Django rebuilds SQLite tables to alter them,
+which drops their triggers, so `web.signals` calls `install` again after every
+migrate to put them back. Other databases fall back to a slow, unranked search.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, models
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "web_event_fts"
+# The searched columns of web_event, from the most to the least important.
+COLUMNS = ("name", "search_keywords", "location", "description_text")
+# Weights of the columns in the order above, relative to each other.
+POSTGRESQL_WEIGHTS = ("A", "B", "C", "D")
+SQLITE_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+
+def install(connection: BaseDatabaseWrapper) -> None:
+    """Create the search index of events if it doesn't exist, and its triggers on SQLite if they're missing."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            vector = " || ".join(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+                for column, weight in zip(COLUMNS, POSTGRESQL_WEIGHTS, strict=True)
+            )
+            cursor.execute(
+                "ALTER TABLE web_event ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS web_event_search_vector_idx ON web_event USING GIN (search_vector)"
+            )
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f"{FTS_TABLE}_%"],
+            )
+            if cursor.fetchone()[0] == 3:
+                return
+            columns = ", ".join(COLUMNS)
+            new = ", ".join(f"new.{column}" for column in COLUMNS)
+            old = ", ".join(f"old.{column}" for column in COLUMNS)
+            # The SQL below is built only from this module's constants, never from user input.
+            delete = (
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "  # nosec B608
+                f"VALUES ('delete', old.id, {old});"
+            )
+            insert = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new});"  # nosec B608
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({columns}, "
+                "content='web_event', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')"
+            )
+            for name, trigger in (
+                ("insert", f"AFTER INSERT ON web_event BEGIN {insert} END"),
+                ("delete", f"AFTER DELETE ON web_event BEGIN {delete} END"),
+                ("update", f"AFTER UPDATE OF {columns} ON web_event BEGIN {delete} {insert} END"),
+            ):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}")
+                cursor.execute(f"CREATE TRIGGER {FTS_TABLE}_{name} {trigger}")
+            # Events may have changed while the triggers were missing.
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")  # nosec B608
+
+
+def uninstall(connection: BaseDatabaseWrapper) -> None:
+    """Drop the search index of events."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("DROP INDEX IF EXISTS web_event_search_vector_idx")
+            cursor.execute("ALTER TABLE web_event DROP COLUMN IF EXISTS search_vector")
+        elif connection.vendor == "sqlite":
+            for name in ("insert", "delete", "update"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def ranked_pks(queryset: models.QuerySet, query: str, offset: int, limit: int) -> list[int]:
+    """Return the primary keys of the events in `queryset` that match `query`, best matches first.
+
+    Returns `limit` of them, after skipping the first `offset`. Equally good
+    matches are in reverse order of date_time.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _postgresql_ranked_pks(queryset, query, offset, limit)
+    if vendor == "sqlite":
+        return _sqlite_ranked_pks(queryset, query, offset, limit)
+    return _unindexed_pks(queryset, query, offset, limit)
+
+
+def _postgresql_ranked_pks(queryset: models.QuerySet, query: str, offset: int, limit: int) -> list[int]:
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    queryset = (
+        queryset.alias(search_vector=RawSQL("web_event.search_vector", [], output_field=SearchVectorField()))
+        .filter(search_vector=search_query)
+        .annotate(rank=SearchRank(models.F("search_vector"), search_query))
+        .order_by("-rank", "-date_time", "-pk")
+    )
+    return list(queryset.values_list("pk", flat=True)[offset : offset + limit])
+
+
+def _sqlite_ranked_pks(queryset: models.QuerySet, query: str, offset: int, limit: int) -> list[int]:
+    if not (terms := re.findall(r"\w+", query)):
+        return []
+    # Each term is quoted so it's matched as a word, not as FTS5 query syntax.
+    match = " ".join(f'"{term}"' for term in terms)
+    # The events are checked one match at a time, with a correlated subquery. Listing them with IN (...) instead
+    # would read every event in `queryset`, even if few match, and FTS5 would run the MATCH again for each of them.
+    # FTS_TABLE is a constant, and the query and the events' filters are passed as parameters.
+    rowid = RawSQL(f"{FTS_TABLE}.rowid", [])  # nosec B611
+    events_sql, params = queryset.filter(pk=rowid).values("pk").query.sql_with_params()
+    weights = ", ".join(str(weight) for weight in SQLITE_WEIGHTS)
+    with connections[queryset.db].cursor() as cursor:
+        # CROSS JOIN keeps the FTS table first, so that only the matches are looked up in web_event.
+        cursor.execute(
+            f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} "  # nosec B608
+            f"CROSS JOIN web_event ON web_event.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND EXISTS ({events_sql}) "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}), web_event.date_time DESC, web_event.id DESC "
+            "LIMIT %s OFFSET %s",
+            [match, *params, limit, offset],
+        )
+        return [pk for (pk,) in cursor.fetchall()]
+
+
+def _unindexed_pks(queryset: models.QuerySet, query: str, offset: int, limit: int) -> list[int]:
+    """Return the events that contain every word of `query`, newest first, by reading every event."""
+    if not (terms := re.findall(r"\w+", query)):
+        return []
+    for term in terms:
+        queryset = queryset.filter(
+            models.Q(*(models.Q(**{f"{column}__icontains": term}) for column in COLUMNS), _connector=models.Q.OR)
+        )
+    return list(queryset.order_by("-date_time", "-pk").values_list("pk", flat=True)[offset : offset + limit])
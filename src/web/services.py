@@ -1,69 +1,285 @@
-from datetime import timedelta
-from typing import Protocol
+import dataclasses
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import random
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Protocol, TypeVar
 
-from django.core.files.base import ContentFile
-from django.forms.models import model_to_dict
+import requests
+from django.conf import settings
+from django.core.files.base import File
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
 from django.utils import timezone
 
-from web import models, scrapers
+from web import images, instrumentation, models, scrapers, view_cache
+from web.concurrency import map_concurrently
+from web.http_cache import CacheStats
+from web.http_client import CircuitOpen, HttpClient, get_default_client
+
+logger = logging.getLogger(__name__)
+
+ST = TypeVar("ST")
+ScheduledT = TypeVar("ScheduledT", bound=models.ScrapeScheduleMixin)
+
+
+def _scrape_or_none(scraper: scrapers.Scraper[ST], url: str) -> ST | None:
+    """Scrape the URL, logging and returning None if the request fails.
+
+    This keeps one unreachable page from aborting a whole scraping run.
+    """
+    try:
+        return scraper.scrape(url)
+    except scrapers.PageUnchanged:
+        logger.debug("Skipping unchanged page %s", url)
+        return None
+    except CircuitOpen as e:
+        logger.warning("Skipping %s: %s", url, e)
+        return None
+    except requests.RequestException:
+        logger.exception("Failed to scrape %s", url)
+        return None
+
+
+@dataclasses.dataclass
+class SaveCounts:
+    """How many scraped events were created, updated or left unchanged."""
+
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __add__(self, other: "SaveCounts") -> "SaveCounts":
+        return SaveCounts(**{f.name: getattr(self, f.name) + getattr(other, f.name) for f in dataclasses.fields(self)})
 
 
 class EventService:
+    # Fields overwritten when a scraped event is saved again. The image and its digest
+    # are saved separately, and only when the image has changed.
+    UPSERT_FIELDS = (
+        "name",
+        "description",
+        "description_html",
+        "description_excerpt",
+        "description_text",
+        "date_time",
+        "duration",
+        "location",
+        "url",
+        "group",
+        "approved_at",
+        "scrape_fingerprint",
+        "updated_at",
+    )
+
     def save_event_from_result(
         self,
         result: scrapers.EventScraperResult,
         tech_group: models.TechGroup,
     ) -> None:
+        self.save_results([result], tech_group)
+
+    def save_results(
+        self,
+        results: Sequence[scrapers.EventScraperResult],
+        tech_group: models.TechGroup,
+    ) -> SaveCounts:
+        """Save scraped events, their tags and images for a tech group.
+
+        Each result is fingerprinted, and events whose fingerprint matches the
+        one stored when they were last scraped are not written at all.
+
+        The other events are upserted on `external_id` and their tags are
+        attached in a constant number of queries, in a single transaction.
+        Images are saved afterwards, one at a time, since they are written to
+        storage. An event with an image is only fingerprinted once its image
+        is saved.
+
+        If several results share an `external_id`, the last one wins. Results
+        without one are logged and skipped.
+        The results' image files are closed once they have been saved.
+        """
+        try:
+            return self._save_results(results, tech_group)
+        finally:
+            for _, _, image_result in results:
+                if image_result is not None:
+                    image_result.file.close()
+
+    def _save_results(
+        self,
+        results: Sequence[scrapers.EventScraperResult],
+        tech_group: models.TechGroup,
+    ) -> SaveCounts:
+        results_by_id: dict[str, scrapers.EventScraperResult] = {}
+        for result in results:
+            external_id = result[0].external_id
+            if not external_id:
+                # It can't be matched to a saved event, but the group's other events can still be saved.
+                logger.error("Skipping scraped event %s, which has no external_id", result[0])
+                continue
+            results_by_id[external_id] = result
+        if not results_by_id:
+            return SaveCounts()
+
+        fingerprints = {
+            external_id: self.fingerprint(result, tech_group) for external_id, result in results_by_id.items()
+        }
+        with instrumentation.phase("db_write"):
+            stored_fingerprints = dict(
+                models.Event.all.filter(external_id__in=results_by_id).values_list("external_id", "scrape_fingerprint")
+            )
+        changed_results = [
+            result
+            for external_id, result in results_by_id.items()
+            if stored_fingerprints.get(external_id) != fingerprints[external_id]
+        ]
+        counts = SaveCounts(unchanged=len(results_by_id) - len(changed_results))
+        if not changed_results:
+            return counts
+
+        for event, _, image_result in changed_results:
+            # Events with an image are only fingerprinted once it's saved, below, so that a failed upload is retried.
+            event.scrape_fingerprint = "" if image_result else fingerprints[event.external_id]  # type: ignore
+            if event.external_id in stored_fingerprints:
+                counts.updated += 1
+            else:
+                counts.created += 1
+
+        with instrumentation.phase("db_write"), transaction.atomic():
+            events = self._save_events([event for event, _, _ in changed_results], tech_group)
+            self._save_tags(events, [tags for _, tags, _ in changed_results])
+            # Bulk saves don't send the signals that update effective tags and search keywords and expire
+            # cached pages.
+            pks = [event.pk for event in events]
+            saved_events = models.Event.all.filter(pk__in=pks)
+            saved_events.update_effective_tags()
+            saved_events.update_search_keywords()
+            view_cache.invalidate(models.Event, pks)
+
+        with_saved_images = []
+        try:
+            for event, (_, _, image_result) in zip(events, changed_results):
+                if image_result is not None:
+                    self._save_image(event, image_result)
+                    event.scrape_fingerprint = fingerprints[event.external_id]  # type: ignore
+                    with_saved_images.append(event)
+        finally:
+            with instrumentation.phase("db_write"):
+                models.Event.all.bulk_update(with_saved_images, ["scrape_fingerprint"])
+        return counts
+
+    def fingerprint(self, result: scrapers.EventScraperResult, tech_group: models.TechGroup) -> str:
+        """Return a digest of everything that is saved from a scraped event."""
         event, tags, image_result = result
-        event = self._save_event(event, tech_group)
-        self._save_tags(event, tags)
-        if image_result is not None:
-            self._save_image(event, image_result)
+        payload = {
+            "name": event.name,
+            "description": event.description,
+            "date_time": event.date_time.astimezone(UTC).isoformat() if event.date_time else None,
+            "duration": event.duration.total_seconds() if event.duration else None,
+            "location": event.location,
+            "url": event.url,
+            "group": tech_group.pk,
+            "tags": sorted({tag.value for tag in tags}),
+            "image": image_result.sha256 if image_result else None,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
-    def _save_event(
+    def _save_events(
         self,
-        event: models.Event,
+        events: list[models.Event],
         tech_group: models.TechGroup,
-    ) -> models.Event:
-        event.group = tech_group
-        event.approved_at = timezone.localtime()
-        defaults = model_to_dict(event, exclude=["id"])
-        defaults["group"] = tech_group
-
-        del defaults["tags"]  # Can't apply Many-to-Many relationship untill after the event has been saved.
-        del defaults["image"]
-
-        updated_event, _ = models.Event.objects.update_or_create(
-            external_id=event.external_id,
-            defaults=defaults,
+    ) -> list[models.Event]:
+        approved_at = timezone.localtime()
+        for event in events:
+            event.group = tech_group
+            event.approved_at = approved_at
+            # Upserts don't call save(), which renders the description.
+            event.render_description()
+
+        models.Event.all.bulk_create(
+            events,
+            update_conflicts=True,
+            unique_fields=["external_id"],
+            update_fields=self.UPSERT_FIELDS,
         )
-        return updated_event
+        # Not every database returns the primary keys of upserted rows, and the existing
+        # image digests are needed anyway, so read the saved rows back.
+        saved_events = models.Event.all.in_bulk([event.external_id for event in events], field_name="external_id")
+        return [saved_events[event.external_id] for event in events]
 
     def _save_tags(
         self,
-        event: models.Event,
-        tags: list[models.Tag],
+        events: list[models.Event],
+        tags_per_event: list[list[models.Tag]],
     ) -> None:
-        for tag in tags:
-            tag, _ = models.Tag.objects.get_or_create(value=tag)
-            event.tags.add(tag)
+        values = {tag.value for tags in tags_per_event for tag in tags}
+        if not values:
+            return
+
+        tags_by_value = {tag.value: tag for tag in models.Tag.objects.filter(value__in=values)}
+        if missing_values := values - tags_by_value.keys():
+            models.Tag.objects.bulk_create([models.Tag(value=value) for value in missing_values], ignore_conflicts=True)
+            tags_by_value.update((tag.value, tag) for tag in models.Tag.objects.filter(value__in=missing_values))
+
+        # Only add tags, so tags applied by hand are kept.
+        EventTag = models.Event.tags.through
+        EventTag.objects.bulk_create(
+            [
+                EventTag(event_id=event.pk, tag_id=tags_by_value[tag.value].pk)
+                for event, tags in zip(events, tags_per_event)
+                for tag in tags
+            ],
+            ignore_conflicts=True,
+        )
 
     def _save_image(
         self,
         event: models.Event,
         image_result: scrapers.ImageResult,
     ) -> None:
-        image_name, image = image_result
+        image_name, image, image_sha256, image_size, source_url, unchanged = image_result
+
+        if event.image and unchanged and source_url and source_url == event.image_source_url:
+            return
 
-        # If images are the same, don't re-upload
-        has_existing_image = bool(event.image)
-        if has_existing_image:
-            existing_image = event.image.read()
-            if existing_image == image:
+        # If images are the same, don't re-upload. Compare digests rather than downloading the stored image.
+        if event.image:
+            if not event.image_sha256:
+                self._backfill_image_digest(event)
+            if image_sha256 == event.image_sha256 and image_size == event.image_size:
+                update_fields = []
+                if source_url != event.image_source_url:
+                    event.image_source_url = source_url
+                    update_fields.append("image_source_url")
+                if not event.image_renditions:
+                    # Images saved before renditions were made.
+                    with instrumentation.phase("storage_upload"):
+                        event.image_renditions = images.save_renditions(event.image.storage, image_sha256, image)
+                    update_fields.append("image_renditions")
+                if update_fields:
+                    event.save(update_fields=update_fields)
                 return
 
-        file = ContentFile(image, name=image_name)
-        event.image.save(image_name, file)
+        event.image_sha256 = image_sha256
+        event.image_size = image_size
+        event.image_source_url = source_url
+        # Resizing is timed with the upload of the renditions.
+        with instrumentation.phase("storage_upload"):
+            event.image_renditions = images.save_renditions(event.image.storage, image_sha256, image)
+            image.seek(0)
+            # Storage reads the file in chunks, so large images are never held in memory whole.
+            event.image.save(image_name, File(image, name=image_name))
+
+    def _backfill_image_digest(self, event: models.Event) -> None:
+        """Record the digest of an image saved before digests were stored."""
+        with instrumentation.phase("storage_upload"), event.image.open("rb") as file:
+            event.image_sha256, event.image_size = images.file_digest(file)
+        event.save(update_fields=["image_sha256", "image_size"])
 
 
 class MeetupService:
@@ -72,20 +288,98 @@ class MeetupService:
         homepage_scraper: scrapers.Scraper[list[str]] | None = None,
         event_scraper: scrapers.Scraper[scrapers.EventScraperResult] | None = None,
         event_service: EventService | None = None,
+        max_workers: int | None = None,
+        http_client: HttpClient | None = None,
     ) -> None:
-        self.homepage_scraper: scrapers.Scraper[list[str]] = homepage_scraper or scrapers.MeetupHomepageScraper()
+        """`http_client` is used by the default scrapers. Its response cache, if any, is reported on after each run."""
+        self.http_client = http_client or get_default_client()
+        self.homepage_scraper: scrapers.Scraper[list[str]] = homepage_scraper or scrapers.MeetupHomepageScraper(
+            self.http_client
+        )
         self.event_scraper: scrapers.Scraper[scrapers.EventScraperResult] = (
-            event_scraper or scrapers.MeetupEventScraper()
+            event_scraper or scrapers.MeetupEventScraper(self.http_client)
         )
         self.event_service = event_service or EventService()
+        self.max_workers = max_workers or settings.SCRAPER_MAX_WORKERS
 
     def save_events(self) -> None:
         """Scrape upcoming events from Meetup and save them to the database."""
-        for tech_group in models.TechGroup.objects.filter(homepage__icontains="meetup.com"):
-            event_urls = self.homepage_scraper.scrape(tech_group.homepage)  # type: ignore
-            for event_url in event_urls:  # TODO: parallelize (with async?)
-                result = self.event_scraper.scrape(event_url)
-                self.event_service.save_event_from_result(result, tech_group)
+        tech_groups = models.TechGroup.objects.filter(homepage__icontains=settings.MEETUP_DOMAIN)
+        self.save_events_for(tech_groups)
+
+        if response_cache := self.http_client.response_cache:
+            response_cache.evict()
+
+    def save_events_for(
+        self, tech_groups: Iterable[models.TechGroup], raise_homepage_errors: bool = False
+    ) -> SaveCounts:
+        """Scrape upcoming events for the given groups, save them to the database and return what was saved.
+
+        Pages and images are fetched concurrently, but events are saved from the
+        calling thread, a group at a time, in the order their groups and pages were listed.
+        Event pages that are unchanged since their events were last saved are skipped.
+
+        A homepage that can't be fetched is logged and its group skipped, unless
+        `raise_homepage_errors` is set, when the error is raised instead. Scraping
+        a single group should fail then, rather than look like it found no changes.
+        """
+        response_cache = self.http_client.response_cache
+        cache_stats_before = dataclasses.replace(response_cache.stats) if response_cache else CacheStats()
+
+        scrape_homepage = (
+            self.homepage_scraper.scrape
+            if raise_homepage_errors
+            else functools.partial(_scrape_or_none, self.homepage_scraper)
+        )
+        homepages = map_concurrently(
+            lambda tech_group: scrape_homepage(tech_group.homepage),  # type: ignore
+            tech_groups,
+            self.max_workers,
+        )
+        event_pages = [
+            (tech_group, event_url) for tech_group, event_urls in homepages for event_url in event_urls or []
+        ]
+        if response_cache:
+            # Pages whose events were deleted since must be scraped again, even if they're unchanged.
+            saved_urls = set(
+                models.Event.all.filter(
+                    group__in={tech_group for tech_group, _ in event_pages}, url__in={url for _, url in event_pages}
+                ).values_list("url", flat=True)
+            )
+            for _, event_url in event_pages:
+                if event_url not in saved_urls:
+                    response_cache.forget(event_url)
+
+        results = map_concurrently(
+            lambda event_page: _scrape_or_none(self.event_scraper, event_page[1]),
+            event_pages,
+            self.max_workers,
+        )
+        counts = SaveCounts()
+        for tech_group, group_results in itertools.groupby(results, key=lambda item: item[0][0]):
+            scraped = [(event_url, result) for (_, event_url), result in group_results if result is not None]
+            counts += self.event_service.save_results([result for _, result in scraped], tech_group)
+            if response_cache:
+                # Only now are the pages' events saved, so they can be skipped while they're unchanged.
+                for event_url, _ in scraped:
+                    response_cache.commit(event_url)
+        logger.info(
+            "Meetup events: %d created, %d updated, %d unchanged",
+            counts.created,
+            counts.updated,
+            counts.unchanged,
+        )
+
+        if response_cache:
+            cache_stats = response_cache.stats - cache_stats_before
+            logger.info(
+                "Meetup response cache: %d hits, %d misses (%d unchanged), %d bytes saved",
+                cache_stats.hits,
+                cache_stats.misses,
+                cache_stats.unchanged,
+                cache_stats.bytes_saved,
+            )
+        return counts
 
 
 class EventbriteService:
@@ -105,10 +399,143 @@ class EventbriteService:
         Note: this uses an API and doesn't actually web scrape.
         """
         for eventbrite_organization in models.EventbriteOrganization.objects.prefetch_related("tech_group"):
-            tech_group = eventbrite_organization.tech_group
-            results = self.events_scraper.scrape(eventbrite_organization.eventbrite_id)
-            for result in results:
-                self.event_service.save_event_from_result(result, tech_group)
+            try:
+                self.save_events_for(eventbrite_organization)
+            except (requests.RequestException, ValueError):
+                logger.exception("Failed to fetch events for Eventbrite organization %s", eventbrite_organization.pk)
+
+    def save_events_for(self, eventbrite_organization: models.EventbriteOrganization) -> SaveCounts:
+        """Fetch upcoming events for an organization, save them and return what was saved."""
+        results = self.events_scraper.scrape(eventbrite_organization.eventbrite_id)
+        counts = self.event_service.save_results(results, eventbrite_organization.tech_group)
+        logger.info(
+            "Eventbrite events for organization %s: %d created, %d updated, %d unchanged",
+            eventbrite_organization.pk,
+            counts.created,
+            counts.updated,
+            counts.unchanged,
+        )
+        return counts
+
+
+class ScrapeScheduler:
+    """Decide when each tech group (or Eventbrite organization) is next scraped.
+
+    Groups whose scrapes keep finding new or updated events are scraped as often
+    as every `min_interval`, and dormant groups as rarely as every `max_interval`,
+    on a log scale between the two. A group is scraped at least four times
+    between now and its next event, so last-minute changes are picked up.
+    Intervals are jittered, so groups drift apart rather than being due together.
+    """
+
+    CHANGE_RATE_WEIGHT = 0.3
+    """How much the latest scrape counts towards the moving average of how often a group's events change."""
+    JITTER = 0.1
+
+    def __init__(self, min_interval: timedelta | None = None, max_interval: timedelta | None = None) -> None:
+        self.min_interval = min_interval or timedelta(seconds=settings.SCRAPER_SCHEDULE_MIN_INTERVAL)
+        self.max_interval = max_interval or timedelta(seconds=settings.SCRAPER_SCHEDULE_MAX_INTERVAL)
+
+    def claim_due(self, queryset: QuerySet[ScheduledT], limit: int | None = None) -> list[int]:
+        """Return the primary keys of the longest overdue groups, up to `limit`.
+
+        Claimed groups aren't due again for `min_interval`, so a scrape that never
+        reports back is retried then.
+        """
+        now = timezone.now()
+        limit = limit or settings.SCRAPER_SCHEDULE_BATCH_SIZE
+        due = queryset.filter(Q(next_scrape_at=None) | Q(next_scrape_at__lte=now))
+        pks = list(due.order_by(F("next_scrape_at").asc(nulls_first=True), "pk").values_list("pk", flat=True)[:limit])
+        queryset.model._default_manager.filter(pk__in=pks).update(next_scrape_at=now + self.min_interval)
+        return pks
+
+    def record(
+        self, target: models.ScrapeScheduleMixin, tech_group: models.TechGroup, counts: SaveCounts | None
+    ) -> None:
+        """Schedule `target`'s next scrape after it was scraped, saving `tech_group`'s events.
+
+        `counts` is None if the scrape failed, in which case it's retried after `min_interval`.
+        """
+        now = timezone.now()
+        if counts is None:
+            target.next_scrape_at = now + self._jitter(self.min_interval)
+        else:
+            changed = counts.created + counts.updated > 0
+            target.change_rate += self.CHANGE_RATE_WEIGHT * (changed - target.change_rate)
+            target.last_scraped_at = now
+            if changed:
+                target.last_changed_at = now
+            next_event_at = (
+                models.Event.all.filter(group=tech_group, date_time__gt=now)
+                .order_by("date_time")
+                .values_list("date_time", flat=True)
+                .first()
+            )
+            target.next_scrape_at = now + self._jitter(self.interval(target.change_rate, next_event_at, now))
+        target.save(update_fields=["next_scrape_at", "last_scraped_at", "last_changed_at", "change_rate"])
+
+    def interval(self, change_rate: float, next_event_at: datetime | None, now: datetime) -> timedelta:
+        """Return the time between scrapes of a group whose scrapes find changes `change_rate` of the time."""
+        interval = self.min_interval * (self.max_interval / self.min_interval) ** (1 - change_rate)
+        if next_event_at is not None and next_event_at > now:
+            interval = min(interval, max(self.min_interval, (next_event_at - now) / 4))
+        return interval
+
+    def _jitter(self, interval: timedelta) -> timedelta:
+        # Spreading scrapes out doesn't need cryptographic randomness.
+        return interval * random.uniform(1 - self.JITTER, 1 + self.JITTER)  # nosec B311
+
+
+class ScrapeRunService:
+    # Run totals that are the sum of the items'.
+    SUMMED_FIELDS = (
+        *(f"{phase}_seconds" for phase in instrumentation.PHASES),
+        "bytes_transferred",
+        "rate_limit_wait_seconds",
+        "throttled",
+        "circuit_rejected",
+        "created",
+        "updated",
+        "unchanged",
+    )
+
+    def record(self, source: str, started_at: datetime, outcomes: list[dict]) -> models.ScrapeRun:
+        """Save a `ScrapeRun` and its items from the outcomes of its scraping subtasks, in two queries.
+
+        Each outcome is a dict with the `tech_group_id`, `counts`, `metrics`, `seconds`,
+        `staleness` and `error` of one subtask. The run's totals are the sums of its items'.
+        """
+        run = models.ScrapeRun(source=source, started_at=started_at, finished_at=timezone.now())
+        run.duration = run.finished_at - started_at
+        items = [self._item(run, outcome) for outcome in outcomes]
+        for item in items:
+            for field in self.SUMMED_FIELDS:
+                setattr(run, field, getattr(run, field) + getattr(item, field))
+            for status, count in item.http_status_counts.items():
+                run.http_status_counts[status] = run.http_status_counts.get(status, 0) + count
+        run.failed = sum(1 for item in items if item.error)
+
+        with transaction.atomic():
+            run.save()
+            models.ScrapeRunItem.objects.bulk_create(items)
+        return run
+
+    def _item(self, run: models.ScrapeRun, outcome: dict) -> models.ScrapeRunItem:
+        metrics = outcome["metrics"]
+        return models.ScrapeRunItem(
+            run=run,
+            tech_group_id=outcome["tech_group_id"],
+            duration=timedelta(seconds=outcome["seconds"]),
+            bytes_transferred=metrics["bytes_transferred"],
+            http_status_counts=metrics["status_counts"],
+            rate_limit_wait_seconds=metrics["rate_limit_wait_seconds"],
+            throttled=metrics["throttled"],
+            circuit_rejected=metrics["circuit_rejected"],
+            error=outcome["error"],
+            staleness=timedelta(seconds=outcome["staleness"]) if outcome["staleness"] is not None else None,
+            **{f"{phase}_seconds": seconds for phase, seconds in metrics["seconds"].items()},
+            **outcome["counts"],
+        )
 
 
 class Sender(Protocol):
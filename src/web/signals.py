@@ -0,0 +1,133 @@
+from django.db import connections, models
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from web import search, view_cache
+from web.models import Event, Tag, TechGroup
+
+# Saving only these fields doesn't change any page, e.g. when a tech group's next scrape is scheduled.
+UNRENDERED_FIELDS = frozenset(
+    {
+        "next_scrape_at",
+        "last_scraped_at",
+        "last_changed_at",
+        "change_rate",
+        "image_sha256",
+        "image_size",
+        "image_source_url",
+        "scrape_fingerprint",
+    }
+)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=TechGroup)
+@receiver(post_save, sender=Tag)
+def expire_pages_on_save(sender, instance, update_fields=None, **kwargs) -> None:
+    if update_fields and update_fields <= UNRENDERED_FIELDS:
+        return
+    view_cache.invalidate(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=TechGroup)
+@receiver(post_delete, sender=Tag)
+def expire_pages_on_delete(sender, instance, **kwargs) -> None:
+    view_cache.invalidate(sender, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+@receiver(m2m_changed, sender=TechGroup.tags.through)
+def expire_pages_on_tags_changed(sender, instance, action, reverse, model, pk_set, **kwargs) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        view_cache.invalidate(type(instance), [instance.pk])
+    elif pk_set is not None:
+        # `instance` is a tag, and `pk_set` the events or tech groups it was added to or removed from.
+        view_cache.invalidate(model, pk_set)
+    else:
+        # The tag was removed from every event or tech group; which ones isn't known.
+        view_cache.invalidate(model)
+        view_cache.invalidate(Tag, [instance.pk])
+
+
+def update_tags(events: models.QuerySet) -> None:
+    """Update the effective tags of `events`, and the search keywords made from them."""
+    # Filtering on effective tags would find other events once they're updated.
+    events = Event.all.filter(pk__in=list(events.values_list("pk", flat=True)))
+    events.update_effective_tags()
+    events.update_search_keywords()
+
+
+@receiver(post_save, sender=Event)
+def update_effective_tags_on_save(sender, instance, created, update_fields=None, **kwargs) -> None:
+    if created or update_fields is None or "group" in update_fields:
+        update_tags(Event.all.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Event.tags.through)
+def update_effective_tags_on_event_tags_changed(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        update_tags(Event.all.filter(pk=instance.pk))
+    elif pk_set is not None:
+        update_tags(Event.all.filter(pk__in=pk_set))
+    else:
+        # The tag was removed from every event, which still have it as an effective tag.
+        update_tags(Event.all.filter(effective_tags=instance))
+
+
+@receiver(m2m_changed, sender=TechGroup.tags.through)
+def update_effective_tags_on_group_tags_changed(sender, instance, action, reverse, pk_set, **kwargs) -> None:
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        update_tags(Event.all.filter(group=instance))
+    elif pk_set is not None:
+        update_tags(Event.all.filter(group__in=pk_set))
+    else:
+        update_tags(Event.all.filter(effective_tags=instance))
+
+
+@receiver(pre_delete, sender=TechGroup)
+def remember_events_of_deleted_group(sender, instance, **kwargs) -> None:
+    # Deleting a group sets its events' group to null with an update, which doesn't send signals.
+    instance._event_pks = list(Event.all.filter(group=instance).values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_events_of_deleted_tag(sender, instance, **kwargs) -> None:
+    # Deleting a tag deletes it from events and groups without sending m2m_changed.
+    instance._event_pks = list(Event.all.filter(effective_tags=instance).values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=TechGroup)
+@receiver(post_delete, sender=Tag)
+def update_effective_tags_on_group_or_tag_deleted(sender, instance, **kwargs) -> None:
+    update_tags(Event.all.filter(pk__in=getattr(instance, "_event_pks", [])))
+
+
+@receiver(post_save, sender=TechGroup)
+def update_search_keywords_on_group_saved(sender, instance, created, update_fields=None, **kwargs) -> None:
+    if not created and (update_fields is None or "name" in update_fields):
+        Event.all.filter(group=instance).update_search_keywords()
+
+
+@receiver(post_save, sender=Tag)
+def update_search_keywords_on_tag_saved(sender, instance, created, **kwargs) -> None:
+    if not created:
+        Event.all.filter(effective_tags=instance).update_search_keywords()
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using, **kwargs) -> None:
+    # Migrations that alter web_event on SQLite drop the triggers that keep its search index up to date.
+    connection = connections[using]
+    if (
+        sender.name == "web"
+        and connection.vendor == "sqlite"
+        and search.FTS_TABLE in connection.introspection.table_names()
+    ):
+        search.install(connection)
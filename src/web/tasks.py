@@ -1,25 +1,171 @@
-from celery import shared_task
+import contextlib
+import dataclasses
+import logging
+import time
+from collections.abc import Iterator
+from datetime import datetime
+
+from celery import chord, shared_task
 from discord import SyncWebhook
 from django.conf import settings
+from django.utils import timezone
+
+from web import instrumentation, models, scrapers, services
+from web.http_client import get_default_client
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task()
+def dispatch_due_scrapes():
+    """Scrape the tech groups and Eventbrite organizations that are due, with one subtask each.
 
-from web import scrapers, services
+    This runs every few minutes, so scrapes are spread across the day. See `services.ScrapeScheduler`.
+    """
+    scheduler = services.ScrapeScheduler()
+    tech_group_ids = scheduler.claim_due(models.TechGroup.objects.filter(homepage__icontains=settings.MEETUP_DOMAIN))
+    if tech_group_ids:
+        subtasks = [scrape_events_from_meetup_group.s(tech_group_id) for tech_group_id in tech_group_ids]
+        _fan_out(subtasks, models.ScrapeRun.Source.MEETUP)
+
+    organization_ids = scheduler.claim_due(models.EventbriteOrganization.objects.all())
+    if organization_ids:
+        subtasks = [
+            scrape_events_from_eventbrite_organization.s(organization_id) for organization_id in organization_ids
+        ]
+        _fan_out(subtasks, models.ScrapeRun.Source.EVENTBRITE)
 
 
 @shared_task()
 def scrape_events_from_meetup():
-    """Scrape upcoming events from Meetup."""
-    homepage_scraper = scrapers.MeetupHomepageScraper()
-    event_scraper = scrapers.MeetupEventScraper()
-    meetup_service = services.MeetupService(homepage_scraper, event_scraper)
-    meetup_service.save_events()
+    """Scrape upcoming events from Meetup, with one subtask per tech group."""
+    tech_groups = models.TechGroup.objects.filter(homepage__icontains=settings.MEETUP_DOMAIN)
+    tech_group_ids = tech_groups.values_list("pk", flat=True)
+    subtasks = [scrape_events_from_meetup_group.s(tech_group_id) for tech_group_id in tech_group_ids]
+    _fan_out(subtasks, models.ScrapeRun.Source.MEETUP)
+
+
+@shared_task(rate_limit=settings.SCRAPER_MEETUP_TASK_RATE_LIMIT)
+def scrape_events_from_meetup_group(tech_group_id: int) -> dict:
+    """Scrape upcoming events from Meetup for one tech group."""
+    with _SubtaskOutcome.collect(tech_group_id) as outcome:
+        tech_group = None
+        try:
+            tech_group = models.TechGroup.objects.get(pk=tech_group_id)
+            outcome.tech_group_id = tech_group.pk
+            homepage_scraper = scrapers.MeetupHomepageScraper()
+            event_scraper = scrapers.MeetupEventScraper()
+            meetup_service = services.MeetupService(homepage_scraper, event_scraper)
+            # A failed homepage must be retried soon, not recorded as a scrape that found no changes.
+            outcome.counts = meetup_service.save_events_for([tech_group], raise_homepage_errors=True)
+        except Exception as e:
+            logger.exception("Failed to scrape Meetup events for tech group %s", tech_group_id)
+            outcome.error = e
+        if tech_group is not None:
+            outcome.reschedule(tech_group, tech_group)
+    return outcome.as_dict()
 
 
 @shared_task()
 def scrape_events_from_eventbrite():
-    """Scrape upcoming events from Eventbrite."""
-    events_scraper = scrapers.EventbriteScraper()
-    meetup_service = services.EventbriteService(events_scraper)
-    meetup_service.save_events()
+    """Scrape upcoming events from Eventbrite, with one subtask per organization."""
+    organization_ids = models.EventbriteOrganization.objects.values_list("pk", flat=True)
+    subtasks = [scrape_events_from_eventbrite_organization.s(organization_id) for organization_id in organization_ids]
+    _fan_out(subtasks, models.ScrapeRun.Source.EVENTBRITE)
+
+
+@shared_task(rate_limit=settings.SCRAPER_EVENTBRITE_TASK_RATE_LIMIT)
+def scrape_events_from_eventbrite_organization(organization_id: int) -> dict:
+    """Scrape upcoming events from Eventbrite for one organization."""
+    with _SubtaskOutcome.collect(organization_id) as outcome:
+        organization = None
+        try:
+            organization = models.EventbriteOrganization.objects.select_related("tech_group").get(pk=organization_id)
+            outcome.tech_group_id = organization.tech_group_id  # type: ignore
+            events_scraper = scrapers.EventbriteScraper()
+            eventbrite_service = services.EventbriteService(events_scraper)
+            outcome.counts = eventbrite_service.save_events_for(organization)
+        except Exception as e:
+            logger.exception("Failed to fetch events for Eventbrite organization %s", organization_id)
+            outcome.error = e
+        if organization is not None:
+            outcome.reschedule(organization, organization.tech_group)
+    return outcome.as_dict()
+
+
+@shared_task()
+def record_scrape_results(outcomes: list[dict], source: str, started_at: str) -> dict:
+    """Record a `ScrapeRun` from the outcomes of its subtasks once they have all finished."""
+    run = services.ScrapeRunService().record(source, datetime.fromisoformat(started_at), outcomes)
+    failed = [outcome["id"] for outcome in outcomes if outcome["error"]]
+    log = logger.warning if failed else logger.info
+    log(
+        "Scraped %s: %d events created, %d updated, %d unchanged by %d subtasks, %d failed %s",
+        source,
+        run.created,
+        run.updated,
+        run.unchanged,
+        len(outcomes),
+        len(failed),
+        failed,
+    )
+
+    if source == models.ScrapeRun.Source.MEETUP and (response_cache := get_default_client().response_cache):
+        response_cache.evict()
+    return {"scrape_run_id": run.pk, "failed": failed}
+
+
+def _fan_out(subtasks: list, source: str) -> None:
+    callback = record_scrape_results.s(source, timezone.now().isoformat())
+    if subtasks:
+        chord(subtasks)(callback)
+    else:
+        callback.delay([])
+
+
+@dataclasses.dataclass
+class _SubtaskOutcome:
+    """The outcome of a scraping subtask, passed to `record_scrape_results`."""
+
+    id: int
+    tech_group_id: int | None = None
+    counts: services.SaveCounts = dataclasses.field(default_factory=services.SaveCounts)
+    error: Exception | None = None
+    seconds: float = 0.0
+    metrics: dict = dataclasses.field(default_factory=dict)
+    staleness: float | None = None
+    """Seconds since the group was last scraped, or None if it never was."""
+
+    @classmethod
+    @contextlib.contextmanager
+    def collect(cls, id: int) -> Iterator["_SubtaskOutcome"]:
+        """Time the block and collect the metrics of everything it scrapes."""
+        outcome = cls(id)
+        start = time.perf_counter()
+        with instrumentation.collect() as metrics:
+            try:
+                yield outcome
+            finally:
+                outcome.seconds = time.perf_counter() - start
+                outcome.metrics = metrics.as_dict()
+
+    def reschedule(self, target: models.ScrapeScheduleMixin, tech_group: models.TechGroup) -> None:
+        """Schedule the next scrape of `target`, which saves events for `tech_group`, after this one."""
+        if target.last_scraped_at:
+            self.staleness = (timezone.now() - target.last_scraped_at).total_seconds()
+        services.ScrapeScheduler().record(target, tech_group, None if self.error else self.counts)
+
+    def as_dict(self) -> dict:
+        """Return the outcome in a JSON serializable form."""
+        return {
+            "id": self.id,
+            "tech_group_id": self.tech_group_id,
+            "counts": dataclasses.asdict(self.counts),
+            "error": repr(self.error) if self.error else "",
+            "seconds": self.seconds,
+            "metrics": self.metrics,
+            "staleness": self.staleness,
+        }
 
 
 @shared_task()
@@ -1,9 +1,20 @@
 from datetime import datetime, timedelta
 
 from django import template
+from django.db.models.fields.files import ImageFieldFile
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from django.utils.safestring import SafeString
 
 register = template.Library()
 
+# The `sizes` of an image as it's laid out on a page, and the width of the rendition to use
+# as its `src` in browsers that don't support `srcset`. These follow the layouts in main.css.
+IMAGE_SIZES = {
+    "card": ("(min-width: 600px) 50vw, 100vw", 400),
+    "detail": ("(min-width: 600px) 600px, 100vw", 800),
+}
+
 
 @register.filter(name="timedelta")
 def _timedelta(duration: timedelta) -> str:
@@ -35,3 +46,38 @@ def _timedelta(duration: timedelta) -> str:
 @register.filter(name="add_time")
 def _add_time(dt: datetime, duration: timedelta) -> datetime:
     return dt + duration
+
+
+@register.simple_tag
+def responsive_image(image: ImageFieldFile, renditions: list[dict], size: str, **attrs) -> SafeString:
+    """Render an image as a `<picture>` of its renditions, with a WebP and a JPEG/PNG `srcset`.
+
+    `size` is a key of `IMAGE_SIZES`, and `attrs` are added to the `<img>`. The
+    original image is rendered if there are no renditions.
+    """
+    if not renditions:
+        return format_html("<img{}>", flatatt({"src": image.url, **attrs}))
+
+    sizes, src_width = IMAGE_SIZES[size]
+    storage = image.storage
+    webp = [rendition for rendition in renditions if rendition["format"] == "webp"]
+    fallback = [rendition for rendition in renditions if rendition["format"] != "webp"]
+    src = next((rendition for rendition in fallback if rendition["width"] >= src_width), fallback[-1])
+
+    def srcset(renditions: list[dict]) -> str:
+        return ", ".join(f"{storage.url(rendition['name'])} {rendition['width']}w" for rendition in renditions)
+
+    img_attrs = {
+        "src": storage.url(src["name"]),
+        "srcset": srcset(fallback),
+        "sizes": sizes,
+        "width": src["width"],
+        "height": src["height"],
+        **attrs,
+    }
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img{}></picture>',
+        srcset(webp),
+        sizes,
+        flatatt(img_attrs),
+    )
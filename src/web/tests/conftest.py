@@ -1,9 +1,56 @@
+import datetime
 import os
+from collections.abc import Callable
 
 import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from model_bakery import baker
+
+from web.models import Event, Tag, TechGroup
 
 
 def pytest_runtest_setup(item):
     for _ in item.iter_markers(name="eventbrite"):
         if not os.environ.get("EVENTBRITE_API_TOKEN"):
             pytest.skip()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Pages cached by one test must not be served in another."""
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Images and renditions saved by tests must not be left in the real media directory."""
+    settings.MEDIA_ROOT = tmp_path / "media"
+
+
+@pytest.fixture
+def python(db) -> Tag:
+    return Tag.objects.create(value="Python")
+
+
+@pytest.fixture
+def tech_group(python: Tag) -> TechGroup:
+    """An enabled tech group, tagged Python."""
+    tech_group = baker.make(
+        TechGroup, name="Spokane Python User Group", enabled=True, homepage="https://spokanetech.org/"
+    )
+    tech_group.tags.set([python])
+    return tech_group
+
+
+@pytest.fixture
+def make_event(db) -> Callable[..., Event]:
+    """Return a function that creates an event, approved and `days` from now unless told otherwise."""
+
+    def make_event(tech_group: TechGroup | None = None, days: int = 1, approved: bool = True, **kwargs) -> Event:
+        now = timezone.localtime()
+        kwargs.setdefault("date_time", now + datetime.timedelta(days=days))
+        return Event.objects.create(group=tech_group, approved_at=now if approved else None, **kwargs)
+
+    return make_event
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from web import models
+
+
+class TestScrapeRunAdmin(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+
+    def test_trends_show_daily_throughput(self):
+        # Arrange
+        now = timezone.now()
+        for duration in (10, 30):
+            models.ScrapeRun.objects.create(
+                source=models.ScrapeRun.Source.MEETUP,
+                started_at=now,
+                finished_at=now + timedelta(seconds=duration),
+                duration=timedelta(seconds=duration),
+                created=20,
+            )
+
+        # Act
+        response = self.client.get(reverse("admin:web_scraperun_trends"))
+
+        # Assert
+        assert response.status_code == 200
+        (row,) = response.context["rows"]
+        assert row["runs"] == 2
+        assert row["average_duration"] == 20
+        assert row["events_per_second"] == 1.0
+
+    def test_trends_show_freshness(self):
+        # Arrange
+        now = timezone.now()
+        python = models.TechGroup.objects.create(name="Python", homepage="https://www.meetup.com/python/")
+        models.TechGroup.objects.create(name="Rust", homepage="https://www.meetup.com/rust/")
+        models.TechGroup.objects.create(name="Go", homepage="https://www.meetup.com/go/")
+        run = models.ScrapeRun.objects.create(source=models.ScrapeRun.Source.MEETUP, started_at=now, finished_at=now)
+        models.ScrapeRunItem.objects.create(run=run, tech_group=python, created=1, staleness=timedelta(hours=2))
+        models.ScrapeRunItem.objects.create(run=run, tech_group=python, unchanged=1, staleness=timedelta(hours=4))
+
+        # Act
+        response = self.client.get(reverse("admin:web_scraperun_trends"))
+
+        # Assert
+        (row,) = response.context["rows"]
+        assert row["scrapes"] == 2
+        assert row["changed_percent"] == 50
+        assert row["staleness_hours"] == 3
+        assert row["scrapes_avoided"] == 1
+
+    def test_changelist_links_to_trends(self):
+        response = self.client.get(reverse("admin:web_scraperun_changelist"))
+
+        self.assertContains(response, reverse("admin:web_scraperun_trends"))
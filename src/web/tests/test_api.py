@@ -0,0 +1,234 @@
+import datetime
+
+import pytest
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from web.models import Tag, TechGroup
+
+
+def test_list_events(client: Client, tech_group: TechGroup, python: Tag, make_event):
+    # Arrange
+    event = make_event(tech_group, name="Python Meetup", duration=datetime.timedelta(hours=2))
+    make_event(name="Past", days=-1)
+    make_event(name="Unapproved", approved=False)
+
+    # Act
+    response = client.get(reverse("web:api_list_events"))
+
+    # Assert
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    body = response.json()
+    assert body["next"] is None
+    assert body["data"] == [
+        {
+            "id": event.pk,
+            "name": "Python Meetup",
+            "description": None,
+            "description_html": "",
+            "date_time": timezone.localtime(event.date_time).isoformat(),
+            "duration": "P0DT02H00M00S",
+            "location": None,
+            "url": None,
+            "group": {"id": tech_group.pk, "name": "Spokane Python User Group"},
+            "tags": ["Python"],
+            "image": None,
+            "web_url": f"http://testserver/events/{event.pk}",
+        }
+    ]
+
+
+def test_sparse_fieldsets(client: Client, tech_group: TechGroup, django_assert_num_queries, make_event):
+    # Arrange
+    make_event(tech_group, name="Python Meetup")
+
+    # Act
+    # Only the events are queried, without their groups or tags.
+    with django_assert_num_queries(1):
+        response = client.get(reverse("web:api_list_events"), {"fields": "name,date_time"})
+
+    # Assert
+    assert list(response.json()["data"][0]) == ["name", "date_time"]
+
+
+def test_unknown_field(client: Client, db):
+    # Act
+    response = client.get(reverse("web:api_list_events"), {"fields": "name,secret"})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json() == {"error": "Unknown fields: secret"}
+
+
+def test_query_count_does_not_grow_with_number_of_events(
+    client: Client,
+    tech_group: TechGroup,
+    django_assert_num_queries,
+    make_event,
+):
+    # Arrange
+    for days in range(1, 6):
+        make_event(tech_group, days=days)
+
+    # Act & Assert
+    # The events with their groups, then their tags.
+    with django_assert_num_queries(2):
+        client.get(reverse("web:api_list_events"))
+
+
+def test_filter_events(client: Client, tech_group: TechGroup, python: Tag, make_event):
+    # Arrange
+    other_group = baker.make(TechGroup)
+    make_event(tech_group, name="Python Meetup", days=3)
+    make_event(other_group, name="Other Meetup", days=3)
+    make_event(other_group, name="Tagged Meetup", days=10).tags.add(python)
+    make_event(name="Past", days=-10)
+    url = reverse("web:api_list_events")
+
+    def names(**params) -> list[str]:
+        return [event["name"] for event in client.get(url, params).json()["data"]]
+
+    # Act & Assert
+    assert names(group=tech_group.pk) == ["Python Meetup"]
+    assert names(tag=python.pk) == ["Python Meetup", "Tagged Meetup"]
+    assert names(end=(timezone.localdate() + datetime.timedelta(days=5)).isoformat()) == [
+        "Python Meetup",
+        "Other Meetup",
+    ]
+    assert names(start=(timezone.localdate() - datetime.timedelta(days=30)).isoformat())[0] == "Past"
+
+
+@pytest.mark.parametrize(
+    "params", [{"start": "tomorrow"}, {"group": "x"}, {"cursor": "!"}, {"limit": "all"}, {"tag": "python"}]
+)
+def test_invalid_parameters(client: Client, db, params: dict):
+    # Act
+    response = client.get(reverse("web:api_list_events"), params)
+
+    # Assert
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+@pytest.mark.parametrize("url_name", ["web:api_list_events", "web:api_list_tech_groups", "web:api_list_tags"])
+def test_cursor_pagination(client: Client, make_event, url_name: str):
+    # Arrange
+    for number in range(5):
+        group = baker.make(TechGroup, name=f"Group {number}", enabled=True)
+        group.tags.add(Tag.objects.create(value=f"Tag {number}"))
+        make_event(group, days=number + 1)
+
+    # Act
+    pages = []
+    url = reverse(url_name) + "?limit=2"
+    while url:
+        body = client.get(url).json()
+        pages.append(body["data"])
+        url = body["next"]
+
+    # Assert
+    assert [len(page) for page in pages] == [2, 2, 1]
+    ids = [obj["id"] for page in pages for obj in page]
+    assert len(set(ids)) == 5
+
+
+@override_settings(API_PAGE_SIZE=1)
+def test_default_page_size(client: Client, make_event):
+    # Arrange
+    make_event(days=1)
+    make_event(days=2)
+
+    # Act
+    body = client.get(reverse("web:api_list_events")).json()
+
+    # Assert
+    assert len(body["data"]) == 1
+    assert body["next"]
+
+
+def test_get_event(client: Client, tech_group: TechGroup, make_event):
+    # Arrange
+    event = make_event(tech_group, name="Python Meetup")
+
+    # Act
+    response = client.get(reverse("web:api_get_event", args=[event.pk]), {"fields": "id,name,group"})
+
+    # Assert
+    assert response.json() == {
+        "data": {"id": event.pk, "name": "Python Meetup", "group": {"id": tech_group.pk, "name": tech_group.name}}
+    }
+
+
+def test_get_unapproved_event(client: Client, make_event):
+    # Arrange
+    event = make_event(approved=False)
+
+    # Act
+    response = client.get(reverse("web:api_get_event", args=[event.pk]))
+
+    # Assert
+    assert response.status_code == 404
+    assert "error" in response.json()
+
+
+def test_list_tech_groups(client: Client, tech_group: TechGroup, python: Tag):
+    # Arrange
+    baker.make(TechGroup, name="Disabled", enabled=False)
+    baker.make(TechGroup, name="Untagged", enabled=True)
+
+    # Act
+    response = client.get(reverse("web:api_list_tech_groups"), {"tag": python.pk, "fields": "name,tags"})
+
+    # Assert
+    assert response.json()["data"] == [{"name": "Spokane Python User Group", "tags": ["Python"]}]
+
+
+def test_get_tech_group(client: Client, tech_group: TechGroup):
+    # Act
+    response = client.get(reverse("web:api_get_tech_group", args=[tech_group.pk]), {"fields": "web_url"})
+
+    # Assert
+    assert response.json()["data"] == {"web_url": f"http://testserver/groups/{tech_group.pk}"}
+
+
+def test_tags(client: Client, python: Tag):
+    # Act
+    response = client.get(reverse("web:api_list_tags"))
+
+    # Assert
+    assert response.json()["data"] == [{"id": python.pk, "value": "Python"}]
+
+
+def test_responses_are_cached(client: Client, tech_group: TechGroup, django_assert_num_queries, make_event):
+    # Arrange
+    make_event(tech_group, name="Python Meetup")
+    url = reverse("web:api_list_events")
+    client.get(url)
+
+    # Act
+    with django_assert_num_queries(0):
+        response = client.get(url)
+
+    # Assert
+    assert "public" in response["Cache-Control"]
+
+
+def test_cached_responses_are_expired(
+    client: Client, tech_group: TechGroup, django_capture_on_commit_callbacks, make_event
+):
+    # Arrange
+    event = make_event(tech_group, name="Python Meetup")
+    url = reverse("web:api_list_events")
+    client.get(url)
+
+    # Act
+    with django_capture_on_commit_callbacks(execute=True):
+        event.name = "Renamed Meetup"
+        event.save()
+
+    # Assert
+    assert client.get(url).json()["data"][0]["name"] == "Renamed Meetup"
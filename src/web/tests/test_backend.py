@@ -0,0 +1,33 @@
+import base64
+import importlib
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def backend(settings, monkeypatch):
+    """spokanetech.backend, imported with Azure settings, which only exist when USE_AZURE is on."""
+    settings.AZURE_ACCOUNT_NAME = "spokanetech"
+    settings.AZURE_ACCOUNT_KEY = base64.b64encode(b"key").decode()
+    settings.AZURE_UPLOAD_BLOCK_SIZE = 1024 * 1024
+    monkeypatch.delitem(sys.modules, "spokanetech.backend", raising=False)
+    return importlib.import_module("spokanetech.backend")
+
+
+def test_media_is_uploaded_in_blocks(backend):
+    # Act
+    config = backend.AzureMediaStorage().service_client._config
+
+    # Assert
+    assert config.max_single_put_size == 1024 * 1024
+    assert config.max_block_size == 1024 * 1024
+
+
+def test_media_client_account(backend):
+    # Act
+    client = backend.AzureMediaStorage().service_client
+
+    # Assert
+    assert client.url == "https://spokanetech.blob.core.windows.net/"
+    assert client.account_name == "spokanetech"
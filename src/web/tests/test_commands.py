@@ -0,0 +1,98 @@
+import hashlib
+import io
+import pathlib
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from web import models
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+class TestBackfillImageDigests(TestCase):
+    def test_backfills_missing_digests(self):
+        # Arrange
+        event = models.Event.objects.create(name="Event", date_time=timezone.localtime())
+        event.image.save("image.png", ContentFile(b"image"))
+        models.Event.all.update(image_sha256="", image_size=None, approved_at=None)
+
+        # Act
+        call_command("backfill_image_digests", batch_size=1, stdout=io.StringIO())
+
+        # Assert
+        event = models.Event.all.get()
+        assert event.image_sha256 == hashlib.sha256(b"image").hexdigest()
+        assert event.image_size == len(b"image")
+
+
+class TestBackfillImageRenditions(TestCase):
+    def test_makes_missing_renditions(self):
+        # Arrange
+        tech_group = models.TechGroup.objects.create(name="Group")
+        tech_group.image.save("image.jpeg", ContentFile((DATA_DIR / "meetup-image.jpeg").read_bytes()))
+        models.TechGroup.objects.update(image_renditions=[])
+
+        # Act
+        call_command("backfill_image_renditions", stdout=io.StringIO())
+
+        # Assert
+        tech_group.refresh_from_db()
+        assert len(tech_group.image_renditions) == 6
+
+
+class TestBackfillEventDescriptions(TestCase):
+    def test_renders_missing_descriptions(self):
+        # Arrange
+        models.Event.objects.create(name="Event", description="**Hi**", date_time=timezone.localtime())
+        models.Event.objects.create(name="No description", date_time=timezone.localtime())
+        models.Event.all.update(description_html="", description_excerpt="")
+
+        # Act
+        stdout = io.StringIO()
+        call_command("backfill_event_descriptions", batch_size=1, stdout=stdout)
+
+        # Assert
+        event = models.Event.all.get(name="Event")
+        assert event.description_html == event.description_excerpt == "<p><strong>Hi</strong></p>"
+        assert "Rendered the descriptions of 1 events." in stdout.getvalue()
+
+    def test_all_renders_every_description(self):
+        models.Event.objects.create(name="Event", description="**Hi**", date_time=timezone.localtime())
+        models.Event.all.update(description_html="stale")
+
+        call_command("backfill_event_descriptions", all=True, stdout=io.StringIO())
+
+        assert models.Event.all.get().description_html == "<p><strong>Hi</strong></p>"
+
+
+class TestExplainQueries(TestCase):
+    def test_explains_every_query(self):
+        if connection.vendor == "postgresql":
+            # PostgreSQL scans tables as small as the test database's rather than read an index.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        stdout = io.StringIO()
+        call_command("explain_queries", stdout=stdout)
+
+        output = stdout.getvalue()
+        for name in ("list_events", "tech_group_events", "scraped_events"):
+            assert name in output
+        # Upcoming approved events are read in order from the partial index.
+        list_events = output.split("list_events")[1]
+        assert "web_event_approved_date_idx" in list_events
+
+    def test_explains_some_queries(self):
+        stdout = io.StringIO()
+        call_command("explain_queries", "calendar", stdout=stdout)
+
+        assert "calendar" in stdout.getvalue()
+        assert "sidebar" not in stdout.getvalue()
+
+    def test_unknown_query(self):
+        with pytest.raises(CommandError, match="Unknown queries: nope"):
+            call_command("explain_queries", "nope", stdout=io.StringIO())
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from web.concurrency import HostLimiter, map_concurrently
+
+
+def test_map_concurrently_preserves_order():
+    def slow_square(n: int) -> int:
+        time.sleep(0.01 * (5 - n))
+        return n * n
+
+    actual = list(map_concurrently(slow_square, range(5), max_workers=5))
+
+    assert actual == [(0, 0), (1, 1), (2, 4), (3, 9), (4, 16)]
+
+
+def test_map_concurrently_reraises_errors():
+    def fail_on_two(n: int) -> int:
+        if n == 2:
+            raise ValueError(n)
+        return n
+
+    with pytest.raises(ValueError):
+        list(map_concurrently(fail_on_two, range(5), max_workers=2))
+
+
+def test_map_concurrently_submits_a_bounded_number_of_calls_ahead():
+    consumed = []
+
+    def items():
+        for n in range(100):
+            consumed.append(n)
+            yield n
+
+    results = map_concurrently(lambda n: n, items(), max_workers=2)
+    next(results)
+
+    assert len(consumed) == 5
+    assert [n for n, _ in results] == list(range(1, 100))
+
+
+def test_host_limiter_limits_each_host_separately():
+    limiter = HostLimiter(max_per_host=2)
+    lock = threading.Lock()
+    in_flight: dict[str, int] = {}
+    max_in_flight: dict[str, int] = {}
+
+    def fetch(url: str) -> None:
+        host = url.split("/")[2]
+        with limiter.limit(url):
+            with lock:
+                in_flight[host] = in_flight.get(host, 0) + 1
+                max_in_flight[host] = max(max_in_flight.get(host, 0), in_flight[host])
+            time.sleep(0.02)
+            with lock:
+                in_flight[host] -= 1
+
+    urls = [f"https://{host}/events/{i}/" for host in ("a.example.com", "b.example.com") for i in range(6)]
+    list(map_concurrently(fetch, urls, max_workers=12))
+
+    assert max_in_flight == {"a.example.com": 2, "b.example.com": 2}
@@ -0,0 +1,57 @@
+import pytest
+from django.utils import timezone
+
+from web import descriptions
+from web.models import Event
+
+
+def test_render_markdown():
+    html, excerpt = descriptions.render("Come learn **Python**.")
+
+    assert html == "<p>Come learn <strong>Python</strong>.</p>"
+    assert excerpt == html
+
+
+def test_render_sanitizes_html():
+    html, _ = descriptions.render('<p onclick="steal()">Hi</p><script>alert(1)</script><img src="x">')
+
+    assert "<p>Hi</p>" in html
+    assert "<script>" not in html
+    assert "onclick" not in html
+    assert "<img" not in html
+
+
+def test_render_excerpt_is_truncated():
+    html, excerpt = descriptions.render(" ".join(["word"] * 60))
+
+    assert html.count("word") == 60
+    assert excerpt.count("word") == descriptions.EXCERPT_WORDS
+    assert excerpt.endswith("…</p>")
+
+
+def test_text():
+    # Arrange
+    html, _ = descriptions.render("# Agenda\n\nFish &amp; [chips](https://example.com)\n\n- Talks\n- Q&A")
+
+    # Act
+    text = descriptions.text(html)
+
+    # Assert
+    assert text == "Agenda Fish & chips Talks Q&A"
+
+
+def test_render_empty_description():
+    assert descriptions.render(None) == ("", "")
+
+
+@pytest.mark.django_db
+def test_event_description_is_rendered_when_saved():
+    event = Event.objects.create(name="Event", description="*Hi*", date_time=timezone.localtime())
+    assert event.description_html == "<p><em>Hi</em></p>"
+
+    event.description = "*Bye*"
+    event.save(update_fields=["description"])
+
+    event.refresh_from_db()
+    assert event.description_html == event.description_excerpt == "<p><em>Bye</em></p>"
+    assert event.description_text == "Bye"
@@ -0,0 +1,69 @@
+import pytest
+from django.test import TestCase, override_settings
+
+from web import models, scrapers, services
+from benchmarks.fake_sources import FakeSourcesServer
+from web.http_client import HttpClient
+
+
+# The server is a single host, so the per-host rate limit would only slow the tests down.
+@override_settings(SCRAPER_HOST_RATE=0)
+class TestFakeSourcesServer(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeSourcesServer(events_per_group=60)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.http_client = HttpClient(retries=0)
+        self.server.error_rate = 0.0
+
+    def test_meetup_service_scrapes_groups_on_the_server(self):
+        # Arrange
+        tech_group = models.TechGroup.objects.create(name="Group", homepage=self.server.meetup_homepage(1))
+        models.TechGroup.objects.create(name="Other Group", homepage="https://example.com/")
+        service = services.MeetupService(http_client=self.http_client)
+
+        # Act
+        with override_settings(MEETUP_DOMAIN=self.server.meetup_url):
+            service.save_events()
+
+        # Assert
+        events = models.Event.all.filter(group=tech_group)
+        assert events.count() == 60
+        assert all(event.image_sha256 for event in events)
+
+    def test_eventbrite_service_follows_pagination(self):
+        # Arrange
+        tech_group = models.TechGroup.objects.create(name="Group")
+        organization = models.EventbriteOrganization.objects.create(
+            tech_group=tech_group, url=self.server.base_url, eventbrite_id="1"
+        )
+        with override_settings(EVENTBRITE_API_URL=self.server.eventbrite_api_url):
+            scraper = scrapers.EventbriteScraper(api_token="token", http_client=self.http_client)
+        service = services.EventbriteService(scraper)
+
+        # Act
+        counts = service.save_events_for(organization)
+
+        # Assert
+        assert counts.created == 60
+        event = models.Event.all.filter(group=tech_group).first()
+        assert event.location == "702 East Desmet Avenue, Spokane, WA 99202"
+
+    def test_errors_are_returned_like_the_eventbrite_api(self):
+        # Arrange
+        self.server.error_rate = 1.0
+        with override_settings(EVENTBRITE_API_URL=self.server.eventbrite_api_url):
+            scraper = scrapers.EventbriteScraper(api_token="token", http_client=self.http_client)
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            scraper.scrape("1")
@@ -0,0 +1,159 @@
+import json
+import pathlib
+import tempfile
+
+import pytest
+import requests
+import responses
+from responses import matchers
+
+from web.http_cache import ResponseCache, ResponseTooLarge
+
+URL = "https://www.meetup.com/python-spokane/events/298213205/"
+
+
+class TestResponseCache:
+    def setup_method(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name, ttl=60, max_bytes=1024)
+        self.session = requests.Session()
+
+    def teardown_method(self):
+        self.directory.cleanup()
+
+    @responses.activate
+    def test_not_modified_response_replays_cached_body(self):
+        responses.get(URL, body="<html>event</html>", headers={"ETag": '"v1"'})
+        responses.get(URL, status=304, match=[matchers.header_matcher({"If-None-Match": '"v1"'})])
+
+        first = self.cache.get(self.session, URL)
+        second = self.cache.get(self.session, URL)
+
+        assert not first.unchanged
+        assert second.unchanged
+        assert second.status_code == 200
+        assert second.text == "<html>event</html>"
+        assert self.cache.stats.hits == 1
+        assert self.cache.stats.misses == 1
+        assert self.cache.stats.bytes_saved == len("<html>event</html>")
+
+    @responses.activate
+    def test_identical_body_without_validators_is_unchanged(self):
+        responses.get(URL, body="<html>event</html>")
+
+        self.cache.get(self.session, URL)
+        second = self.cache.get(self.session, URL)
+
+        assert second.unchanged
+        assert self.cache.stats.unchanged == 1
+
+    @responses.activate
+    def test_changed_body_is_not_unchanged(self):
+        responses.get(URL, body="<html>event</html>")
+        responses.get(URL, body="<html>updated event</html>")
+
+        self.cache.get(self.session, URL)
+        second = self.cache.get(self.session, URL)
+
+        assert not second.unchanged
+        assert second.text == "<html>updated event</html>"
+
+    @responses.activate
+    def test_expired_entries_are_not_used(self):
+        responses.get(URL, body="<html>event</html>")
+        self.cache.get(self.session, URL)
+        self._age_entries(seconds=120)
+
+        second = self.cache.get(self.session, URL)
+
+        assert not second.unchanged
+        assert "If-None-Match" not in responses.calls[1].request.headers
+
+    @responses.activate
+    def test_evict_removes_expired_and_oldest_entries(self):
+        for i in range(3):
+            responses.get(f"{URL}{i}", body=b"x" * 400)
+            self.cache.get(self.session, f"{URL}{i}")
+            self._age_entries(seconds=1)
+
+        deleted = self.cache.evict()
+
+        assert deleted == 1
+        assert len(list(pathlib.Path(self.directory.name).glob("*/*.json"))) == 2
+
+    @responses.activate
+    def test_streamed_body_is_cached_and_replayed(self):
+        responses.get(URL, body=b"image", content_type="image/png", headers={"ETag": '"v1"'})
+        responses.get(URL, status=304, match=[matchers.header_matcher({"If-None-Match": '"v1"'})])
+
+        first = self.cache.get(self.session, URL, stream=True)
+        first_body = b"".join(first.iter_content(2))
+        first.close()
+        second = self.cache.get(self.session, URL, stream=True)
+        second_body = b"".join(second.iter_content(2))
+        second.close()
+
+        assert first_body == second_body == b"image"
+        assert second.unchanged
+        assert second.headers["Content-Type"] == "image/png"
+        assert second.headers["Content-Length"] == "5"
+
+    @responses.activate
+    def test_streamed_body_larger_than_max_bytes_is_not_cached(self):
+        responses.get(URL, body=b"x" * 100, auto_calculate_content_length=False)
+
+        with pytest.raises(ResponseTooLarge):
+            self.cache.get(self.session, URL, max_bytes=10, stream=True)
+
+        assert not list(pathlib.Path(self.directory.name).glob("*/*"))
+
+    @responses.activate
+    def test_uncommitted_body_is_not_unchanged(self):
+        # Arrange
+        responses.get(URL, body="<html>event</html>", headers={"ETag": '"v1"'})
+        self.cache.get(self.session, URL, commit=False)
+
+        # Act
+        second = self.cache.get(self.session, URL, commit=False)
+        self.cache.commit(URL)
+        third = self.cache.get(self.session, URL, commit=False)
+
+        # Assert
+        assert not second.unchanged
+        assert "If-None-Match" not in responses.calls[1].request.headers
+        assert third.unchanged
+        assert responses.calls[2].request.headers["If-None-Match"] == '"v1"'
+
+    @responses.activate
+    def test_uncommitted_body_does_not_replace_cached_one(self):
+        # Arrange
+        responses.get(URL, body="<html>event</html>")
+        responses.get(URL, body="<html>updated event</html>")
+        responses.get(URL, body="<html>event</html>")
+        self.cache.get(self.session, URL)
+        self.cache.get(self.session, URL, commit=False)
+
+        # Act
+        third = self.cache.get(self.session, URL, commit=False)
+
+        # Assert
+        assert third.unchanged
+
+    @responses.activate
+    def test_forgotten_page_is_not_unchanged(self):
+        # Arrange
+        responses.get(URL, body="<html>event</html>")
+        self.cache.get(self.session, URL)
+
+        # Act
+        self.cache.forget(URL)
+        second = self.cache.get(self.session, URL)
+
+        # Assert
+        assert not second.unchanged
+
+    def _age_entries(self, seconds: float) -> None:
+        for path in pathlib.Path(self.directory.name).glob("*/*.json"):
+            entry = json.loads(path.read_text())
+            entry["fetched_at"] -= seconds
+            path.write_text(json.dumps(entry))
@@ -0,0 +1,91 @@
+import io
+
+import pytest
+import requests
+import responses
+
+from web.http_client import HttpClient, ResponseTooLarge, UnexpectedContentType
+
+
+@responses.activate
+def test_get_retries_transient_errors():
+    url = "https://www.meetup.com/python-spokane/"
+    responses.get(url, status=503)
+    responses.get(url, status=429, headers={"Retry-After": "0"})
+    responses.get(url, body="ok")
+
+    client = HttpClient(retries=3, backoff_factor=0)
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.text == "ok"
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_get_returns_last_response_after_retries():
+    url = "https://www.meetup.com/python-spokane/"
+    responses.get(url, status=503)
+
+    client = HttpClient(retries=2, backoff_factor=0)
+    response = client.get(url)
+
+    assert response.status_code == 503
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_get_does_not_retry_client_errors():
+    url = "https://www.meetup.com/python-spokane/"
+    responses.get(url, status=404)
+
+    client = HttpClient(retries=3, backoff_factor=0)
+    response = client.get(url)
+
+    assert response.status_code == 404
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_download_writes_body_to_file():
+    url = "https://secure.meetupstatic.com/photos/event/image.jpeg"
+    responses.get(url, body=b"image", content_type="image/jpeg")
+    file = io.BytesIO()
+
+    client = HttpClient(retries=0)
+    response = client.download(url, file, max_bytes=10, content_type="image/")
+
+    assert response.status_code == 200
+    assert file.getvalue() == b"image"
+
+
+@responses.activate
+def test_download_rejects_large_bodies():
+    url = "https://secure.meetupstatic.com/photos/event/image.jpeg"
+    responses.get(url, body=b"x" * 100, content_type="image/jpeg")
+
+    client = HttpClient(retries=0)
+    with pytest.raises(ResponseTooLarge):
+        client.download(url, io.BytesIO(), max_bytes=10, content_type="image/")
+
+
+@responses.activate
+def test_download_rejects_unexpected_content_types():
+    url = "https://secure.meetupstatic.com/photos/event/image.jpeg"
+    responses.get(url, body="<html>Not found</html>", content_type="text/html")
+    file = io.BytesIO()
+
+    client = HttpClient(retries=0)
+    with pytest.raises(UnexpectedContentType):
+        client.download(url, file, max_bytes=1024, content_type="image/")
+    assert file.getvalue() == b""
+
+
+@responses.activate
+def test_download_raises_for_error_statuses():
+    url = "https://secure.meetupstatic.com/photos/event/image.jpeg"
+    responses.get(url, status=404)
+
+    client = HttpClient(retries=0)
+    with pytest.raises(requests.HTTPError):
+        client.download(url, io.BytesIO(), max_bytes=1024, content_type="image/")
@@ -0,0 +1,75 @@
+import io
+import pathlib
+from unittest import mock
+
+import pytest
+from django.core.files.storage import InMemoryStorage
+from PIL import Image
+
+from web import images
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def image_file(width: int, height: int, mode: str = "RGB", format: str = "PNG") -> io.BytesIO:
+    file = io.BytesIO()
+    Image.new(mode, (width, height)).save(file, format=format)
+    file.seek(0)
+    return file
+
+
+def test_plan_renditions():
+    with open(DATA_DIR / "meetup-image.jpeg", "rb") as file:
+        renditions = images.plan_renditions(images.open_image(file))
+
+    assert renditions == [
+        images.Rendition(400, 225, "webp"),
+        images.Rendition(400, 225, "jpeg"),
+        images.Rendition(800, 450, "webp"),
+        images.Rendition(800, 450, "jpeg"),
+        images.Rendition(1120, 630, "webp"),
+        images.Rendition(1120, 630, "jpeg"),
+    ]
+
+
+def test_plan_renditions_does_not_enlarge_images():
+    renditions = images.plan_renditions(images.open_image(image_file(300, 100)))
+
+    assert {(r.width, r.height) for r in renditions} == {(300, 100)}
+
+
+def test_plan_renditions_of_transparent_images_are_png():
+    renditions = images.plan_renditions(images.open_image(image_file(500, 500, mode="RGBA")))
+
+    assert [r.format for r in renditions] == ["webp", "png", "webp", "png"]
+
+
+def test_open_invalid_image():
+    with pytest.raises(ValueError):
+        images.open_image(io.BytesIO(b"not an image"))
+
+
+def test_save_renditions():
+    storage = InMemoryStorage()
+
+    renditions = images.save_renditions(storage, "abc123", image_file(500, 250))
+
+    assert renditions[0] == {"name": "renditions/abc123/400w.webp", "width": 400, "height": 200, "format": "webp"}
+    with Image.open(storage.open(renditions[0]["name"])) as rendition:
+        assert rendition.format == "WEBP"
+        assert rendition.size == (400, 200)
+
+
+def test_save_renditions_resizes_each_image_once():
+    storage = InMemoryStorage()
+    first = images.save_renditions(storage, "abc123", image_file(500, 250))
+
+    with mock.patch("web.images.resize") as mock_resize:
+        second = images.save_renditions(storage, "abc123", image_file(500, 250))
+
+    assert first == second
+    mock_resize.assert_not_called()
+
+
+def test_save_renditions_of_invalid_image():
+    assert images.save_renditions(InMemoryStorage(), "abc123", io.BytesIO(b"not an image")) == []
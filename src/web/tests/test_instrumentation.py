@@ -0,0 +1,51 @@
+import requests
+
+from web import instrumentation
+from web.concurrency import map_concurrently
+
+
+def response(status_code: int, content: bytes, **attributes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    for name, value in attributes.items():
+        setattr(response, name, value)
+    return response
+
+
+def test_metrics_are_collected_from_worker_threads():
+    def fetch(i: int) -> None:
+        with instrumentation.phase("fetch"):
+            instrumentation.record_response(response(200, b"x" * i))
+
+    with instrumentation.collect() as metrics:
+        list(map_concurrently(fetch, range(5), max_workers=3))
+
+    assert metrics.as_dict()["bytes_transferred"] == 0 + 1 + 2 + 3 + 4
+    assert metrics.as_dict()["status_counts"] == {"200": 5}
+    assert metrics.seconds["fetch"] > 0
+
+
+def test_responses_replayed_from_cache_count_as_not_modified():
+    with instrumentation.collect() as metrics:
+        instrumentation.record_response(response(200, b"cached body", from_cache=True))
+
+    assert metrics.as_dict()["bytes_transferred"] == 0
+    assert metrics.as_dict()["status_counts"] == {"304": 1}
+
+
+def test_nothing_is_recorded_outside_collect():
+    with instrumentation.phase("parse"):
+        instrumentation.record_response(response(200, b"body"))
+
+    with instrumentation.collect() as metrics:
+        pass
+
+    assert metrics.as_dict() == {
+        "seconds": dict.fromkeys(instrumentation.PHASES, 0.0),
+        "bytes_transferred": 0,
+        "status_counts": {},
+        "rate_limit_wait_seconds": 0.0,
+        "throttled": 0,
+        "circuit_rejected": 0,
+    }
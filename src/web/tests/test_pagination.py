@@ -0,0 +1,101 @@
+import datetime
+
+import pytest
+from bs4 import BeautifulSoup
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from web import pagination
+from web.models import Event, Tag, TechGroup
+
+
+@pytest.fixture
+def events(tech_group: TechGroup, make_event) -> list[Event]:
+    """Seven upcoming events, two of them at the same time, in the order they're listed."""
+    now = timezone.localtime()
+    events = [
+        make_event(tech_group, name=f"Event {i}", date_time=now + datetime.timedelta(days=i))
+        for i in (1, 2, 3, 3, 4, 5, 6)
+    ]
+    return sorted(events, key=lambda event: (event.date_time, event.pk))
+
+
+def next_url(response) -> str | None:
+    soup = BeautifulSoup(response.content, "lxml")
+    link = soup.select_one(".load-more a")
+    return link["hx-get"] if link else None  # type: ignore
+
+
+def test_cursor_round_trip():
+    cursor = pagination.Cursor(datetime.datetime(2024, 3, 19, 1, 0, 0, 123456, tzinfo=datetime.UTC), 42)
+
+    assert pagination.Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize("value", ["", "not a cursor", "MjAyNC0wMy0xOQ", "MjAyNC0wMy0xOVQwMTowMDowMHw0Mg"])
+def test_invalid_cursor(value: str):
+    # The last two are a cursor without a primary key and one without a time zone.
+    with pytest.raises(ValueError):
+        pagination.Cursor.decode(value)
+
+
+def test_paginate(events: list[Event]):
+    pages = []
+    cursor = None
+    while True:
+        page = pagination.paginate(Event.objects.all(), cursor, page_size=3)
+        pages.append(list(page))
+        if not (cursor := page.next_cursor):
+            break
+
+    assert pages == [events[:3], events[3:6], events[6:]]
+
+
+def test_paginate_last_page_is_full(events: list[Event]):
+    page = pagination.paginate(Event.objects.all(), None, page_size=len(events))
+
+    assert list(page) == events
+    assert page.next_cursor is None
+
+
+@override_settings(EVENTS_PAGE_SIZE=3)
+def test_list_events_is_paginated(client: Client, events: list[Event]):
+    response = client.get(reverse("web:list_events"))
+
+    assert list(response.context["queryset"]) == events[:3]
+    url = next_url(response)
+    assert url is not None
+
+    # Later pages are loaded into the list, so HTMX requests for them are only the events.
+    listed = events[:3]
+    while url:
+        response = client.get(url, headers={"HX-Request": "true"})
+        assert response.status_code == 200
+        assert response.templates[0].name == "web/partials/event_list_page.htm"
+        listed.extend(response.context["queryset"])
+        url = next_url(response)
+
+    assert listed == events
+
+
+@override_settings(EVENTS_PAGE_SIZE=1)
+def test_list_events_next_page_is_filtered_the_same_way(client: Client, events: list[Event]):
+    tag = baker.make(Tag)
+    for event in (events[1], events[4]):
+        event.tags.add(tag)
+
+    response = client.get(reverse("web:list_events"), {"tags": tag.pk})
+    assert list(response.context["queryset"]) == [events[1]]
+
+    response = client.get(next_url(response))  # type: ignore
+    assert list(response.context["queryset"]) == [events[4]]
+    assert next_url(response) is None
+
+
+def test_list_events_with_invalid_cursor(client: Client, events: list[Event]):
+    response = client.get(reverse("web:list_events"), {pagination.CURSOR_PARAM: "not a cursor"})
+
+    assert response.status_code == 400
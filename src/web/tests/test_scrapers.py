@@ -1,13 +1,23 @@
+import json
 import pathlib
+import re
+import tempfile
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from unittest import mock
+from zoneinfo import ZoneInfo, available_timezones
 
 import freezegun
 import pytest
 import responses
-from django.test import TestCase
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from responses import matchers
 
-from web import scrapers
+from web import models, scrapers
+from web.http_cache import ResponseCache
+from web.http_client import HttpClient
 
 BASE_DATA_DIR = pathlib.Path(__file__).parent / "data"
 
@@ -27,7 +37,7 @@ def mock_image_response(
 ) -> None:
     with open(filepath, "rb") as fin:
         body = fin.read()
-    responses.get(url, body=body)
+    responses.get(url, body=body, content_type=f"image/{filepath.suffix.removeprefix('.')}")
 
 
 class TestMeetupHomepageScraper(TestCase):
@@ -56,7 +66,7 @@ class TestMeetupHomepageScraper(TestCase):
     @freezegun.freeze_time("2024-03-18")
     @responses.activate
     def test_scraper_without_json(self):
-        fin = open(pathlib.Path(__file__).parent / "data" / "meetup-homepage-with-json.html")
+        fin = open(pathlib.Path(__file__).parent / "data" / "meetup-homepage-without-json.html")
         body = fin.read()
         fin.close()
         responses.get(
@@ -76,6 +86,19 @@ class TestMeetupHomepageScraper(TestCase):
         ]
         assert actual == expected
 
+    def test_timezone_index_is_built_once(self):
+        scrapers.timezones_by_abbreviation.cache_clear()
+
+        with mock.patch("zoneinfo.available_timezones", wraps=available_timezones) as mock_timezones:
+            scrapers.MeetupHomepageScraper()
+            index = scrapers.timezones_by_abbreviation()
+            scrapers.timezones_by_abbreviation()
+
+        mock_timezones.assert_called_once()
+        # Both standard and daylight saving time abbreviations are indexed, whatever the time of year.
+        assert index["PST"].utcoffset(datetime(2024, 1, 1)) == timedelta(hours=-8)
+        assert index["PDT"].utcoffset(datetime(2024, 7, 1)) == timedelta(hours=-7)
+
 
 class TestMeetupEventScraper(TestCase):
     @responses.activate
@@ -93,6 +116,7 @@ class TestMeetupEventScraper(TestCase):
         responses.get(
             "https://secure.meetupstatic.com/photos/event/1/0/a/e/highres_519844270.jpeg",
             body=body,
+            content_type="image/jpeg",
         )
 
         # Act
@@ -120,7 +144,7 @@ class TestMeetupEventScraper(TestCase):
 
         assert actual_image_result
         assert actual_image_result[0] == "highres_519844270.jpeg"
-        assert len(actual_image_result[1]) > 0
+        assert actual_image_result.size > 0
 
     @responses.activate
     def test_scraper_without_json(self):
@@ -159,7 +183,79 @@ class TestMeetupEventScraper(TestCase):
 
         assert actual_image_result
         assert actual_image_result[0] == "600_519844270.webp"
-        assert len(actual_image_result[1]) > 0
+        assert actual_image_result.size > 0
+
+    @responses.activate
+    def test_unchanged_page_is_not_scraped_again(self):
+        # Arrange
+        mock_response(
+            "https://www.meetup.com/python-spokane/events/298213205/",
+            BASE_DATA_DIR / "meetup-with-json.html",
+        )
+        mock_image_response(
+            "https://secure.meetupstatic.com/photos/event/1/0/a/e/highres_519844270.jpeg",
+            BASE_DATA_DIR / "meetup-image.jpeg",
+        )
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            response_cache = ResponseCache(cache_dir, ttl=60, max_bytes=10_000_000)
+            scraper = scrapers.MeetupEventScraper(HttpClient(response_cache=response_cache))
+            scraper.scrape("https://www.meetup.com/python-spokane/events/298213205/")
+            # Once the event is saved.
+            response_cache.commit("https://www.meetup.com/python-spokane/events/298213205/")
+
+            # Act & Assert
+            with pytest.raises(scrapers.PageUnchanged):
+                scraper.scrape("https://www.meetup.com/python-spokane/events/298213205/")
+
+    @responses.activate
+    def test_image_larger_than_max_bytes_is_skipped(self):
+        # Arrange
+        mock_response(
+            "https://www.meetup.com/python-spokane/events/298213205/",
+            BASE_DATA_DIR / "meetup-with-json.html",
+        )
+        mock_image_response(
+            "https://secure.meetupstatic.com/photos/event/1/0/a/e/highres_519844270.jpeg",
+            BASE_DATA_DIR / "meetup-image.jpeg",
+        )
+
+        # Act
+        with override_settings(SCRAPER_IMAGE_MAX_BYTES=1024):
+            event, _, image_result = scrapers.MeetupEventScraper().scrape(
+                "https://www.meetup.com/python-spokane/events/298213205/"
+            )
+
+        # Assert
+        assert event.external_id == "298213205"
+        assert image_result is None
+
+    @responses.activate
+    def test_page_with_json_is_not_parsed_as_html(self):
+        # Arrange
+        mock_response(
+            "https://www.meetup.com/python-spokane/events/298213205/",
+            BASE_DATA_DIR / "meetup-with-json.html",
+        )
+        mock_image_response(
+            "https://secure.meetupstatic.com/photos/event/1/0/a/e/highres_519844270.jpeg",
+            BASE_DATA_DIR / "meetup-image.jpeg",
+        )
+
+        # Act
+        with mock.patch("web.scrapers.BeautifulSoup") as mock_soup:
+            scrapers.MeetupEventScraper().scrape("https://www.meetup.com/python-spokane/events/298213205/")
+
+        # Assert
+        mock_soup.assert_not_called()
+
+    def test_apollo_state_is_same_as_parsed_from_html(self):
+        for filename in ("meetup-with-json.html", "meetup-homepage-with-json.html"):
+            content = (BASE_DATA_DIR / filename).read_bytes()
+            soup = BeautifulSoup(content, "lxml")
+            expected = json.loads(soup.find_all(id="__NEXT_DATA__")[0].text)["props"]["pageProps"]["__APOLLO_STATE__"]
+
+            assert scrapers.MeetupEventScraper()._parse_apollo_state(content) == expected
 
 
 @pytest.mark.eventbrite
@@ -218,4 +314,89 @@ class TestEventbriteScraper(TestCase):
             image_result[0]
             == "https%3A%2F%2Fcdn.evbuc.com%2Fimages%2F843746309%2F530357704049%2F1%2Foriginal.20240906-164727"
         )
-        assert len(image_result[1]) > 0
+        assert image_result.size > 0
+
+
+class TestEventbriteScraperRequests(TestCase):
+    ORGANIZER_EVENTS_URL = "https://www.eventbriteapi.com/v3/organizers/72020528223/events/"
+    VENUE_URL = "https://www.eventbriteapi.com/v3/venues/214450569/"
+
+    def setUp(self) -> None:
+        organizer_events = json.loads((BASE_DATA_DIR / "eventbrite" / "organizer_events.json").read_text())
+        self.eventbrite_event = organizer_events["events"][0]
+        self.venue = json.loads((BASE_DATA_DIR / "eventbrite" / "event_venue.json").read_text())
+
+    def mock_details(self, *external_ids: str) -> None:
+        for external_id in external_ids:
+            responses.get(
+                f"https://www.eventbriteapi.com/v3/events/{external_id}/description/",
+                json={"description": f"Description of {external_id}"},
+            )
+        responses.get(re.compile(r"https://img\.evbuc\.com/.*"), body=b"image")
+
+    def event(self, external_id: str, **kwargs) -> dict:
+        return {**self.eventbrite_event, "id": external_id, **kwargs}
+
+    def scrape(self) -> list[scrapers.EventScraperResult]:
+        scraper = scrapers.EventbriteScraper(api_token="token", http_client=HttpClient(retries=0))
+        return scraper.scrape("72020528223")
+
+    @responses.activate
+    def test_pages_are_followed_and_expanded_venues_are_not_fetched(self):
+        # Arrange
+        responses.get(
+            self.ORGANIZER_EVENTS_URL,
+            match=[matchers.query_param_matcher({"status": "live", "expand": "venue,logo"})],
+            json={
+                "pagination": {"has_more_items": True, "continuation": "page-2"},
+                "events": [self.event("1", venue=self.venue)],
+            },
+        )
+        responses.get(
+            self.ORGANIZER_EVENTS_URL,
+            match=[matchers.query_param_matcher({"status": "live", "expand": "venue,logo", "continuation": "page-2"})],
+            json={"pagination": {"has_more_items": False}, "events": [self.event("2", venue=self.venue)]},
+        )
+        self.mock_details("1", "2")
+
+        # Act
+        results = self.scrape()
+
+        # Assert
+        assert [event.external_id for event, _, _ in results] == ["1", "2"]
+        assert [event.description for event, _, _ in results] == ["Description of 1", "Description of 2"]
+        assert {event.location for event, _, _ in results} == {"702 East Desmet Avenue, Spokane, WA 99202"}
+        assert not any(call.request.url.startswith(self.VENUE_URL) for call in responses.calls)
+
+    @responses.activate
+    def test_venues_are_fetched_once_and_cached(self):
+        # Arrange
+        responses.get(self.ORGANIZER_EVENTS_URL, json={"events": [self.event("1"), self.event("2")]})
+        venue_response = responses.get(self.VENUE_URL, json=self.venue)
+        self.mock_details("1", "2")
+
+        # Act
+        self.scrape()
+        results = self.scrape()
+
+        # Assert
+        assert venue_response.call_count == 1
+        assert models.EventbriteVenue.objects.get().location == "702 East Desmet Avenue, Spokane, WA 99202"
+        assert results[0][0].location == "702 East Desmet Avenue, Spokane, WA 99202"
+
+    @responses.activate
+    def test_stale_venues_are_fetched_again(self):
+        # Arrange
+        responses.get(self.ORGANIZER_EVENTS_URL, json={"events": [self.event("1")]})
+        venue_response = responses.get(self.VENUE_URL, json=self.venue)
+        self.mock_details("1")
+        models.EventbriteVenue.objects.create(eventbrite_id="214450569", location="Old location")
+
+        # Act
+        with freezegun.freeze_time(timezone.now() + timedelta(seconds=settings.SCRAPER_EVENTBRITE_VENUE_TTL + 1)):
+            results = self.scrape()
+
+        # Assert
+        assert venue_response.call_count == 1
+        assert results[0][0].location == "702 East Desmet Avenue, Spokane, WA 99202"
+        assert models.EventbriteVenue.objects.get().location == "702 East Desmet Avenue, Spokane, WA 99202"
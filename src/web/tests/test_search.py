@@ -0,0 +1,215 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from web import search
+from web.models import Event, Tag, TechGroup
+
+
+def search_names(query: str) -> list[str]:
+    pks = search.ranked_pks(Event.objects.all(), query, offset=0, limit=10)
+    names = dict(Event.all.values_list("pk", "name"))
+    return [names[pk] for pk in pks]
+
+
+def test_matches_every_searched_field(tech_group: TechGroup, make_event):
+    # Arrange
+    make_event(name="Rust Meetup", location="Downtown Library")
+    make_event(name="Coffee", description="Bring your **laptop**")
+    tech_group.tags.add(Tag.objects.create(value="Programming"))
+    make_event(tech_group, name="Monthly Meeting")
+
+    # Act & Assert
+    assert search_names("rust") == ["Rust Meetup"]
+    assert search_names("library") == ["Rust Meetup"]
+    assert search_names("laptop") == ["Coffee"]
+    # The names of the event's tech group and effective tags.
+    assert search_names("spokane") == ["Monthly Meeting"]
+    assert search_names("programming") == ["Monthly Meeting"]
+
+
+def test_description_markup_is_not_searched(make_event):
+    # Arrange
+    make_event(name="Coffee", description="Read the [**slides**](https://example.com/slides)")
+
+    # Act & Assert
+    assert search_names("slides") == ["Coffee"]
+    for query in ("href", "https", "strong", "p"):
+        assert search_names(query) == []
+
+
+def test_matches_every_word_stemmed(make_event):
+    # Arrange
+    make_event(name="Python Meetups")
+    make_event(name="Python Workshop")
+
+    # Act
+    names = search_names("python meetup")
+
+    # Assert
+    assert names == ["Python Meetups"]
+
+
+def test_ranks_names_above_descriptions(make_event):
+    # Arrange
+    make_event(name="Coffee", description="Talks about Django and Django REST Framework")
+    make_event(name="Django Night")
+
+    # Act
+    names = search_names("django")
+
+    # Assert
+    assert names == ["Django Night", "Coffee"]
+
+
+def test_equal_matches_are_newest_first(make_event):
+    # Arrange
+    now = timezone.localtime()
+    make_event(name="Python", date_time=now - datetime.timedelta(days=30), description="Past")
+    make_event(name="Python", date_time=now + datetime.timedelta(days=30), description="Upcoming")
+
+    # Act
+    pks = search.ranked_pks(Event.objects.all(), "python", 0, 2)
+
+    # Assert
+    assert [Event.objects.get(pk=pk).description for pk in pks] == ["Upcoming", "Past"]
+
+
+def test_only_searches_queryset(make_event):
+    # Arrange
+    make_event(name="Python", approved=False)
+
+    # Act
+    names = search_names("python")
+
+    # Assert
+    assert names == []
+
+
+@pytest.mark.parametrize("query", ["", "   ", '"', "c++ AND (", "NEAR(python", "-*"])
+def test_query_syntax_is_not_interpreted(make_event, query: str):
+    # Arrange
+    make_event(name="Python")
+
+    # Act
+    pks = search.ranked_pks(Event.objects.all(), query, 0, 10)
+
+    # Assert
+    assert isinstance(pks, list)
+
+
+def test_offset_and_limit(make_event):
+    # Arrange
+    now = timezone.localtime()
+    for i in range(5):
+        make_event(name="Python", date_time=now + datetime.timedelta(days=i))
+    all_pks = search.ranked_pks(Event.objects.all(), "python", 0, 5)
+
+    # Act
+    pks = search.ranked_pks(Event.objects.all(), "python", 1, 2)
+
+    # Assert
+    assert pks == all_pks[1:3]
+
+
+def test_index_is_updated(make_event):
+    # Arrange
+    event = make_event(name="Python")
+
+    # Act
+    event.name = "Rust"
+    event.save()
+
+    # Assert
+    assert search_names("python") == []
+    assert search_names("rust") == ["Rust"]
+
+
+def test_index_is_updated_when_events_are_deleted(make_event):
+    # Arrange
+    event = make_event(name="Python")
+
+    # Act
+    event.delete()
+
+    # Assert
+    assert search_names("python") == []
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite only")
+def test_install_restores_missing_triggers(make_event):
+    # Arrange
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER {search.FTS_TABLE}_insert")
+    make_event(name="Python")
+    assert search_names("python") == []
+
+    # Act
+    search.install(connection)
+
+    # Assert
+    assert search_names("python") == ["Python"]
+    make_event(name="Python")
+    assert search_names("python") == ["Python", "Python"]
+
+
+def test_search_view(client: Client, tech_group: TechGroup, make_event):
+    # Arrange
+    make_event(tech_group, name="Python Meetup")
+    make_event(tech_group, name="Rust Meetup")
+
+    # Act
+    response = client.get(reverse("web:search_events"), {"q": "rust"})
+
+    # Assert
+    assert response.status_code == 200
+    assert [event.name for event in response.context["queryset"]] == ["Rust Meetup"]
+    assert "Python Meetup" not in response.content.decode()
+
+
+def test_search_view_htmx_partials(client: Client, make_event):
+    # Arrange
+    make_event(name="Python Meetup")
+    url = reverse("web:search_events")
+
+    # Act
+    form = client.get(url, {"q": "python"}, headers={"HX-Request": "true"})
+    results = client.get(url, {"q": "python"}, headers={"HX-Request": "true", "HX-Target": "search-results"})
+    no_results = client.get(url, {"q": "rust"}, headers={"HX-Request": "true", "HX-Target": "search-results"})
+
+    # Assert
+    assert form.templates[0].name == "web/partials/event_search.htm"
+    assert results.templates[0].name == "web/partials/event_search_results.htm"
+    assert "Python Meetup" in results.content.decode()
+    assert "No events match" in no_results.content.decode()
+
+
+@override_settings(EVENTS_PAGE_SIZE=2)
+def test_search_view_is_paginated(client: Client, make_event):
+    # Arrange
+    now = timezone.localtime()
+    for i in range(3):
+        make_event(name=f"Python {i}", date_time=now + datetime.timedelta(days=i))
+
+    # Act
+    first_page = client.get(reverse("web:search_events"), {"q": "python"}).context["queryset"]
+    response = client.get(first_page.next_url, headers={"HX-Request": "true"})
+
+    # Assert
+    assert [event.name for event in first_page] == ["Python 2", "Python 1"]
+    assert response.templates[0].name == "web/partials/event_list_page.htm"
+    assert [event.name for event in response.context["queryset"]] == ["Python 0"]
+    assert not response.context["queryset"].next_url
+
+
+def test_search_view_with_invalid_page(client: Client, db):
+    # Act
+    response = client.get(reverse("web:search_events"), {"q": "python", "page": "x"})
+
+    # Assert
+    assert response.status_code == 400
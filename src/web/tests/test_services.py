@@ -1,7 +1,20 @@
+import hashlib
+import pathlib
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+import freezegun
+import requests
+import responses
 from django.test import TestCase
 from django.utils import timezone
 
-from web import models, scrapers, services
+from web import instrumentation, models, scrapers, services
+from web.http_cache import ResponseCache
+from web.http_client import HttpClient
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
 
 
 class MockMeetupHomepageScraper(scrapers.Scraper[list[str]]):
@@ -33,10 +46,7 @@ class MockMeetupEventScraper(scrapers.Scraper[scrapers.EventScraperResult]):
                     models.Tag(value="Agile and Scrum"),
                     models.Tag(value="Python Web Development"),
                 ],
-                (
-                    "image_name",
-                    b"image.png",
-                ),
+                scrapers.ImageResult.from_content("image_name", b"image.png"),
             )
 
         return (
@@ -53,10 +63,7 @@ class MockMeetupEventScraper(scrapers.Scraper[scrapers.EventScraperResult]):
                 models.Tag(value="Agile and Scrum"),
                 models.Tag(value="Python Web Development"),
             ],
-            (
-                "image_name",
-                b"image.png",
-            ),
+            scrapers.ImageResult.from_content("image_name", b"image.png"),
         )
 
 
@@ -168,3 +175,428 @@ class TestMeetupService(TestCase):
 
         assert tags.count() == 5
         assert set(tags.all()) == expected_tags
+
+    def test_events_from_many_pages_are_all_saved(self):
+        # Arrange
+        event_urls = [f"https://www.meetup.com/python-spokane/events/{i}/" for i in range(10)]
+
+        class ManyEventsHomepageScraper(scrapers.Scraper[list[str]]):
+            def scrape(self, url: str) -> list[str]:
+                return event_urls
+
+        class ManyEventsScraper(scrapers.Scraper[scrapers.EventScraperResult]):
+            def scrape(self, url: str) -> scrapers.EventScraperResult:
+                external_id = url.rstrip("/").rsplit("/", maxsplit=1)[-1]
+                event = models.Event(
+                    name=f"Event {external_id}",
+                    date_time=timezone.localtime(),
+                    external_id=external_id,
+                    url=url,
+                )
+                return event, [], None
+
+        models.TechGroup.objects.create(
+            name="Spokane Python User Group",
+            homepage="https://www.meetup.com/Python-Spokane/",
+        )
+
+        meetup_service = services.MeetupService(
+            ManyEventsHomepageScraper(),
+            ManyEventsScraper(),
+            max_workers=4,
+        )
+
+        # Act
+        meetup_service.save_events()
+
+        # Assert
+        assert list(models.Event.objects.order_by("pk").values_list("url", flat=True)) == event_urls
+
+    def test_failed_page_does_not_stop_other_events_from_saving(self):
+        # Arrange
+        class FlakyEventScraper(scrapers.Scraper[scrapers.EventScraperResult]):
+            def scrape(self, url: str) -> scrapers.EventScraperResult:
+                if url.endswith("/1/"):
+                    raise requests.HTTPError("503 Server Error")
+                event = models.Event(name=url, date_time=timezone.localtime(), external_id=url, url=url)
+                return event, [], None
+
+        class TwoEventsHomepageScraper(scrapers.Scraper[list[str]]):
+            def scrape(self, url: str) -> list[str]:
+                return [
+                    "https://www.meetup.com/python-spokane/events/1/",
+                    "https://www.meetup.com/python-spokane/events/2/",
+                ]
+
+        models.TechGroup.objects.create(
+            name="Spokane Python User Group",
+            homepage="https://www.meetup.com/Python-Spokane/",
+        )
+
+        meetup_service = services.MeetupService(TwoEventsHomepageScraper(), FlakyEventScraper())
+
+        # Act
+        with self.assertLogs("web.services", level="ERROR"):
+            meetup_service.save_events()
+
+        # Assert
+        event = models.Event.objects.get()
+        assert event.url == "https://www.meetup.com/python-spokane/events/2/"
+
+
+class TestMeetupServiceResponseCache(TestCase):
+    EVENT_URL = "https://www.meetup.com/python-spokane/events/298213205/"
+    IMAGE_URL = "https://secure.meetupstatic.com/photos/event/1/0/a/e/highres_519844270.jpeg"
+
+    def setUp(self):
+        self.tech_group = models.TechGroup.objects.create(
+            name="Spokane Python User Group",
+            homepage="https://www.meetup.com/Python-Spokane/",
+        )
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        http_client = HttpClient(
+            retries=0, response_cache=ResponseCache(self.cache_dir.name, ttl=60, max_bytes=10_000_000)
+        )
+        self.meetup_service = services.MeetupService(MockMeetupHomepageScraper(), http_client=http_client)
+        responses.get(self.EVENT_URL, body=(DATA_DIR / "meetup-with-json.html").read_bytes())
+
+    def mock_image(self) -> None:
+        responses.get(self.IMAGE_URL, body=(DATA_DIR / "meetup-image.jpeg").read_bytes(), content_type="image/jpeg")
+
+    @responses.activate
+    def test_page_is_scraped_again_until_its_event_is_saved(self):
+        # Arrange
+        responses.get(self.IMAGE_URL, status=404)
+        self.mock_image()
+        with self.assertLogs("web.services", level="ERROR"):
+            self.meetup_service.save_events_for([self.tech_group])
+        assert not models.Event.objects.exists()
+
+        # Act
+        counts = self.meetup_service.save_events_for([self.tech_group])
+
+        # Assert
+        assert counts == services.SaveCounts(created=1)
+        assert models.Event.objects.get().image
+
+    @responses.activate
+    def test_unchanged_page_is_skipped_once_its_event_is_saved(self):
+        # Arrange
+        self.mock_image()
+        self.meetup_service.save_events_for([self.tech_group])
+
+        # Act
+        counts = self.meetup_service.save_events_for([self.tech_group])
+
+        # Assert
+        assert counts == services.SaveCounts()
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_unchanged_page_of_deleted_event_is_scraped_again(self):
+        # Arrange
+        self.mock_image()
+        self.meetup_service.save_events_for([self.tech_group])
+        models.Event.all.all().delete()
+
+        # Act
+        counts = self.meetup_service.save_events_for([self.tech_group])
+
+        # Assert
+        assert counts == services.SaveCounts(created=1)
+
+
+class TestEventServiceImages(TestCase):
+    def setUp(self):
+        self.tech_group = models.TechGroup.objects.create(name="Spokane Python User Group")
+        self.event_service = services.EventService()
+
+    def save(self, image_result: scrapers.ImageResult) -> models.Event:
+        event = models.Event(name="Intro to Dagger", date_time=timezone.localtime(), external_id="298213205")
+        self.event_service.save_event_from_result((event, [], image_result), self.tech_group)
+        return models.Event.objects.get()
+
+    def test_image_digest_is_stored(self):
+        event = self.save(scrapers.ImageResult.from_content("image.png", b"image", "https://example.com/image.png"))
+
+        assert event.image_sha256 == hashlib.sha256(b"image").hexdigest()
+        assert event.image_size == len(b"image")
+        assert event.image_source_url == "https://example.com/image.png"
+
+    def test_image_is_reuploaded_when_contents_change(self):
+        event1 = self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+        event2 = self.save(scrapers.ImageResult.from_content("image.png", b"new image"))
+
+        assert event1.image.name != event2.image.name
+        assert event2.image_sha256 == hashlib.sha256(b"new image").hexdigest()
+        assert event2.image.read() == b"new image"
+
+    def test_stored_image_is_not_read_when_digest_is_known(self):
+        self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+
+        with mock.patch("django.db.models.fields.files.FieldFile.open") as mock_open:
+            self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+
+        mock_open.assert_not_called()
+
+    def test_digest_is_backfilled_for_images_saved_without_one(self):
+        event1 = self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+        models.Event.objects.update(image_sha256="", image_size=None)
+
+        event2 = self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+
+        assert event1.image.name == event2.image.name
+        assert event2.image_sha256 == hashlib.sha256(b"image").hexdigest()
+
+    def test_failed_image_upload_is_retried(self):
+        with (
+            mock.patch("web.images.save_renditions", side_effect=OSError("Storage unavailable")),
+            self.assertRaises(OSError),
+        ):
+            self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+        assert models.Event.objects.get().scrape_fingerprint == ""
+
+        event = self.save(scrapers.ImageResult.from_content("image.png", b"image"))
+
+        assert event.image.read() == b"image"
+        assert event.scrape_fingerprint
+
+    def test_renditions_are_stored(self):
+        image = (DATA_DIR / "meetup-image.jpeg").read_bytes()
+
+        event = self.save(scrapers.ImageResult.from_content("image.jpeg", image))
+
+        assert [(r["width"], r["format"]) for r in event.image_renditions] == [
+            (400, "webp"),
+            (400, "jpeg"),
+            (800, "webp"),
+            (800, "jpeg"),
+            (1120, "webp"),
+            (1120, "jpeg"),
+        ]
+        assert all(event.image.storage.exists(r["name"]) for r in event.image_renditions)
+
+    def test_renditions_are_made_for_unchanged_images_saved_without_them(self):
+        image = (DATA_DIR / "meetup-image.jpeg").read_bytes()
+        self.save(scrapers.ImageResult.from_content("image.jpeg", image))
+        models.Event.objects.update(image_renditions=[])
+
+        event = self.save(scrapers.ImageResult.from_content("image.jpeg", image))
+
+        assert len(event.image_renditions) == 6
+
+
+class TestEventServiceSaveResults(TestCase):
+    def setUp(self):
+        self.tech_group = models.TechGroup.objects.create(name="Spokane Python User Group")
+        self.event_service = services.EventService()
+        self.date_time = timezone.localtime()
+
+    def results(self, count: int, name: str = "Event") -> list[scrapers.EventScraperResult]:
+        return [
+            (
+                models.Event(name=f"{name} {i}", date_time=self.date_time, external_id=str(i)),
+                [models.Tag(value="Python"), models.Tag(value=f"Tag {i}")],
+                None,
+            )
+            for i in range(count)
+        ]
+
+    def test_query_count_does_not_grow_with_number_of_events(self):
+        # Select fingerprints, savepoint, upsert, read back, select tags, insert tags, select new tags,
+        # insert through rows, select the events, their own tags, their group's tags and their effective
+        # tags, insert effective tags, select the events, their tag names and their group names and search
+        # keywords, update search keywords, release.
+        with self.assertNumQueries(18):
+            self.event_service.save_results(self.results(2), self.tech_group)
+        # Up to 49 events, which SQLite can upsert in one query; it's limited to 999 parameters.
+        with self.assertNumQueries(18):
+            self.event_service.save_results(self.results(40), self.tech_group)
+        # Once every tag exists, they are resolved in one query, and effective tags and search keywords are
+        # already up to date.
+        with self.assertNumQueries(14):
+            self.event_service.save_results(self.results(40, name="Updated"), self.tech_group)
+
+    def test_effective_tags_are_updated(self):
+        self.tech_group.tags.add(models.Tag.objects.create(value="Group tag"))
+
+        self.event_service.save_results(self.results(1) + [self.results(2)[1][:1] + ([], None)], self.tech_group)
+
+        assert {tag.value for tag in models.Event.objects.get(external_id="0").effective_tags.all()} == {
+            "Python",
+            "Tag 0",
+        }
+        assert [tag.value for tag in models.Event.objects.get(external_id="1").effective_tags.all()] == ["Group tag"]
+
+    def test_descriptions_are_rendered(self):
+        results = self.results(1)
+        results[0][0].description = "**Python** meetup"
+
+        self.event_service.save_results(results, self.tech_group)
+
+        assert models.Event.objects.get().description_html == "<p><strong>Python</strong> meetup</p>"
+
+    def test_unchanged_events_are_not_written(self):
+        assert self.event_service.save_results(self.results(3), self.tech_group) == services.SaveCounts(created=3)
+        updated_at = models.Event.objects.get(external_id="0").updated_at
+
+        with self.assertNumQueries(1):
+            counts = self.event_service.save_results(self.results(3), self.tech_group)
+
+        assert counts == services.SaveCounts(unchanged=3)
+        assert models.Event.objects.get(external_id="0").updated_at == updated_at
+
+    def test_changed_events_are_counted_as_updated(self):
+        self.event_service.save_results(self.results(2), self.tech_group)
+        results = self.results(2)
+        results[1][1].append(models.Tag(value="Django"))
+
+        counts = self.event_service.save_results(results + self.results(3)[2:], self.tech_group)
+
+        assert counts == services.SaveCounts(created=1, updated=1, unchanged=1)
+        assert "Django" in models.Event.objects.get(external_id="1").tags.values_list("value", flat=True)
+
+    def test_events_are_updated_instead_of_duplicated(self):
+        self.event_service.save_results(self.results(3), self.tech_group)
+        updated_at = models.Event.objects.get(external_id="0").updated_at
+
+        self.event_service.save_results(self.results(3, name="Updated"), self.tech_group)
+
+        assert list(models.Event.objects.order_by("pk").values_list("name", flat=True)) == [
+            "Updated 0",
+            "Updated 1",
+            "Updated 2",
+        ]
+        assert models.Event.objects.get(external_id="0").updated_at > updated_at
+        assert models.Tag.objects.count() == 4
+        assert set(models.Event.objects.get(external_id="2").tags.values_list("value", flat=True)) == {
+            "Python",
+            "Tag 2",
+        }
+
+    def test_last_result_wins_for_duplicate_external_ids(self):
+        results = self.results(1) + self.results(1, name="Updated")
+
+        counts = self.event_service.save_results(results, self.tech_group)
+
+        assert counts == services.SaveCounts(created=1)
+        assert models.Event.objects.get().name == "Updated 0"
+
+    def test_result_without_external_id_is_skipped(self):
+        results = self.results(2)
+        results[0][0].external_id = None
+
+        with self.assertLogs("web.services", level="ERROR"):
+            counts = self.event_service.save_results(results, self.tech_group)
+
+        assert counts == services.SaveCounts(created=1)
+        assert models.Event.objects.get().external_id == "1"
+
+
+class TestScrapeRunService(TestCase):
+    def outcome(self, tech_group: models.TechGroup, created: int, fetch_seconds: float, error: str = "") -> dict:
+        return {
+            "id": tech_group.pk,
+            "tech_group_id": tech_group.pk,
+            "counts": {"created": created, "updated": 1, "unchanged": 0},
+            "error": error,
+            "seconds": 2.5,
+            "metrics": {
+                "seconds": {**dict.fromkeys(instrumentation.PHASES, 0.0), "fetch": fetch_seconds},
+                "bytes_transferred": 1000,
+                "status_counts": {"200": 3, "304": 1},
+                "rate_limit_wait_seconds": 0.25,
+                "throttled": 1,
+                "circuit_rejected": 0,
+            },
+            "staleness": 3600.0,
+        }
+
+    def test_run_totals_are_sums_of_items(self):
+        # Arrange
+        python = models.TechGroup.objects.create(name="Python")
+        rust = models.TechGroup.objects.create(name="Rust")
+        started_at = timezone.now() - timedelta(seconds=10)
+
+        # Act
+        with self.assertNumQueries(4):  # Savepoint, run, items, release.
+            run = services.ScrapeRunService().record(
+                "meetup",
+                started_at,
+                [self.outcome(python, 2, 1.5), self.outcome(rust, 3, 0.5, error="RuntimeError()")],
+            )
+
+        # Assert
+        run.refresh_from_db()
+        assert (run.created, run.updated, run.failed) == (5, 2, 1)
+        assert run.fetch_seconds == 2.0
+        assert run.bytes_transferred == 2000
+        assert run.http_status_counts == {"200": 6, "304": 2}
+        assert (run.rate_limit_wait_seconds, run.throttled) == (0.5, 2)
+        assert run.items.get(tech_group=python).staleness == timedelta(hours=1)
+        assert run.duration >= timedelta(seconds=10)
+        assert run.items.get(tech_group=python).duration == timedelta(seconds=2.5)
+
+
+class TestScrapeScheduler(TestCase):
+    def setUp(self):
+        self.scheduler = services.ScrapeScheduler(min_interval=timedelta(hours=1), max_interval=timedelta(hours=100))
+        self.now = timezone.now()
+
+    def test_interval_depends_on_how_often_events_change(self):
+        assert self.scheduler.interval(1.0, None, self.now) == timedelta(hours=1)
+        assert self.scheduler.interval(0.5, None, self.now) == timedelta(hours=10)
+        assert self.scheduler.interval(0.0, None, self.now) == timedelta(hours=100)
+
+    def test_groups_are_scraped_more_often_before_an_event(self):
+        assert self.scheduler.interval(0.0, self.now + timedelta(hours=20), self.now) == timedelta(hours=5)
+        assert self.scheduler.interval(0.0, self.now + timedelta(hours=2), self.now) == timedelta(hours=1)
+
+    @freezegun.freeze_time("2024-03-18 12:00")
+    def test_record_reschedules_the_group(self):
+        # Arrange
+        tech_group = models.TechGroup.objects.create(name="Python")
+        models.Event.objects.create(name="Event", group=tech_group, date_time=timezone.now() + timedelta(hours=8))
+
+        # Act
+        with mock.patch("web.services.random.uniform", return_value=1.0):
+            self.scheduler.record(tech_group, tech_group, services.SaveCounts(created=1))
+
+        # Assert
+        tech_group.refresh_from_db()
+        assert tech_group.change_rate == 0.65
+        assert tech_group.last_scraped_at == tech_group.last_changed_at == timezone.now()
+        assert tech_group.next_scrape_at == timezone.now() + timedelta(hours=2)
+
+    @freezegun.freeze_time("2024-03-18 12:00")
+    def test_failed_scrapes_are_retried_after_the_minimum_interval(self):
+        tech_group = models.TechGroup.objects.create(name="Python")
+
+        with mock.patch("web.services.random.uniform", return_value=1.0):
+            self.scheduler.record(tech_group, tech_group, None)
+
+        tech_group.refresh_from_db()
+        assert tech_group.last_scraped_at is None
+        assert tech_group.change_rate == 0.5
+        assert tech_group.next_scrape_at == timezone.now() + timedelta(hours=1)
+
+    @freezegun.freeze_time("2024-03-18 12:00")
+    def test_claim_due_returns_the_longest_overdue_groups(self):
+        # Arrange
+        now = timezone.now()
+        overdue = models.TechGroup.objects.create(name="Overdue", next_scrape_at=now - timedelta(hours=2))
+        new = models.TechGroup.objects.create(name="New")
+        models.TechGroup.objects.create(name="Due", next_scrape_at=now - timedelta(hours=1))
+        models.TechGroup.objects.create(name="Not due", next_scrape_at=now + timedelta(hours=1))
+
+        # Act
+        claimed = self.scheduler.claim_due(models.TechGroup.objects.all(), limit=2)
+
+        # Assert
+        assert claimed == [new.pk, overdue.pk]
+        assert self.scheduler.claim_due(models.TechGroup.objects.all(), limit=2) == [
+            models.TechGroup.objects.get(name="Due").pk
+        ]
+        overdue.refresh_from_db()
+        assert overdue.next_scrape_at == now + timedelta(hours=1)
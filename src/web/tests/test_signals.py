@@ -0,0 +1,115 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from web.models import Event, Tag, TechGroup
+
+
+class TestEffectiveTags(TestCase):
+    def setUp(self):
+        self.python = Tag.objects.create(value="Python")
+        self.django = Tag.objects.create(value="Django")
+        self.rust = Tag.objects.create(value="Rust")
+        self.group = TechGroup.objects.create(name="Spokane Python User Group")
+        self.group.tags.set([self.python])
+        now = timezone.localtime()
+        self.event = Event.objects.create(name="Event", group=self.group, date_time=now, approved_at=now)
+
+    def effective_tags(self, event: Event | None = None) -> set[str]:
+        return {tag.value for tag in (event or self.event).effective_tags.all()}
+
+    def test_events_without_tags_have_their_groups_tags(self):
+        assert self.effective_tags() == {"Python"}
+
+    def test_events_own_tags_replace_their_groups_tags(self):
+        self.event.tags.add(self.django)
+        assert self.effective_tags() == {"Django"}
+
+        self.event.tags.clear()
+        assert self.effective_tags() == {"Python"}
+
+    def test_group_tags_changed(self):
+        self.group.tags.add(self.rust)
+        assert self.effective_tags() == {"Python", "Rust"}
+
+        self.group.tags.remove(self.python)
+        assert self.effective_tags() == {"Rust"}
+
+    def test_tag_added_to_events_and_groups(self):
+        self.django.event_set.add(self.event)
+        assert self.effective_tags() == {"Django"}
+
+        self.django.event_set.remove(self.event)
+        self.rust.techgroup_set.add(self.group)
+        assert self.effective_tags() == {"Python", "Rust"}
+
+    def test_tag_cleared_from_every_group(self):
+        self.python.techgroup_set.clear()
+
+        assert self.effective_tags() == set()
+
+    def test_tag_cleared_from_every_event(self):
+        self.django.event_set.add(self.event)
+
+        self.django.event_set.clear()
+
+        assert self.effective_tags() == {"Python"}
+
+    def test_event_moved_to_another_group(self):
+        other_group = TechGroup.objects.create(name="Rust Spokane")
+        other_group.tags.set([self.rust])
+
+        self.event.group = other_group
+        self.event.save()
+
+        assert self.effective_tags() == {"Rust"}
+
+    def test_group_deleted(self):
+        self.group.delete()
+
+        assert self.effective_tags(Event.objects.get()) == set()
+
+    def test_deleted_tags_are_removed(self):
+        self.python.delete()
+
+        assert self.effective_tags() == set()
+
+    def test_deleted_own_tag_falls_back_to_group_tags(self):
+        self.event.tags.add(self.django)
+
+        self.django.delete()
+
+        assert self.effective_tags() == {"Python"}
+
+
+class TestSearchKeywords(TestCase):
+    def setUp(self):
+        self.python = Tag.objects.create(value="Python")
+        self.group = TechGroup.objects.create(name="Spokane Python User Group")
+        self.group.tags.set([self.python])
+        now = timezone.localtime()
+        self.event = Event.objects.create(name="Event", group=self.group, date_time=now, approved_at=now)
+
+    def search_keywords(self) -> str:
+        return Event.objects.values_list("search_keywords", flat=True).get(pk=self.event.pk)
+
+    def test_group_and_effective_tag_names(self):
+        self.event.tags.add(Tag.objects.create(value="Django"), Tag.objects.create(value="AI"))
+
+        assert self.search_keywords() == "Spokane Python User Group AI Django"
+
+    def test_group_renamed(self):
+        self.group.name = "Python Spokane"
+        self.group.save()
+
+        assert self.search_keywords() == "Python Spokane Python"
+
+    def test_tag_renamed(self):
+        self.python.value = "Python 3"
+        self.python.save()
+
+        assert self.search_keywords() == "Spokane Python User Group Python 3"
+
+    def test_tag_cleared_from_every_group(self):
+        self.python.techgroup_set.clear()
+
+        assert self.search_keywords() == "Spokane Python User Group"
@@ -1,9 +1,12 @@
 from datetime import timedelta
+from unittest import mock
 
 import freezegun
+import requests
+from django.conf import settings
 from django.test import TestCase
 from django.utils import timezone
-from web import models, services
+from web import models, scrapers, services, tasks
 
 
 class SimpleSender(services.Sender):
@@ -55,3 +58,106 @@ Spokane Python User Group — [Advanced Python](<https://spokanetech.org/events/
         sender = SimpleSender(expected)
         service = services.DiscordService(sender)
         service.send_events()
+
+
+class TestScrapeEventsFromMeetup(TestCase):
+    def setUp(self) -> None:
+        conf = tasks.scrape_events_from_meetup.app.conf
+        conf.task_always_eager = True
+        self.addCleanup(setattr, conf, "task_always_eager", False)
+
+    def test_one_failing_group_does_not_stop_the_others(self):
+        # Arrange
+        python = models.TechGroup.objects.create(name="Python", homepage="https://www.meetup.com/python-spokane/")
+        broken = models.TechGroup.objects.create(name="Broken", homepage="https://www.meetup.com/broken/")
+        models.TechGroup.objects.create(name="Not on Meetup", homepage="https://example.com/")
+
+        def save_events_for(tech_groups, **kwargs):
+            (tech_group,) = tech_groups
+            if tech_group == broken:
+                raise RuntimeError("Boom")
+            return services.SaveCounts(created=2, unchanged=1)
+
+        # Act
+        with (
+            mock.patch.object(services.MeetupService, "save_events_for", side_effect=save_events_for) as mock_save,
+            self.assertLogs("web.tasks", level="INFO") as logs,
+        ):
+            tasks.scrape_events_from_meetup()
+
+        # Assert
+        assert sorted(call.args[0][0].pk for call in mock_save.call_args_list) == [python.pk, broken.pk]
+        assert any("Failed to scrape Meetup events for tech group" in line for line in logs.output)
+
+        run = models.ScrapeRun.objects.get()
+        assert (run.source, run.created, run.unchanged, run.failed) == ("meetup", 2, 1, 1)
+        assert sorted(run.items.values_list("tech_group", "error")) == [
+            (python.pk, ""),
+            (broken.pk, "RuntimeError('Boom')"),
+        ]
+        assert (
+            f"Scraped meetup: 2 events created, 0 updated, 1 unchanged by 2 subtasks, 1 failed [{broken.pk}]"
+            in logs.output[-1]
+        )
+        python.refresh_from_db()
+        broken.refresh_from_db()
+        assert python.last_scraped_at and python.next_scrape_at
+        assert broken.last_scraped_at is None and broken.next_scrape_at
+
+    def test_failed_homepage_fails_the_subtask(self):
+        # Arrange
+        tech_group = models.TechGroup.objects.create(name="Python", homepage="https://www.meetup.com/python-spokane/")
+
+        # Act
+        with (
+            mock.patch.object(scrapers.MeetupHomepageScraper, "scrape", side_effect=requests.ConnectionError("Down")),
+            self.assertLogs("web.tasks", level="INFO"),
+        ):
+            tasks.scrape_events_from_meetup()
+
+        # Assert
+        run = models.ScrapeRun.objects.get()
+        assert run.failed == 1
+        assert run.items.get().error == "ConnectionError('Down')"
+        tech_group.refresh_from_db()
+        assert tech_group.last_scraped_at is None
+        # Retried after about the minimum interval, rather than as if nothing had changed.
+        min_interval = timedelta(seconds=settings.SCRAPER_SCHEDULE_MIN_INTERVAL)
+        assert tech_group.next_scrape_at < timezone.now() + 2 * min_interval
+
+    def test_dispatch_scrapes_only_groups_that_are_due(self):
+        # Arrange
+        now = timezone.now()
+        due = models.TechGroup.objects.create(name="Due", homepage="https://www.meetup.com/due/")
+        models.TechGroup.objects.create(
+            name="Not due", homepage="https://www.meetup.com/not-due/", next_scrape_at=now + timedelta(hours=1)
+        )
+        organization = models.EventbriteOrganization.objects.create(
+            tech_group=due, url="https://www.eventbrite.com/o/due", eventbrite_id="1", next_scrape_at=now
+        )
+
+        # Act
+        with (
+            mock.patch.object(services.MeetupService, "save_events_for", return_value=services.SaveCounts()) as meetup,
+            mock.patch.object(
+                services.EventbriteService, "save_events_for", return_value=services.SaveCounts(updated=1)
+            ) as eventbrite,
+        ):
+            tasks.dispatch_due_scrapes()
+            tasks.dispatch_due_scrapes()
+
+        # Assert
+        assert [call.args[0] for call in meetup.call_args_list] == [[due]]
+        assert [call.args[0] for call in eventbrite.call_args_list] == [organization]
+        assert models.ScrapeRun.objects.count() == 2
+        organization.refresh_from_db()
+        assert organization.last_changed_at
+        assert organization.next_scrape_at > now
+
+    def test_no_organizations_still_records_results(self):
+        with self.assertLogs("web.tasks", level="INFO") as logs:
+            tasks.scrape_events_from_eventbrite()
+
+        assert (
+            "Scraped eventbrite: 0 events created, 0 updated, 0 unchanged by 0 subtasks, 0 failed []" in logs.output[-1]
+        )
@@ -1,4 +1,7 @@
 from datetime import timedelta
+from unittest import mock
+
+from django.core.files.storage import FileSystemStorage
 
 from web.templatetags import web_extras
 
@@ -22,3 +25,32 @@ def test_timedelta_full():
     actual = web_extras._timedelta(duration)
     expected = "1 hour 2 minutes 3 seconds"
     assert actual == expected
+
+
+def test_responsive_image():
+    image = mock.Mock(url="/media/image.jpeg", storage=FileSystemStorage(base_url="/media/"))
+    renditions = [
+        {"name": "r/400w.webp", "width": 400, "height": 200, "format": "webp"},
+        {"name": "r/400w.jpeg", "width": 400, "height": 200, "format": "jpeg"},
+        {"name": "r/800w.webp", "width": 800, "height": 400, "format": "webp"},
+        {"name": "r/800w.jpeg", "width": 800, "height": 400, "format": "jpeg"},
+    ]
+
+    actual = web_extras.responsive_image(image, renditions, "detail", alt="Event & more")
+
+    assert actual == (
+        "<picture>"
+        '<source type="image/webp" srcset="/media/r/400w.webp 400w, /media/r/800w.webp 800w" '
+        'sizes="(min-width: 600px) 600px, 100vw">'
+        '<img alt="Event &amp; more" height="400" sizes="(min-width: 600px) 600px, 100vw" src="/media/r/800w.jpeg" '
+        'srcset="/media/r/400w.jpeg 400w, /media/r/800w.jpeg 800w" width="800">'
+        "</picture>"
+    )
+
+
+def test_responsive_image_without_renditions():
+    image = mock.Mock(url="/media/image.jpeg")
+
+    actual = web_extras.responsive_image(image, [], "card", alt="Event")
+
+    assert actual == '<img alt="Event" src="/media/image.jpeg">'
@@ -0,0 +1,147 @@
+import freezegun
+import pytest
+import requests
+import responses
+import urllib3
+from urllib3.util.retry import RequestHistory, Retry
+
+from web import instrumentation
+from web.http_client import HttpClient
+from web.throttle import CircuitOpen, HostThrottle, MemoryThrottleStore, RedisThrottleStore
+
+URL = "https://www.meetup.com/python-spokane/"
+HOST = "www.meetup.com"
+
+
+def throttle(**kwargs) -> HostThrottle:
+    options = {"rate": 1.0, "burst": 2, "failure_threshold": 3, "reset_timeout": 60.0, **kwargs}
+    return HostThrottle(MemoryThrottleStore(), **options)
+
+
+def response(status: int, **headers: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers)
+    return response
+
+
+@freezegun.freeze_time()
+def test_requests_are_allowed_in_bursts_then_at_the_rate():
+    host_throttle = throttle()
+
+    assert host_throttle.try_acquire(HOST) == 0
+    assert host_throttle.try_acquire(HOST) == 0
+    assert host_throttle.try_acquire(HOST) == pytest.approx(1.0)
+    assert host_throttle.try_acquire("www.eventbriteapi.com") == 0
+
+
+def test_hosts_are_not_limited_without_a_rate():
+    host_throttle = throttle(rate=0)
+
+    assert all(host_throttle.try_acquire(HOST) == 0 for _ in range(10))
+
+
+@freezegun.freeze_time()
+def test_too_many_requests_slow_down_and_pause_the_host():
+    host_throttle = throttle()
+
+    host_throttle.record(URL, response(429, **{"Retry-After": "30"}))
+
+    assert host_throttle.state(HOST).rate == 0.5
+    assert host_throttle.try_acquire(HOST) == pytest.approx(30.0)
+
+
+@freezegun.freeze_time()
+def test_rate_recovers_after_successful_requests():
+    host_throttle = throttle()
+    host_throttle.record(URL, response(429))
+
+    for _ in range(5):
+        host_throttle.record(URL, response(200))
+
+    assert host_throttle.state(HOST).rate == pytest.approx(0.75)
+
+
+@freezegun.freeze_time()
+def test_pauses_longer_than_the_reset_timeout_fail_fast():
+    host_throttle = throttle()
+    host_throttle.record(URL, response(503, **{"Retry-After": "3600"}))
+
+    with pytest.raises(CircuitOpen):
+        host_throttle.acquire(URL)
+
+
+def test_circuit_opens_after_consecutive_failures_and_closes_after_a_successful_probe():
+    host_throttle = throttle(rate=0)
+
+    with freezegun.freeze_time() as frozen_time:
+        for _ in range(3):
+            host_throttle.acquire(URL)
+            host_throttle.record(URL, response(503))
+        with pytest.raises(CircuitOpen):
+            host_throttle.acquire(URL)
+
+        frozen_time.tick(61)
+        host_throttle.acquire(URL)
+        # Only one request is let through until the probe's outcome is known.
+        with pytest.raises(CircuitOpen):
+            host_throttle.acquire(URL)
+        host_throttle.record(URL, response(200))
+
+        host_throttle.acquire(URL)
+    assert host_throttle.state(HOST).failures == 0
+
+
+def test_circuit_reopens_after_a_failed_probe():
+    host_throttle = throttle(rate=0)
+
+    with freezegun.freeze_time() as frozen_time:
+        for _ in range(3):
+            host_throttle.record(URL, response(503))
+        frozen_time.tick(61)
+        host_throttle.acquire(URL)
+        host_throttle.record(URL, None)
+
+        frozen_time.tick(30)
+        with pytest.raises(CircuitOpen):
+            host_throttle.acquire(URL)
+
+
+@responses.activate
+def test_http_client_stops_sending_requests_to_failing_hosts():
+    responses.get(URL, status=503)
+    client = HttpClient(retries=0, throttle=throttle(rate=0))
+
+    with instrumentation.collect() as metrics:
+        for _ in range(3):
+            client.get(URL)
+        with pytest.raises(CircuitOpen):
+            client.get(URL)
+
+    assert len(responses.calls) == 3
+    assert metrics.circuit_rejected == 1
+
+
+@freezegun.freeze_time()
+def test_retried_too_many_requests_slow_down_the_host():
+    host_throttle = throttle()
+    retried = response(200)
+    retried.raw = urllib3.HTTPResponse(status=200)
+    retried.raw.retries = Retry(1, history=(RequestHistory("GET", URL, None, 429, None),))
+
+    with instrumentation.collect() as metrics:
+        host_throttle.record(URL, retried)
+
+    assert host_throttle.state(HOST).rate == 0.5
+    assert metrics.throttled == 1
+
+
+def test_redis_store_falls_back_to_memory():
+    # Nothing listens on port 1.
+    host_throttle = HostThrottle(
+        RedisThrottleStore("redis://127.0.0.1:1/0"), rate=1, burst=1, failure_threshold=3, reset_timeout=60
+    )
+
+    with freezegun.freeze_time():
+        assert host_throttle.try_acquire(HOST) == 0
+        assert host_throttle.try_acquire(HOST) == pytest.approx(1.0)
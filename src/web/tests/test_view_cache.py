@@ -0,0 +1,294 @@
+import datetime
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.cache import cache
+from django.test.client import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from web import services, view_cache
+from web.models import Event, Tag, TechGroup
+
+
+@pytest.fixture
+def event(tech_group: TechGroup, make_event) -> Event:
+    return make_event(tech_group, name="Python Meetup")
+
+
+def is_cached(client: Client, url: str, **headers) -> bool:
+    """Request the URL and return whether it was served from the cache, i.e. no template was rendered."""
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.context is None
+
+
+def test_pages_are_cached(client: Client, tech_group: TechGroup, event: Event):
+    urls = [
+        reverse("web:index"),
+        reverse("web:list_events"),
+        reverse("web:list_tech_groups"),
+        reverse("web:get_event", args=[event.pk]),
+        reverse("web:get_tech_group", args=[tech_group.pk]),
+        reverse("web:event_calendar", args=[event.date_time.year, event.date_time.month]),
+    ]
+    for url in urls:
+        assert not is_cached(client, url)
+        assert is_cached(client, url)
+
+
+def test_cached_page_is_the_same(client: Client, event: Event):
+    url = reverse("web:get_event", args=[event.pk])
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert second.context is None
+    assert second.content == first.content
+    assert second["Content-Type"] == first["Content-Type"]
+
+
+def test_pages_are_cached_separately_for_htmx(client: Client, event: Event):
+    url = reverse("web:list_events")
+    client.get(url)
+
+    assert not is_cached(client, url, hx_request="true")
+    assert is_cached(client, url, hx_request="true")
+
+
+def test_pages_are_cached_separately_for_query_strings(client: Client, event: Event):
+    client.get(reverse("web:list_events"))
+
+    assert not is_cached(client, reverse("web:list_events") + "?tags=1")
+
+
+def test_pages_are_cached_separately_for_staff(client: Client, admin_client: Client, event: Event):
+    url = reverse("web:list_events")
+    client.get(url)
+
+    assert not is_cached(admin_client, url)
+    assert "Add Event" in admin_client.get(url).content.decode()
+    assert "Suggest Event" in client.get(url).content.decode()
+
+
+def test_pages_are_cached_separately_for_each_time_zone(client: Client, event: Event):
+    url = reverse("web:list_events")
+    client.get(url)
+
+    with timezone.override(datetime.UTC):
+        assert not is_cached(client, url)
+        assert is_cached(client, url)
+
+
+def test_saving_an_event_expires_pages(client: Client, event: Event, django_capture_on_commit_callbacks):
+    url = reverse("web:list_events")
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.name = "Renamed Meetup"
+        event.save()
+
+    response = client.get(url)
+    assert response.context is not None
+    assert "Renamed Meetup" in response.content.decode()
+
+
+def test_saving_an_event_only_expires_its_own_detail_page(
+    client: Client, tech_group: TechGroup, event: Event, django_capture_on_commit_callbacks
+):
+    other_event = baker.make(Event, group=tech_group, approved_at=timezone.localtime())
+    event_url = reverse("web:get_event", args=[event.pk])
+    other_event_url = reverse("web:get_event", args=[other_event.pk])
+    client.get(event_url)
+    client.get(other_event_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        event.save()
+
+    assert not is_cached(client, event_url)
+    assert is_cached(client, other_event_url)
+
+
+def test_deleting_a_tech_group_expires_pages(client: Client, tech_group: TechGroup, django_capture_on_commit_callbacks):
+    url = reverse("web:list_tech_groups")
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tech_group.delete()
+
+    assert "Spokane Python User Group" not in client.get(url).content.decode()
+
+
+def test_tagging_an_event_expires_its_page(client: Client, event: Event, django_capture_on_commit_callbacks):
+    url = reverse("web:get_event", args=[event.pk])
+    client.get(url)
+    tag = Tag.objects.create(value="Databases")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tag.event_set.add(event)
+
+    assert "Databases" in client.get(url).content.decode()
+
+
+def test_scheduling_a_scrape_does_not_expire_pages(
+    client: Client, tech_group: TechGroup, django_capture_on_commit_callbacks
+):
+    url = reverse("web:list_tech_groups")
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tech_group.next_scrape_at = timezone.now()
+        tech_group.save(update_fields=["next_scrape_at"])
+
+    assert is_cached(client, url)
+
+
+def test_saving_scraped_events_expires_pages(client: Client, tech_group: TechGroup, django_capture_on_commit_callbacks):
+    url = reverse("web:list_events")
+    client.get(url)
+    result = (
+        Event(name="Scraped Meetup", date_time=timezone.localtime() + datetime.timedelta(days=1), external_id="1"),
+        [],
+        None,
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        services.EventService().save_results([result], tech_group)
+
+    assert "Scraped Meetup" in client.get(url).content.decode()
+
+
+def test_pages_have_each_visitors_csrf_token(event: Event):
+    url = reverse("web:list_events")
+    tokens = []
+    for client, cached in ((Client(), False), (Client(), True)):
+        response = client.get(url)
+        assert (response.context is None) == cached
+        soup = BeautifulSoup(response.content, "lxml")
+        token = soup.find("input", attrs={"name": "csrfmiddlewaretoken"})["value"]  # type: ignore
+        assert view_cache.csrf_placeholder() not in response.content.decode()
+        assert "csrftoken" in response.cookies
+        tokens.append((client.cookies["csrftoken"].value, token))
+
+    assert tokens[1][0] != tokens[0][0]
+    for cookie, token in tokens:
+        # A masked token is only accepted with the cookie it was made from.
+        assert (
+            Client(enforce_csrf_checks=True)
+            .post(
+                reverse("web:set_timezone"),
+                {"timezone": "UTC"},
+                HTTP_COOKIE=f"csrftoken={cookie}",
+                HTTP_X_CSRFTOKEN=token,
+            )
+            .status_code
+            == 200
+        )
+
+
+def test_pages_are_not_cached_while_there_are_messages(client: Client, event: Event):
+    url = reverse("web:list_events")
+    client.get(url)
+    # Suggesting an event redirects to the list of events with a thank you message.
+    client.post(
+        reverse("web:add_event"),
+        {"name": "Suggested Event", "date_time": "2024-04-08T07:00", "end_time": "2024-04-08T08:00"},
+    )
+
+    response = client.get(url)
+    assert response.context is not None
+    assert "Thank you for suggesting an event" in response.content.decode()
+
+    response = client.get(url)
+    assert response.context is None
+    assert "Thank you for suggesting an event" not in response.content.decode()
+
+
+def test_unchanged_page_is_not_modified(client: Client, event: Event):
+    # Arrange
+    url = reverse("web:get_event", args=[event.pk])
+    etag = client.get(url)["ETag"]
+
+    # Act
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == 304
+    assert response.context is None
+    assert response.content == b""
+    assert response["ETag"] == etag
+
+
+def test_page_is_not_modified_after_it_expires_from_the_cache(client: Client, event: Event):
+    # Arrange
+    url = reverse("web:get_event", args=[event.pk])
+    etag = client.get(url)["ETag"]
+    cache.clear()
+
+    # Act
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == 304
+    assert response.context is not None
+
+
+def test_changed_page_is_modified(client: Client, event: Event, django_capture_on_commit_callbacks):
+    # Arrange
+    url = reverse("web:get_event", args=[event.pk])
+    etag = client.get(url)["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        event.name = "Renamed Meetup"
+        event.save()
+
+    # Act
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert "Renamed Meetup" in response.content.decode()
+
+
+def test_pages_with_a_csrf_token_have_each_visitors_etag(event: Event):
+    # Arrange
+    url = reverse("web:list_events")
+    first, second = Client(), Client()
+    etag = first.get(url)["ETag"]
+
+    # Act
+    other_visitor = second.get(url, headers={"If-None-Match": etag})
+    same_visitor = first.get(url, headers={"If-None-Match": etag})
+
+    # Assert
+    assert other_visitor.status_code == 200
+    assert same_visitor.status_code == 304
+
+
+def test_cache_control(client: Client, admin_client: Client, event: Event):
+    # Arrange
+    event_url = reverse("web:get_event", args=[event.pk])
+
+    # Act
+    # The full events list has a form with a CSRF token.
+    with_csrf_token = client.get(reverse("web:list_events"))
+    anonymous = client.get(event_url, headers={"HX-Request": "true"})
+    staff = admin_client.get(event_url, headers={"HX-Request": "true"})
+
+    # Assert
+    assert "private" in with_csrf_token["Cache-Control"]
+    assert "no-cache" in with_csrf_token["Cache-Control"]
+    assert "public" in anonymous["Cache-Control"]
+    assert "max-age=60" in anonymous["Cache-Control"]
+    assert "HX-Request" in anonymous["Vary"]
+    assert "private" in staff["Cache-Control"]
+
+
+@override_settings(VIEW_CACHE_TIMEOUT=0)
+def test_caching_can_be_disabled(client: Client, event: Event):
+    url = reverse("web:list_events")
+    client.get(url)
+
+    assert not is_cached(client, url)
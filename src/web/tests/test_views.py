@@ -234,6 +234,17 @@ class TestEventListView(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(self.object.name, response.content.decode("utf-8"))
 
+    def test_filter_on_own_tags_instead_of_group_tags(self):
+        own_tag = baker.make("web.Tag")
+        self.object.tags.set([own_tag])
+
+        response = self.client.get(self.url + f"?tags={self.tag.pk}")
+        self.assertNotIn(self.object.name, response.content.decode("utf-8"))
+
+        response = self.client.get(self.url + f"?tags={self.tag.pk}&tags={own_tag.pk}")
+        self.assertIn(self.object.name, response.content.decode("utf-8"))
+        self.assertEqual(list(response.context["queryset"]), [self.object])
+
     def test_does_not_include_unapproved_events(self):
         self.object.approved_at = None
         self.object.save()
@@ -0,0 +1,316 @@
+import contextlib
+import dataclasses
+import functools
+import logging
+import threading
+import time
+import urllib.parse
+from collections.abc import Callable, Iterator
+from typing import Protocol, TypeVar
+
+import redis
+import requests
+from django.conf import settings
+from urllib3.exceptions import InvalidHeader
+from urllib3.util import Retry
+
+from web import instrumentation
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpen(requests.RequestException):
+    """Requests to a host are failing fast, because its recent requests failed."""
+
+
+@dataclasses.dataclass
+class HostState:
+    """The rate limit and circuit breaker of one host, shared by everything that requests it."""
+
+    rate: float = 0.0
+    """Requests per second currently allowed, which is lowered while the host responds with 429s."""
+    tokens: float = 0.0
+    updated_at: float = 0.0
+    paused_until: float = 0.0
+    """When the host asked to be left alone until, with a `Retry-After` header."""
+    failures: int = 0
+    """Consecutive failed requests."""
+    opened_at: float = 0.0
+    """When the circuit breaker opened, or 0 if it's closed."""
+    probe_at: float = 0.0
+    """When the request testing whether a host has recovered was sent, or 0 if there isn't one."""
+
+
+class ThrottleStore(Protocol):
+    def update(self, host: str, fn: Callable[[HostState | None], tuple[HostState, T]]) -> T:
+        """Replace a host's state with the one returned by `fn`, atomically, and return `fn`'s result."""
+        ...
+
+
+class MemoryThrottleStore:
+    """Host states shared by the threads of a process."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def update(self, host: str, fn: Callable[[HostState | None], tuple[HostState, T]]) -> T:
+        with self._lock:
+            state = self._states.get(host)
+            self._states[host], result = fn(dataclasses.replace(state) if state else None)
+            return result
+
+
+class RedisThrottleStore:
+    """Host states shared by every process through Redis.
+
+    If Redis can't be reached, states are kept in memory for `fallback_seconds`
+    before Redis is tried again, so scraping carries on with per-process limits.
+    """
+
+    KEY_PREFIX = "scraper:throttle:"
+    KEY_TTL = 24 * 60 * 60
+
+    def __init__(self, url: str, fallback_seconds: float = 30.0) -> None:
+        self.client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+        self.fallback = MemoryThrottleStore()
+        self.fallback_seconds = fallback_seconds
+        self._fallback_until = 0.0
+
+    def update(self, host: str, fn: Callable[[HostState | None], tuple[HostState, T]]) -> T:
+        if time.monotonic() < self._fallback_until:
+            return self.fallback.update(host, fn)
+        try:
+            return self._update(self.KEY_PREFIX + host, fn)
+        except redis.RedisError as e:
+            logger.warning(
+                "Rate limits are per process for %ss, since Redis is unavailable: %s", self.fallback_seconds, e
+            )
+            self._fallback_until = time.monotonic() + self.fallback_seconds
+            return self.fallback.update(host, fn)
+
+    def _update(self, key: str, fn: Callable[[HostState | None], tuple[HostState, T]]) -> T:
+        # Optimistic locking: the transaction is retried if another process changes the key meanwhile.
+        def transaction(pipe: redis.client.Pipeline) -> T:
+            values = pipe.hgetall(key)
+            state = None
+            if values:
+                fields = dataclasses.fields(HostState)
+                state = HostState(
+                    **{f.name: f.type(values[f.name.encode()]) for f in fields if f.name.encode() in values}
+                )  # type: ignore
+            new_state, result = fn(state)
+            pipe.multi()
+            pipe.hset(key, mapping=dataclasses.asdict(new_state))
+            pipe.expire(key, self.KEY_TTL)
+            return result
+
+        return self.client.transaction(transaction, key, value_from_callable=True)
+
+
+class HostThrottle:
+    """A token bucket rate limit and a circuit breaker for each host.
+
+    Each host may be sent `rate` requests per second, in bursts of up to `burst`.
+    When a host responds with 429 Too Many Requests, its rate is halved (down to
+    `min_rate`) and any `Retry-After` is honored by every client; the rate then
+    recovers gradually as requests succeed. A rate of 0 means no limit.
+
+    After `failure_threshold` consecutive failures (connection errors, timeouts,
+    429s and 5xxs, once retries are exhausted) the host's circuit opens: requests
+    raise `CircuitOpen` without being sent until `reset_timeout` seconds have
+    passed. Then a single request is let through; if it succeeds the circuit
+    closes, otherwise it stays open for another `reset_timeout`.
+    """
+
+    RECOVERY = 0.05
+    """The fraction of `rate` regained after each successful request."""
+
+    def __init__(
+        self,
+        store: ThrottleStore,
+        *,
+        rate: float,
+        burst: int,
+        failure_threshold: int,
+        reset_timeout: float,
+        min_rate: float | None = None,
+    ) -> None:
+        self.store = store
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.min_rate = rate / 20 if min_rate is None else min_rate
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._retry_after = Retry(0)
+
+    @classmethod
+    def from_settings(cls) -> "HostThrottle":
+        """Return a throttle configured by the `SCRAPER_HOST_*` and `SCRAPER_CIRCUIT_*` settings.
+
+        Its state is shared through Redis if `SCRAPER_THROTTLE_REDIS_URL` is set, and
+        otherwise only by the threads using this throttle.
+        """
+        store = default_redis_store() if settings.SCRAPER_THROTTLE_REDIS_URL else MemoryThrottleStore()
+        return cls(
+            store,
+            rate=settings.SCRAPER_HOST_RATE,
+            burst=settings.SCRAPER_HOST_BURST,
+            failure_threshold=settings.SCRAPER_CIRCUIT_FAILURES,
+            reset_timeout=settings.SCRAPER_CIRCUIT_RESET_SECONDS,
+        )
+
+    @contextlib.contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """Wait until a request to the URL's host is allowed, and count connection errors and timeouts as failures.
+
+        Call `record` with the response once it's received.
+        """
+        self.acquire(url)
+        try:
+            yield
+        except (requests.ConnectionError, requests.Timeout):
+            self.record(url, None)
+            raise
+
+    def acquire(self, url: str) -> None:
+        """Block until a request to the URL's host is allowed, or raise `CircuitOpen`."""
+        host = _host(url)
+        waited = 0.0
+        while wait := self.try_acquire(host):
+            if wait > self.reset_timeout:
+                instrumentation.record_throttling(wait_seconds=waited, circuit_rejected=1)
+                raise CircuitOpen(f"{host} asked not to be sent requests for {wait:.0f}s")
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            instrumentation.record_throttling(wait_seconds=waited)
+
+    def try_acquire(self, host: str) -> float:
+        """Take a token to send a request to `host`, or return how many seconds to wait for one.
+
+        Raises `CircuitOpen` if the host's circuit is open.
+        """
+        now = time.time()
+        allowed, wait, probing = self.store.update(host, lambda state: self._take_token(state, now))
+        if not allowed:
+            instrumentation.record_throttling(circuit_rejected=1)
+            raise CircuitOpen(f"{host} failed {self.failure_threshold} times in a row; retrying in {wait:.0f}s")
+        if probing:
+            logger.info("Checking whether %s has recovered", host)
+        return wait
+
+    def state(self, host: str) -> HostState:
+        """Return a copy of a host's current state."""
+        now = time.time()
+
+        def read(state: HostState | None) -> tuple[HostState, HostState]:
+            state = state or self._new_state(now)
+            return state, dataclasses.replace(state)
+
+        return self.store.update(host, read)
+
+    def record(self, url: str, response: requests.Response | None) -> None:
+        """Update the URL's host's rate limit and circuit breaker with the outcome of a request.
+
+        `response` is None if the request failed to connect or timed out.
+        """
+        host = _host(url)
+        throttled = response is not None and _was_throttled(response)
+        failed = response is None or response.status_code == 429 or response.status_code >= 500
+        retry_after = self._parse_retry_after(response) if response is not None else None
+        now = time.time()
+        before, after = self.store.update(host, lambda state: self._record(state, now, throttled, failed, retry_after))
+
+        if throttled:
+            instrumentation.record_throttling(throttled=1)
+            logger.warning(
+                "%s is throttling requests; slowed to %.2f requests/s%s",
+                host,
+                after.rate,
+                f", paused for {retry_after:.0f}s" if retry_after else "",
+            )
+        if after.opened_at and after.opened_at != before.opened_at:
+            logger.warning(
+                "Circuit opened for %s after %d consecutive failures; requests fail fast for %ss",
+                host,
+                after.failures,
+                self.reset_timeout,
+            )
+        elif before.opened_at and not after.opened_at:
+            logger.info("Circuit closed for %s", host)
+
+    def _new_state(self, now: float) -> HostState:
+        return HostState(rate=self.rate, tokens=self.burst, updated_at=now)
+
+    def _take_token(self, state: HostState | None, now: float) -> tuple[HostState, tuple[bool, float, bool]]:
+        """Return the new state, and whether the request is allowed, how long to wait and whether it's a probe."""
+        state = state or self._new_state(now)
+        probing = False
+        if state.opened_at:
+            reopens_at = max(state.opened_at, state.probe_at) + self.reset_timeout
+            if now < reopens_at:
+                return state, (False, reopens_at - now, False)
+            probing = True
+
+        if now < state.paused_until:
+            return state, (True, state.paused_until - now, False)
+        if self.rate > 0:
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+            state.updated_at = now
+            if state.tokens < 1:
+                return state, (True, (1 - state.tokens) / state.rate, False)
+            state.tokens -= 1
+        if probing:
+            state.probe_at = now
+        return state, (True, 0.0, probing)
+
+    def _record(
+        self, state: HostState | None, now: float, throttled: bool, failed: bool, retry_after: float | None
+    ) -> tuple[HostState, tuple[HostState, HostState]]:
+        state = state or self._new_state(now)
+        before = dataclasses.replace(state)
+        if throttled and self.rate > 0:
+            state.rate = max(self.min_rate, state.rate / 2)
+            state.tokens = min(state.tokens, 0)
+        elif not throttled:
+            state.rate = min(self.rate, state.rate + self.rate * self.RECOVERY)
+        if retry_after:
+            state.paused_until = max(state.paused_until, now + retry_after)
+
+        if not failed:
+            state.failures = 0
+            state.opened_at = state.probe_at = 0.0
+        else:
+            state.failures += 1
+            if state.probe_at or (not state.opened_at and state.failures >= self.failure_threshold):
+                state.opened_at = now
+                state.probe_at = 0.0
+        return state, (before, state)
+
+    def _parse_retry_after(self, response: requests.Response) -> float | None:
+        if response.status_code not in (429, 503) or "Retry-After" not in response.headers:
+            return None
+        try:
+            return self._retry_after.parse_retry_after(response.headers["Retry-After"])
+        except InvalidHeader:
+            return None
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlsplit(url).netloc or url
+
+
+def _was_throttled(response: requests.Response) -> bool:
+    """Whether the response, or any attempt that was retried before it, was a 429."""
+    retries = getattr(response.raw, "retries", None)
+    history = retries.history if isinstance(retries, Retry) else ()
+    return response.status_code == 429 or any(attempt.status == 429 for attempt in history)
+
+
+@functools.cache
+def default_redis_store() -> RedisThrottleStore:
+    """Return the Redis store shared by everything in this process."""
+    return RedisThrottleStore(settings.SCRAPER_THROTTLE_REDIS_URL)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from web import views
+from web import api, views
 
 app_name = "web"
 
@@ -13,11 +13,17 @@ urlpatterns = [
     path("groups/<int:pk>", views.DetailTechGroup.as_view(), name="get_tech_group"),
     path("groups/<int:pk>/edit", views.UpdateTechGroup.as_view(), name="edit_tech_group"),
     path("events/add", views.CreateEvent.as_view(), name="add_event"),
+    path("events/search", views.SearchEvents.as_view(), name="search_events"),
     path("events/<int:pk>", views.DetailEvent.as_view(), name="get_event"),
     path("events/<int:pk>/edit", views.UpdateEvent.as_view(), name="update_event"),
     path("build_sidebar", views.BuildSidebar.as_view(), name="build_sidebar"),
     path("events/<int:pk>/details/", views.GetEventDetailsModal.as_view(), name="get_event_details"),
     path("event_calendar/<int:year>/<int:month>/", views.EventCalendarView.as_view(), name="event_calendar"),
+    path("api/v1/events", api.ListEvents.as_view(), name="api_list_events"),
+    path("api/v1/events/<int:pk>", api.DetailEvent.as_view(), name="api_get_event"),
+    path("api/v1/groups", api.ListTechGroups.as_view(), name="api_list_tech_groups"),
+    path("api/v1/groups/<int:pk>", api.DetailTechGroup.as_view(), name="api_get_tech_group"),
+    path("api/v1/tags", api.ListTags.as_view(), name="api_list_tags"),
     # handyhelpers overrides
     path("filter_list_view", views.FilterListView.as_view(), name="filter_list_view"),
 ]
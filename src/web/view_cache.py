@@ -0,0 +1,201 @@
+"""Caching of rendered pages, expired when the models they show change.
+
+Each cached view lists the models it shows, or single objects of them, as its
+dependencies. Every dependency has a version in the cache, which is part of the
+key of every page that depends on it, so changing a version expires all those
+pages at once. `web.signals` changes versions when events, tech groups and tags
+are saved, and code that saves them in bulk, bypassing signals, calls
+`invalidate` itself.
+
+Cached responses also carry an ETag, a digest of the page, so visitors who
+already have it are answered with a 304 without rendering it or sending it
+again.
+"""
+
+import functools
+import hashlib
+import logging
+import secrets
+from collections.abc import Iterable
+
+import redis
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import models, transaction
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.template.response import SimpleTemplateResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.crypto import salted_hmac
+from django.utils.http import quote_etag
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = "views:version:"
+
+
+def dependency(model: type[models.Model], pk: object = None) -> str:
+    """Return the name of a dependency on every object of `model`, or only the one with primary key `pk`."""
+    name = model._meta.label_lower
+    return name if pk is None else f"{name}:{pk}"
+
+
+def invalidate(model: type[models.Model], pks: Iterable[object] = ()) -> None:
+    """Expire the cached pages that show `model`, and those that show only the objects with primary keys `pks`.
+
+    Pages are expired once the current transaction commits, so they can't be
+    cached again with data from before it.
+    """
+    names = [dependency(model), *(dependency(model, pk) for pk in pks)]
+    transaction.on_commit(lambda: _bump_versions(names))
+
+
+def versions(names: list[str]) -> list[str]:
+    """Return the current version of each dependency."""
+    keys = [VERSION_KEY_PREFIX + name for name in names]
+    found = cache.get_many(keys)
+    if missing := [key for key in keys if key not in found]:
+        # A version that was evicted must not start over, or pages cached with an old version would come back.
+        for key in missing:
+            cache.add(key, _new_version(), timeout=None)
+        found.update(cache.get_many(missing))
+    return [str(found.get(key, "")) for key in keys]
+
+
+def _bump_versions(names: list[str]) -> None:
+    try:
+        cache.set_many({VERSION_KEY_PREFIX + name: _new_version() for name in names}, timeout=None)
+    except redis.RedisError as e:
+        logger.warning("Could not expire cached pages that depend on %s: %s", ", ".join(names), e)
+
+
+def _new_version() -> str:
+    return secrets.token_hex(8)
+
+
+@functools.cache
+def csrf_placeholder() -> str:
+    """Return what's rendered instead of the CSRF token in cached pages.
+
+    It's derived from the secret key, so an event's description can't contain it
+    to have a visitor's CSRF token put in its place.
+    """
+    return salted_hmac("web.view_cache.csrf_placeholder", "placeholder").hexdigest()
+
+
+def csrf_token_placeholder(request: HttpRequest) -> dict[str, str]:
+    """Context processor rendering a placeholder instead of the CSRF token in pages that will be cached.
+
+    Each visitor's own token is put in its place by `CachedViewMixin` whenever the
+    page is served, since a cached token would otherwise be shared by everyone.
+    """
+    if getattr(request, "view_cache_key", None):
+        return {"csrf_token": csrf_placeholder()}
+    return {}
+
+
+class CachedViewMixin:
+    """Cache the responses to GET requests for `VIEW_CACHE_TIMEOUT` seconds, or until their dependencies change.
+
+    Responses are cached separately for each URL, for HTMX and full page requests,
+    for each time zone and for staff and everyone else. Responses aren't served
+    from or saved to the cache while the visitor has messages to be shown, and
+    responses that set cookies aren't saved.
+
+    Cacheable responses have an ETag, and a 304 is returned instead when the
+    visitor already has the same page. Pages with a CSRF token have a different
+    ETag for each visitor, since the token is theirs. Browsers are told to
+    revalidate pages for signed in users and pages with a CSRF token every time,
+    and may keep other pages for `VIEW_CACHE_MAX_AGE` seconds.
+    """
+
+    request: HttpRequest
+    cache_models: tuple[type[models.Model], ...] = ()
+
+    def get_cache_dependencies(self) -> list[str]:
+        """Return the dependencies that expire the response when they change. Defaults to all of `cache_models`."""
+        return [dependency(model) for model in self.cache_models]
+
+    def get_cache_key(self) -> str:
+        request = self.request
+        user = request.user
+        parts = [
+            request.get_full_path(),
+            "htmx" if request.headers.get("HX-Request") else "page",
+            timezone.get_current_timezone_name(),
+            "staff" if user.is_authenticated and user.is_staff else "public",
+            *versions(self.get_cache_dependencies()),
+        ]
+        digest = hashlib.sha256("\n".join(parts).encode()).hexdigest()
+        return f"views:{type(self).__name__}:{digest}"
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if request.method != "GET" or not settings.VIEW_CACHE_TIMEOUT or len(messages.get_messages(request)):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+        try:
+            key = self.get_cache_key()
+            cached = cache.get(key)
+        except redis.RedisError as e:
+            logger.warning("Not caching %s, since the cache is unavailable: %s", request.path, e)
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+        if cached is not None:
+            response = HttpResponse(cached["content"], content_type=cached["content_type"])
+            # Pages cached before ETags were added don't have a digest.
+            return self._conditional_response(response, cached.get("digest") or _digest(cached["content"]))
+
+        request.view_cache_key = key  # type: ignore
+        response = super().dispatch(request, *args, **kwargs)  # type: ignore
+        if isinstance(response, SimpleTemplateResponse):
+            response.render()
+        if not self._is_cacheable(response):
+            return self._insert_csrf_token(response)
+
+        digest = _digest(response.content)
+        try:
+            cache.set(
+                key,
+                {"content": response.content, "content_type": response["Content-Type"], "digest": digest},
+                settings.VIEW_CACHE_TIMEOUT,
+            )
+        except redis.RedisError as e:
+            logger.warning("Could not cache %s: %s", request.path, e)
+        return self._conditional_response(response, digest)
+
+    def _is_cacheable(self, response: HttpResponse) -> bool:
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not len(messages.get_messages(self.request))
+            # The real CSRF token was rendered by something that doesn't use the context processor.
+            and not self.request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        )
+
+    def _conditional_response(self, response: HttpResponse, digest: str) -> HttpResponse:
+        """Add validators and caching headers to a cacheable response, or return a 304 if the visitor has it."""
+        has_csrf_token = csrf_placeholder().encode() in response.content
+        response = self._insert_csrf_token(response)
+        if has_csrf_token:
+            # Set by `get_token` when the token was inserted, if the visitor had no CSRF cookie.
+            digest = salted_hmac("web.view_cache.etag", f"{digest}:{self.request.META['CSRF_COOKIE']}").hexdigest()
+        response["ETag"] = quote_etag(digest)
+        # Pages differ for HTMX requests, and for each visitor's time zone and user, which are in their session.
+        patch_vary_headers(response, ["HX-Request", "Cookie"])
+        if has_csrf_token or self.request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=settings.VIEW_CACHE_MAX_AGE)
+        return get_conditional_response(self.request, etag=response["ETag"], response=response)
+
+    def _insert_csrf_token(self, response: HttpResponse) -> HttpResponse:
+        placeholder = csrf_placeholder().encode()
+        if not response.streaming and placeholder in response.content:
+            response.content = response.content.replace(placeholder, get_token(self.request).encode())
+        return response
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:32]
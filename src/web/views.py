@@ -1,10 +1,12 @@
 from typing import Any
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.exceptions import BadRequest
 from django.db.models import Prefetch
 from django.http import HttpRequest, HttpResponse
-from django.shortcuts import redirect
+from django.shortcuts import redirect, render
 from django.template import loader
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
@@ -20,8 +22,8 @@ from handyhelpers.views.gui import (
 )
 from handyhelpers.views.htmx import BuildBootstrapModalView, BuildModelSidebarNav
 
-from web import forms
-from web.models import Event, TechGroup
+from web import forms, pagination, search, view_cache
+from web.models import Event, Tag, TechGroup
 
 
 @require_http_methods(["POST"])
@@ -31,12 +33,14 @@ def set_timezone(request: HttpRequest) -> HttpResponse:
     return HttpResponse()
 
 
-class Index(HandyHelperIndexView):
+class Index(view_cache.CachedViewMixin, HandyHelperIndexView):
     title = "Spokane Tech"
     subtitle = "Index of Spokane's Tech User Groups"
     base_template = "spokanetech/base.html"
+    cache_models = (TechGroup,)
 
-    def __init__(self, **kwargs: Any) -> None:
+    def get(self, request):
+        # Listed here rather than in __init__, so tech groups aren't queried when the page is cached.
         self.item_list = [
             {
                 "url": tech_group.get_absolute_url(),
@@ -45,7 +49,7 @@ class Index(HandyHelperIndexView):
             }
             for tech_group in TechGroup.objects.all()
         ]
-        super().__init__(**kwargs)
+        return super().get(request)
 
 
 class CanEditMixin:
@@ -69,10 +73,11 @@ class RequireStaffMixin(UserPassesTestMixin):
         return user.is_authenticated and user.is_staff  # type: ignore
 
 
-class ListEvents(CanEditMixin, HtmxViewMixin, HandyHelperListPlusFilterView):
+class ListEvents(view_cache.CachedViewMixin, CanEditMixin, HtmxViewMixin, HandyHelperListPlusFilterView):
     title = "Events"
     base_template = "spokanetech/base.html"
     template_name = "web/event_list.html"
+    cache_models = (Event, TechGroup, Tag)
 
     filter_form_obj = forms.ListEventsFilter
     filter_form_url = reverse_lazy("web:filter_list_view")
@@ -81,36 +86,116 @@ class ListEvents(CanEditMixin, HtmxViewMixin, HandyHelperListPlusFilterView):
         self.queryset = (
             Event.objects.filter(date_time__gte=timezone.localtime())
             .select_related("group")
-            .prefetch_related("tags", "group__tags")
+            .prefetch_related("effective_tags")
+            # Lists show the rendered excerpt instead.
+            .defer("description", "description_html")
         )
         super().__init__(**kwargs)
 
     def get(self, request, *args, **kwargs):
+        try:
+            self.cursor = pagination.Cursor.decode(request.GET[pagination.CURSOR_PARAM])
+        except KeyError:
+            self.cursor = None
+        except ValueError as e:
+            raise BadRequest(str(e)) from e
+
         if self.is_htmx():
-            self.template_name = "web/partials/event_list.htm"
+            # Later pages are loaded into the list as it's scrolled, so they're only the events.
+            self.template_name = "web/partials/event_list_page.htm" if self.cursor else "web/partials/event_list.htm"
         return super().get(request, *args, **kwargs)
 
     def filter_by_query_params(self):
-        """Include events that don't have any tags of their own but their group tags match."""
-        queryset = super().filter_by_query_params()
+        """Return the page of events after the cursor, filtered by the other query parameters.
+
+        handyhelpers renders whatever this returns as the `queryset`.
+        """
+        queryset = self.filter_events()
+        if queryset is None:
+            return None
+        page = pagination.paginate(queryset, self.cursor, settings.EVENTS_PAGE_SIZE)
+        if page.next_cursor:
+            # The next page is filtered the same way.
+            query_params = self.request.GET.copy()
+            query_params[pagination.CURSOR_PARAM] = page.next_cursor.encode()
+            page.next_url = f"{self.request.path}?{query_params.urlencode()}"
+        return page
+
+    def filter_events(self):
+        """Filter on the events' effective tags, which are their group's tags if they have none of their own."""
+        # Filter on the other query parameters without `tags`, which would filter on the events' own tags.
+        query_params = self.request.GET
+        self.request.GET = query_params.copy()
+        self.request.GET.pop("tags", None)
+        try:
+            queryset = super().filter_by_query_params()
+        finally:
+            self.request.GET = query_params
         if queryset is None:
             return None
 
-        if tags := self.request.GET.getlist("tags"):
-            events_with_group_tags_queryset = Event.objects.filter(
-                date_time__gte=timezone.localtime()
-            ).filter_group_tags(tags)  # type: ignore
-            queryset = queryset | events_with_group_tags_queryset
-
-        queryset = queryset.order_by("date_time")
+        if tags := query_params.getlist("tags"):
+            queryset = queryset.filter_effective_tags(tags)
         return queryset
 
 
-class DetailEvent(HtmxViewMixin, DetailView):
+class SearchEvents(HtmxViewMixin, View):
+    """Search approved events, past and upcoming, best matches first.
+
+    Not cached, since most searches are only made once.
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        query = request.GET.get("q", "").strip()
+        try:
+            page_number = max(1, int(request.GET.get("page", "1")))
+        except ValueError as e:
+            raise BadRequest("Invalid page number") from e
+
+        page_size = settings.EVENTS_PAGE_SIZE
+        pks = (
+            search.ranked_pks(Event.objects.all(), query, (page_number - 1) * page_size, page_size + 1) if query else []
+        )
+        events = (
+            Event.objects.filter(pk__in=pks[:page_size])
+            .select_related("group")
+            .prefetch_related("effective_tags")
+            .defer("description", "description_html")
+            .in_bulk()
+        )
+        page = pagination.Page([events[pk] for pk in pks[:page_size]], None)
+        if len(pks) > page_size:
+            query_params = request.GET.copy()
+            query_params["page"] = str(page_number + 1)
+            page.next_url = f"{request.path}?{query_params.urlencode()}"
+
+        if not self.is_htmx():
+            template_name = "web/event_search.html"
+        elif page_number > 1:
+            # Later pages are loaded into the results as they're scrolled.
+            template_name = "web/partials/event_list_page.htm"
+        elif request.headers.get("HX-Target") == "search-results":
+            # Searching as the query is typed.
+            template_name = "web/partials/event_search_results.htm"
+        else:
+            template_name = "web/partials/event_search.htm"
+        return render(request, template_name, {"title": "Search Events", "query": query, "queryset": page})
+
+
+class DetailEvent(view_cache.CachedViewMixin, HtmxViewMixin, DetailView):
     model = Event
 
+    def get_cache_dependencies(self) -> list[str]:
+        return [
+            view_cache.dependency(Event, self.kwargs["pk"]),
+            view_cache.dependency(TechGroup),
+            view_cache.dependency(Tag),
+        ]
+
     def __init__(self, **kwargs: Any) -> None:
-        self.queryset = Event.objects.select_related("group").prefetch_related("tags", "group__tags")
+        self.queryset = (
+            Event.objects.select_related("group").prefetch_related("tags", "group__tags").defer("description")
+        )
         super().__init__(**kwargs)
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
@@ -161,9 +246,16 @@ class UpdateEvent(RequireStaffMixin, UpdateView):
         return super().get_success_url()
 
 
-class DetailTechGroup(HtmxViewMixin, DetailView):
+class DetailTechGroup(view_cache.CachedViewMixin, HtmxViewMixin, DetailView):
     model = TechGroup
 
+    def get_cache_dependencies(self) -> list[str]:
+        return [
+            view_cache.dependency(TechGroup, self.kwargs["pk"]),
+            view_cache.dependency(Event),
+            view_cache.dependency(Tag),
+        ]
+
     def __init__(self, **kwargs: Any) -> None:
         self.queryset = TechGroup.objects.prefetch_related(
             Prefetch("event_set", Event.objects.filter(date_time__gte=timezone.localtime()))
@@ -182,10 +274,11 @@ class DetailTechGroup(HtmxViewMixin, DetailView):
         return super().get(request, *args, **kwargs)
 
 
-class ListTechGroup(CanEditMixin, HtmxViewMixin, HandyHelperListView):
+class ListTechGroup(view_cache.CachedViewMixin, CanEditMixin, HtmxViewMixin, HandyHelperListView):
     title = "Tech Groups"
     base_template = "spokanetech/base.html"
     template_name = "web/techgroup_list.html"
+    cache_models = (TechGroup, Tag)
 
     def __init__(self, **kwargs: Any) -> None:
         self.queryset = TechGroup.objects.filter(enabled=True)
@@ -234,19 +327,20 @@ class GetEventDetailsModal(BuildBootstrapModalView):
 
     def get(self, request, *args, **kwargs):
         context = {}
-        context["object"] = Event.objects.get(pk=kwargs["pk"])
+        context["object"] = Event.objects.defer("description").get(pk=kwargs["pk"])
         self.modal_subtitle = context["object"]
         self.modal_body = loader.render_to_string("web/partials/modal/detail_event.htm", context=context)
         return super().get(request, *args, **kwargs)
 
 
-class EventCalendarView(CalendarView):
+class EventCalendarView(view_cache.CachedViewMixin, CalendarView):
     """Render a monthly calendar view of events"""
 
     title = "Spokane Tech Event Calendar"
     event_model = Event
     event_model_date_field = "date_time"
     event_detail_url = "web:get_event_details"
+    cache_models = (Event,)
 
 
 class FilterListView(View):